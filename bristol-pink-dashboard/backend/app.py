@@ -1,20 +1,124 @@
-from flask import Flask, request, jsonify
+import io
+import os
+
+from flask import Flask, Response, g, request, jsonify, send_file
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from models.predictor import SalesPredictor
-from models.evaluator import ModelEvaluator
-from models import ALL_ALGORITHMS
+from models.evaluator import BACKTEST_MAX_FOLDS, BACKTEST_MODES, ModelEvaluator
+from models import ALL_ALGORITHMS, algorithm_availability
+from models.budget import TrainingBudget
+from models.instrumentation import METRICS, finish_request, span, start_request
+from models.registry import MODEL_REGISTRY, MODEL_REGISTRY_ENABLED
+from csv_ingest import read_sales_csv
+from datasets import DATASETS
+from jobs import JOBS, JobCancelled, JobLimitError
+from profiling import PROFILER
 from security import (
     USERS,
     create_session,
     delete_session,
     get_session_from_request,
     require_auth,
-    validate_sales_data,
+    validate_sales_frame,
     write_audit_event,
 )
 
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Records request-body parsing and response serialization as ``parse``/``serialize`` spans."""
+
+    def loads(self, s, **kwargs):
+        with span('parse'):
+            return super().loads(s, **kwargs)
+
+    def dumps(self, obj, **kwargs):
+        with span('serialize'):
+            return super().dumps(obj, **kwargs)
+
+
 app = Flask(__name__)
-CORS(app)
+app.json = TimedJSONProvider(app)
+CORS(app, expose_headers=['Server-Timing', 'X-Profile-Id'])
+
+
+@app.before_request
+def _start_trace():
+    rule = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    g.trace_token = start_request(rule)
+
+
+@app.after_request
+def _finish_trace(response):
+    trace = finish_request(g.pop('trace_token', None), request.method, response.status_code)
+    if trace is not None:
+        response.headers['Server-Timing'] = trace.server_timing()
+    return response
+
+
+@app.teardown_request
+def _drop_trace(_exc):
+    # Only reached with a token when after_request did not run.
+    finish_request(g.pop('trace_token', None), request.method, 500)
+
+
+def _dataset_visible(dataset) -> bool:
+    return dataset is not None and (dataset.owner == request.user['username'] or request.user['role'] == 'manager')
+
+
+def _load_sales_frame(data: dict):
+    """Resolve the request's sales data from a stored ``dataset_id`` or inline ``sales_data`` (rows or columns).
+
+    Returns ``(frame, message, status)``; ``frame`` is None when the request is invalid.
+    """
+    dataset_id = data.get('dataset_id')
+    if dataset_id is not None:
+        dataset = DATASETS.get(str(dataset_id))
+        if not _dataset_visible(dataset):
+            return None, f'Unknown dataset_id: {dataset_id}', 404
+        return dataset.frame, 'ok', 200
+    ok, msg, frame = validate_sales_frame(data.get('sales_data'))
+    return frame, msg, 200 if ok else 400
+
+
+def _backtest_params(data: dict):
+    """Read the optional ``folds`` and ``backtest_mode`` evaluation parameters.
+
+    Returns ``(folds, mode, error)``; ``error`` is None when both are valid.
+    """
+    try:
+        folds = int(data.get('folds', 1))
+    except (TypeError, ValueError):
+        return None, None, 'folds must be an integer'
+    if folds < 1 or folds > BACKTEST_MAX_FOLDS:
+        return None, None, f'folds must be between 1 and {BACKTEST_MAX_FOLDS}'
+    mode = data.get('backtest_mode', 'rolling')
+    if mode not in BACKTEST_MODES:
+        return None, None, f"backtest_mode must be one of: {', '.join(BACKTEST_MODES)}"
+    return folds, mode, None
+
+
+def _time_budget_param(data: dict):
+    """Read the optional ``time_budget_ms`` limit on model training for the whole request.
+
+    Returns ``(ms, error)``; ``ms`` is None when no limit was given.
+    """
+    value = data.get('time_budget_ms')
+    if value is None:
+        return None, None
+    try:
+        ms = float(value)
+    except (TypeError, ValueError):
+        return None, 'time_budget_ms must be a number'
+    if not ms > 0:
+        return None, 'time_budget_ms must be positive'
+    return ms, None
+
+
+def _training_budget(ms: float | None, cancel=None) -> TrainingBudget | None:
+    if ms is None and cancel is None:
+        return None
+    return TrainingBudget.within(ms, cancel)
 
 
 @app.route('/api/auth/login', methods=['POST'])
@@ -50,26 +154,121 @@ def me():
     return jsonify({'user': request.user})
 
 
+@app.route('/api/datasets', methods=['POST'])
+@require_auth(['manager', 'analyst'])
+def upload_dataset():
+    """Validate and store sales data once so later calls can pass ``dataset_id`` instead."""
+    data = request.get_json(silent=True) or {}
+    ok, msg, sales_frame = validate_sales_frame(data.get('sales_data'))
+    if not ok:
+        write_audit_event('dataset_upload', 'failed', {'reason': msg, 'user': request.user['username']})
+        return jsonify({'error': msg}), 400
+
+    dataset = DATASETS.put(sales_frame, owner=request.user['username'])
+    write_audit_event(
+        'dataset_upload',
+        'success',
+        {'user': request.user['username'], 'dataset_id': dataset.dataset_id, 'rows': len(sales_frame)},
+    )
+    return jsonify({'dataset': dataset.summary()}), 201
+
+
+@app.route('/api/datasets/csv', methods=['POST'])
+@require_auth(['manager', 'analyst'])
+def upload_dataset_csv():
+    """Store a wide or long sales CSV, sent as a multipart ``file`` or as the raw request body.
+
+    ``product`` (form or query field) names the product of a single-series
+    ``Date,Number Sold`` file.
+    """
+    upload = request.files.get('file')
+    raw = upload.stream if upload is not None else request.stream
+    product = request.values.get('product')
+    try:
+        text = io.TextIOWrapper(raw, encoding='utf-8-sig', newline='')
+        ok, msg, sales_frame, layout = read_sales_csv(text, product=product)
+    except UnicodeDecodeError:
+        ok, msg, layout = False, 'CSV must be UTF-8 encoded', None
+    except ValueError as exc:
+        ok, msg, layout = False, f'Could not parse CSV: {exc}', None
+    if not ok:
+        write_audit_event('dataset_upload', 'failed', {'reason': msg, 'user': request.user['username'], 'source': 'csv'})
+        return jsonify({'error': msg}), 400
+
+    dataset = DATASETS.put(sales_frame, owner=request.user['username'])
+    write_audit_event(
+        'dataset_upload',
+        'success',
+        {
+            'user': request.user['username'],
+            'dataset_id': dataset.dataset_id,
+            'rows': len(sales_frame),
+            'source': 'csv',
+            'layout': layout,
+        },
+    )
+    return jsonify({'dataset': dataset.summary(), 'layout': layout}), 201
+
+
+@app.route('/api/datasets/<dataset_id>/append', methods=['POST'])
+@require_auth(['manager', 'analyst'])
+def append_dataset(dataset_id: str):
+    """Store a dataset plus newer ``sales_data`` rows under a new ``dataset_id``.
+
+    Forecasts on the new dataset update the models fitted on the old one
+    instead of retraining them, while the training window has moved only a
+    few days.
+    """
+    data = request.get_json(silent=True) or {}
+    if _dataset_visible(DATASETS.get(dataset_id)):
+        ok, msg, rows = validate_sales_frame(data.get('sales_data'))
+    else:
+        ok, msg = False, f'Unknown dataset_id: {dataset_id}'
+    if ok:
+        dataset, msg = DATASETS.append(dataset_id, rows, owner=request.user['username'])
+    if not ok or dataset is None:
+        write_audit_event('dataset_append', 'failed', {'reason': msg, 'user': request.user['username'], 'dataset_id': dataset_id})
+        return jsonify({'error': msg}), 404 if msg.startswith('Unknown dataset_id') else 400
+
+    write_audit_event(
+        'dataset_append',
+        'success',
+        {'user': request.user['username'], 'dataset_id': dataset.dataset_id, 'parent_id': dataset_id, 'rows': len(rows)},
+    )
+    return jsonify({'dataset': dataset.summary(), 'appended_rows': len(rows)}), 201
+
+
+@app.route('/api/datasets/<dataset_id>', methods=['GET'])
+@require_auth(['manager', 'analyst'])
+def get_dataset(dataset_id: str):
+    dataset = DATASETS.get(dataset_id)
+    if not _dataset_visible(dataset):
+        return jsonify({'error': f'Unknown dataset_id: {dataset_id}'}), 404
+    return jsonify({'dataset': dataset.summary()})
+
+
 @app.route('/api/predict', methods=['POST'])
 @require_auth(['manager', 'analyst'])
 def predict():
     try:
         data = request.get_json(silent=True) or {}
-        sales_data = data.get('sales_data')
         training_weeks = int(data.get('training_weeks', 4))
         algorithm = data.get('algorithm', 'linear_regression')
 
-        ok, msg = validate_sales_data(sales_data)
-        if not ok:
+        sales_frame, msg, status = _load_sales_frame(data)
+        if sales_frame is None:
             write_audit_event('predict', 'failed', {'reason': msg, 'user': request.user['username']})
-            return jsonify({'error': msg}), 400
+            return jsonify({'error': msg}), status
         if algorithm not in ALL_ALGORITHMS:
             return jsonify({'error': f'Unsupported algorithm: {algorithm}'}), 400
         if training_weeks < 4 or training_weeks > 8:
             return jsonify({'error': 'training_weeks must be between 4 and 8'}), 400
+        time_budget_ms, error = _time_budget_param(data)
+        if error:
+            return jsonify({'error': error}), 400
 
-        predictor = SalesPredictor(algorithm=algorithm)
-        predictions = predictor.predict(sales_data, training_weeks, forecast_weeks=4)
+        predictor = SalesPredictor(algorithm=algorithm, budget=_training_budget(time_budget_ms))
+        predictions = predictor.predict(sales_frame, training_weeks, forecast_weeks=4)
         write_audit_event(
             'predict',
             'success',
@@ -78,33 +277,46 @@ def predict():
                 'role': request.user['role'],
                 'algorithm': algorithm,
                 'training_weeks': training_weeks,
-                'rows': len(sales_data),
+                'rows': len(sales_frame),
+                'dataset_id': data.get('dataset_id'),
+                'model_updates': predictor.model_updates,
             },
         )
-        return jsonify({'predictions': predictions})
+        return jsonify(_prediction_body(predictor, predictions))
     except Exception as ex:
         write_audit_event('predict', 'failed', {'error': str(ex)})
         return jsonify({'error': 'Prediction request failed'}), 500
 
 
+def _prediction_body(predictor: SalesPredictor, predictions: list) -> dict:
+    """Response body of a forecast, with per-product ``training`` epochs and stop reasons when models were trained iteratively."""
+    body = {'predictions': predictions}
+    if predictor.training_runs:
+        body['training'] = predictor.training_runs
+    return body
+
+
 @app.route('/api/evaluate', methods=['POST'])
 @require_auth(['manager', 'analyst'])
 def evaluate():
     try:
         data = request.get_json(silent=True) or {}
-        sales_data = data.get('sales_data')
         training_weeks = int(data.get('training_weeks', 4))
         algorithm = data.get('algorithm', 'linear_regression')
 
-        ok, msg = validate_sales_data(sales_data)
-        if not ok:
+        sales_frame, msg, status = _load_sales_frame(data)
+        if sales_frame is None:
             write_audit_event('evaluate', 'failed', {'reason': msg, 'user': request.user['username']})
-            return jsonify({'error': msg}), 400
+            return jsonify({'error': msg}), status
         if algorithm not in ALL_ALGORITHMS:
             return jsonify({'error': f'Unsupported algorithm: {algorithm}'}), 400
+        folds, mode, error = _backtest_params(data)
+        time_budget_ms, budget_error = _time_budget_param(data)
+        if error or budget_error:
+            return jsonify({'error': error or budget_error}), 400
 
-        evaluator = ModelEvaluator(algorithm=algorithm)
-        metrics = evaluator.evaluate(sales_data, training_weeks)
+        evaluator = ModelEvaluator(algorithm=algorithm, folds=folds, mode=mode, budget=_training_budget(time_budget_ms))
+        metrics = evaluator.evaluate(sales_frame, training_weeks)
         write_audit_event(
             'evaluate',
             'success',
@@ -113,9 +325,10 @@ def evaluate():
                 'role': request.user['role'],
                 'algorithm': algorithm,
                 'training_weeks': training_weeks,
+                'folds': folds,
             },
         )
-        return jsonify(metrics)
+        return jsonify({**metrics, 'cached': evaluator.cache_hit})
     except Exception as ex:
         write_audit_event('evaluate', 'failed', {'error': str(ex)})
         return jsonify({'error': 'Evaluation request failed'}), 500
@@ -127,12 +340,16 @@ def evaluate_compare():
     """Compare all algorithms at a single training window."""
     try:
         data = request.get_json(silent=True) or {}
-        sales_data = data.get('sales_data')
         training_weeks = int(data.get('training_weeks', 4))
-        ok, msg = validate_sales_data(sales_data)
-        if not ok:
-            return jsonify({'error': msg}), 400
-        results = ModelEvaluator.compare_all(sales_data, training_weeks)
+        sales_frame, msg, status = _load_sales_frame(data)
+        if sales_frame is None:
+            return jsonify({'error': msg}), status
+        folds, mode, error = _backtest_params(data)
+        time_budget_ms, budget_error = _time_budget_param(data)
+        if error or budget_error:
+            return jsonify({'error': error or budget_error}), 400
+        results = ModelEvaluator.compare_all(sales_frame, training_weeks, folds=folds, mode=mode,
+                                             budget=_training_budget(time_budget_ms))
         write_audit_event('evaluate_compare', 'success', {'user': request.user['username'], 'training_weeks': training_weeks})
         return jsonify({'results': results})
     except Exception as ex:
@@ -146,13 +363,17 @@ def evaluate_windows():
     """Compare all algorithms across multiple training windows."""
     try:
         data = request.get_json(silent=True) or {}
-        sales_data = data.get('sales_data')
         windows = data.get('windows', [3, 4, 5, 6, 7, 8])
-        ok, msg = validate_sales_data(sales_data)
-        if not ok:
-            return jsonify({'error': msg}), 400
+        sales_frame, msg, status = _load_sales_frame(data)
+        if sales_frame is None:
+            return jsonify({'error': msg}), status
+        folds, mode, error = _backtest_params(data)
+        time_budget_ms, budget_error = _time_budget_param(data)
+        if error or budget_error:
+            return jsonify({'error': error or budget_error}), 400
 
-        results = ModelEvaluator.compare_training_windows(sales_data, windows)
+        results = ModelEvaluator.compare_training_windows(sales_frame, windows, folds=folds, mode=mode,
+                                                          budget=_training_budget(time_budget_ms))
         write_audit_event('evaluate_windows', 'success', {'user': request.user['username'], 'windows': windows})
         return jsonify(results)
     except Exception as ex:
@@ -160,12 +381,188 @@ def evaluate_windows():
         return jsonify({'error': 'Window comparison request failed'}), 500
 
 
+JOB_KINDS = ('predict', 'evaluate', 'compare', 'windows')
+
+
+def _run_job(kind: str, sales_frame, params: dict, ctx):
+    """Execute a queued job; the return value is stored as the job result.
+
+    Training stops early when the job is cancelled or its ``time_budget_ms``
+    (counted from the job's start) runs out.
+    """
+    budget = _training_budget(params['time_budget_ms'], cancel=ctx)
+    backtest = {'folds': params['folds'], 'mode': params['backtest_mode'], 'budget': budget}
+    if kind == 'predict':
+        predictor = SalesPredictor(algorithm=params['algorithm'], budget=budget)
+        result = _prediction_body(predictor, predictor.predict(sales_frame, params['training_weeks'], forecast_weeks=4))
+    elif kind == 'evaluate':
+        evaluator = ModelEvaluator(algorithm=params['algorithm'], **backtest)
+        result = {**evaluator.evaluate(sales_frame, params['training_weeks']), 'cached': evaluator.cache_hit}
+    elif kind == 'compare':
+        result = {'results': ModelEvaluator.compare_all(sales_frame, params['training_weeks'], progress=ctx.progress, **backtest)}
+    else:
+        result = ModelEvaluator.compare_training_windows(sales_frame, params['windows'], progress=ctx.progress, **backtest)
+    # Cancelling may only have cut training short; the job still ends as cancelled.
+    if ctx.cancelled:
+        raise JobCancelled()
+    return result
+
+
+def _job_visible(job) -> bool:
+    return job is not None and (job.owner == request.user['username'] or request.user['role'] == 'manager')
+
+
+@app.route('/api/jobs', methods=['POST'])
+@require_auth(['manager', 'analyst'])
+def submit_job():
+    """Queue a predict/evaluate/compare/windows run and return its job id immediately."""
+    data = request.get_json(silent=True) or {}
+    kind = data.get('kind')
+    if kind not in JOB_KINDS:
+        return jsonify({'error': f"kind must be one of: {', '.join(JOB_KINDS)}"}), 400
+    try:
+        training_weeks = int(data.get('training_weeks', 4))
+    except (TypeError, ValueError):
+        return jsonify({'error': 'training_weeks must be an integer'}), 400
+    algorithm = data.get('algorithm', 'linear_regression')
+    windows = data.get('windows', [3, 4, 5, 6, 7, 8])
+
+    sales_frame, msg, status = _load_sales_frame(data)
+    if sales_frame is None:
+        write_audit_event('job_submit', 'failed', {'reason': msg, 'user': request.user['username']})
+        return jsonify({'error': msg}), status
+    if kind in ('predict', 'evaluate') and algorithm not in ALL_ALGORITHMS:
+        return jsonify({'error': f'Unsupported algorithm: {algorithm}'}), 400
+    if kind == 'predict' and (training_weeks < 4 or training_weeks > 8):
+        return jsonify({'error': 'training_weeks must be between 4 and 8'}), 400
+    folds, mode, error = _backtest_params(data)
+    time_budget_ms, budget_error = _time_budget_param(data)
+    if error or budget_error:
+        return jsonify({'error': error or budget_error}), 400
+
+    params = {
+        'algorithm': algorithm,
+        'training_weeks': training_weeks,
+        'windows': windows,
+        'folds': folds,
+        'backtest_mode': mode,
+        'time_budget_ms': time_budget_ms,
+        'dataset_id': data.get('dataset_id'),
+    }
+    try:
+        job = JOBS.submit(
+            request.user['username'],
+            kind,
+            params,
+            lambda ctx: _run_job(kind, sales_frame, params, ctx),
+        )
+    except JobLimitError as ex:
+        write_audit_event('job_submit', 'denied', {'reason': str(ex), 'user': request.user['username']})
+        return jsonify({'error': str(ex)}), 429
+
+    write_audit_event('job_submit', 'success', {'user': request.user['username'], 'job_id': job.job_id, 'kind': kind})
+    return jsonify({'job': job.to_dict(include_result=False)}), 202
+
+
+@app.route('/api/jobs', methods=['GET'])
+@require_auth(['manager', 'analyst'])
+def list_jobs():
+    jobs = JOBS.list_for_owner(request.user['username'])
+    return jsonify({'jobs': [job.to_dict(include_result=False) for job in jobs]})
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+@require_auth(['manager', 'analyst'])
+def get_job(job_id: str):
+    job = JOBS.get(job_id)
+    if not _job_visible(job):
+        return jsonify({'error': f'Unknown job: {job_id}'}), 404
+    return jsonify({'job': job.to_dict()})
+
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+@require_auth(['manager', 'analyst'])
+def cancel_job(job_id: str):
+    if not _job_visible(JOBS.get(job_id)):
+        return jsonify({'error': f'Unknown job: {job_id}'}), 404
+    job = JOBS.cancel(job_id)
+    write_audit_event('job_cancel', 'success', {'user': request.user['username'], 'job_id': job_id})
+    return jsonify({'job': job.to_dict(include_result=False)})
+
+
 @app.route('/api/algorithms', methods=['GET'])
 @require_auth()
 def list_algorithms():
-    """Return list of available algorithm keys."""
+    """Return list of algorithm keys and whether each one's backend is installed."""
     write_audit_event('list_algorithms', 'success', {'user': request.user['username']})
-    return jsonify({'algorithms': ALL_ALGORITHMS})
+    return jsonify({'algorithms': ALL_ALGORITHMS, 'availability': algorithm_availability()})
+
+
+@app.route('/api/metrics', methods=['GET'])
+@require_auth(['manager'])
+def metrics():
+    """Request, stage and per-algorithm latency histograms in the Prometheus text format."""
+    return Response(METRICS.render(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/api/models/registry', methods=['GET'])
+@require_auth(['manager'])
+def model_registry():
+    """Settings, counters and artifact metadata of the on-disk model registry."""
+    return jsonify({'enabled': MODEL_REGISTRY_ENABLED, 'stats': MODEL_REGISTRY.stats(), 'artifacts': MODEL_REGISTRY.list()})
+
+
+@app.route('/api/models/registry/gc', methods=['POST'])
+@require_auth(['manager'])
+def collect_model_registry():
+    removed = MODEL_REGISTRY.gc()
+    write_audit_event('model_registry_gc', 'success', {'user': request.user['username'], 'removed': removed})
+    return jsonify({'removed': removed, 'stats': MODEL_REGISTRY.stats()})
+
+
+@app.route('/api/profiles/arm', methods=['GET'])
+@require_auth(['manager'], profile=False)
+def profiler_status():
+    return jsonify({'armed': PROFILER.status()})
+
+
+@app.route('/api/profiles/arm', methods=['POST'])
+@require_auth(['manager'], profile=False)
+def arm_profiler():
+    """Profile the next ``count`` authenticated requests, optionally only to ``endpoint`` (e.g. ``/api/evaluate/windows``)."""
+    data = request.get_json(silent=True) or {}
+    try:
+        armed = PROFILER.arm(int(data.get('count', 1)), data.get('mode'), data.get('endpoint'))
+    except (TypeError, ValueError) as ex:
+        return jsonify({'error': str(ex)}), 400
+    write_audit_event('profiler_arm', 'success', {'user': request.user['username'], **armed})
+    return jsonify({'armed': armed})
+
+
+@app.route('/api/profiles', methods=['GET'])
+@require_auth(['manager'], profile=False)
+def list_profiles():
+    return jsonify({'profiles': PROFILER.store.list()})
+
+
+@app.route('/api/profiles/<profile_id>', methods=['GET'])
+@require_auth(['manager'], profile=False)
+def get_profile(profile_id: str):
+    meta = PROFILER.store.get(profile_id)
+    if meta is None:
+        return jsonify({'error': f'Unknown profile: {profile_id}'}), 404
+    return jsonify({'profile': meta})
+
+
+@app.route('/api/profiles/<profile_id>/<kind>', methods=['GET'])
+@require_auth(['manager'], profile=False)
+def download_profile(profile_id: str, kind: str):
+    """Download ``collapsed`` stacks (sample mode, for flamegraph tools) or ``pstats`` data (cprofile mode)."""
+    path = PROFILER.store.data_path(profile_id, kind)
+    if path is None:
+        return jsonify({'error': f'No {kind} data for profile: {profile_id}'}), 404
+    mimetype = 'text/plain' if kind == 'collapsed' else 'application/octet-stream'
+    return send_file(path, mimetype=mimetype, as_attachment=True, download_name=os.path.basename(path))
 
 
 @app.route('/api/health', methods=['GET'])
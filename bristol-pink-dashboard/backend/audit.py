@@ -0,0 +1,276 @@
+"""Buffered audit-log sink.
+
+Request threads hand finished JSON lines to a bounded queue and return; a
+background thread drains it in batches, fsyncs on an interval and rotates the
+log by size or age into gzip-compressed segments next to it. ``flush()`` waits
+until everything queued so far is on disk, and ``close()`` (registered with
+``atexit``) drains the queue before the process exits.
+"""
+from __future__ import annotations
+
+import atexit
+import glob
+import gzip
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime, timezone
+
+
+AUDIT_LOG_PATH = os.environ.get("AUDIT_LOG_PATH", os.path.join(os.path.dirname(__file__), "logs", "audit.log"))
+AUDIT_QUEUE_SIZE = int(os.environ.get("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.environ.get("AUDIT_BATCH_SIZE", "256"))
+AUDIT_FSYNC_INTERVAL_SECONDS = float(os.environ.get("AUDIT_FSYNC_INTERVAL_SECONDS", "1.0"))
+AUDIT_MAX_BYTES = int(os.environ.get("AUDIT_MAX_BYTES", str(10 * 1024 * 1024)))
+AUDIT_ROTATE_SECONDS = int(os.environ.get("AUDIT_ROTATE_SECONDS", "86400"))
+AUDIT_BACKUP_COUNT = int(os.environ.get("AUDIT_BACKUP_COUNT", "14"))
+AUDIT_OVERFLOW = os.environ.get("AUDIT_OVERFLOW", "drop_oldest")
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_new", "block")
+
+_STOP = object()
+
+
+class AuditLogWriter:
+    """Append-only JSON-lines log written from a background thread.
+
+    ``overflow`` decides what happens when the queue is full: ``drop_oldest``
+    discards the oldest queued line, ``drop_new`` discards the incoming line
+    and ``block`` makes the caller wait for space. Dropped lines are counted
+    in ``stats()``. ``max_bytes`` or ``rotate_seconds`` of 0 disable that
+    rotation trigger; ``backup_count`` compressed segments are kept.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        queue_size: int = AUDIT_QUEUE_SIZE,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        fsync_interval: float = AUDIT_FSYNC_INTERVAL_SECONDS,
+        max_bytes: int = AUDIT_MAX_BYTES,
+        rotate_seconds: int = AUDIT_ROTATE_SECONDS,
+        backup_count: int = AUDIT_BACKUP_COUNT,
+        overflow: str = AUDIT_OVERFLOW,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.fsync_interval = fsync_interval
+        self.max_bytes = max_bytes
+        self.rotate_seconds = rotate_seconds
+        self.backup_count = backup_count
+        self.overflow = overflow
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._closed = False
+        self._file = None
+        self._opened_at = 0.0
+        self._last_fsync = 0.0
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+
+    # -- producer side --------------------------------------------------------
+
+    def write(self, line: str) -> None:
+        """Queue one log line (without trailing newline)."""
+        if self._closed:
+            # After shutdown, fall back to a direct append rather than losing the line.
+            self._write_direct(line)
+            return
+        self._ensure_thread()
+        if self.overflow == "block":
+            self._queue.put(line)
+            return
+        try:
+            self._queue.put_nowait(line)
+            return
+        except queue.Full:
+            pass
+        with self._lock:
+            self.dropped += 1
+        if self.overflow == "drop_oldest":
+            self._replace_oldest_line(line)
+
+    def _replace_oldest_line(self, line: str) -> None:
+        """Swap the oldest queued line for ``line`` in one step.
+
+        Flush events and the stop sentinel stay queued, and no other producer
+        can take the freed slot in between. If only control items are queued,
+        ``line`` is the one dropped.
+        """
+        q = self._queue
+        with q.mutex:
+            for i, item in enumerate(q.queue):
+                if isinstance(item, str):
+                    del q.queue[i]
+                    q.queue.append(line)
+                    q.not_empty.notify()
+                    return
+
+    def flush(self, timeout: float | None = 5.0) -> bool:
+        """Block until every line queued before this call is written and fsynced."""
+        if self._thread is None or not self._thread.is_alive():
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: float | None = 10.0) -> None:
+        """Drain the queue, fsync and stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "rotations": self.rotations,
+        }
+
+    def _ensure_thread(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="audit-log", daemon=True)
+                self._thread.start()
+
+    def _write_direct(self, line: str) -> None:
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self.written += 1
+
+    # -- writer thread --------------------------------------------------------
+
+    def _run(self) -> None:
+        try:
+            while True:
+                item = self._queue.get()
+                batch, waiters, stop = [], [], False
+                while True:
+                    if item is _STOP:
+                        stop = True
+                    elif isinstance(item, threading.Event):
+                        waiters.append(item)
+                    else:
+                        batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        break
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                if stop:
+                    # Lines queued by callers racing close() are still written.
+                    while True:
+                        try:
+                            item = self._queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        if isinstance(item, threading.Event):
+                            waiters.append(item)
+                        elif item is not _STOP:
+                            batch.append(item)
+                try:
+                    if batch:
+                        self._write_batch(batch)
+                    if waiters or stop:
+                        self._sync()
+                except OSError:
+                    # Keep serving later events (e.g. after the disk frees up).
+                    with self._lock:
+                        self.dropped += len(batch)
+                    if self._file is not None:
+                        self._file.close()
+                        self._file = None
+                for waiter in waiters:
+                    waiter.set()
+                if stop:
+                    return
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def _open(self) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._opened_at = time.time()
+
+    def _write_batch(self, batch: list[str]) -> None:
+        if self._file is None:
+            self._open()
+        elif self._should_rotate():
+            self._rotate()
+        self._file.write("\n".join(batch) + "\n")
+        self._file.flush()
+        self.written += len(batch)
+        if time.monotonic() - self._last_fsync >= self.fsync_interval:
+            self._sync()
+
+    def _sync(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._last_fsync = time.monotonic()
+
+    def _should_rotate(self) -> bool:
+        size = self._file.tell()
+        if size == 0:
+            return False
+        if self.max_bytes and size >= self.max_bytes:
+            return True
+        return bool(self.rotate_seconds) and time.time() - self._opened_at >= self.rotate_seconds
+
+    def _rotate(self) -> None:
+        self._sync()
+        current = os.fstat(self._file.fileno()).st_ino
+        self._file.close()
+        self._file = None
+        try:
+            still_ours = os.stat(self.path).st_ino == current
+        except FileNotFoundError:
+            still_ours = False
+        # Another process sharing the file may already have rotated it; then just reopen.
+        if still_ours:
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+            root, ext = os.path.splitext(self.path)
+            segment = f"{root}-{stamp}{ext}"
+            os.replace(self.path, segment)
+            with open(segment, "rb") as src, gzip.open(segment + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(segment)
+            self.rotations += 1
+            self._prune()
+        self._open()
+
+    def segments(self) -> list[str]:
+        """Compressed rotated segments, oldest first."""
+        root, ext = os.path.splitext(self.path)
+        return sorted(glob.glob(f"{glob.escape(root)}-*{ext}.gz"))
+
+    def _prune(self) -> None:
+        segments = self.segments()
+        for old in segments[:max(0, len(segments) - self.backup_count)]:
+            os.remove(old)
+
+
+AUDIT_LOG = AuditLogWriter(AUDIT_LOG_PATH)
+atexit.register(AUDIT_LOG.close)
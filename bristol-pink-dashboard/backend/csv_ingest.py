@@ -0,0 +1,245 @@
+"""Server-side ingestion of cafe sales CSV exports.
+
+Accepts the same shapes as the browser parser (``src/services/csvParser.ts``):
+
+- wide: ``Date,Cappuccino,Americano`` with one column per product, optionally
+  with the product names on a second header row (``Date,Number Sold`` then
+  ``,Cappuccino,Americano``);
+- long: ``Date,Product,Units Sold`` (``Product Name`` / ``Number Sold`` also
+  accepted);
+- single series: ``Date,Number Sold`` for one product named by the caller.
+
+Dates are day-first (``01/03/2025`` is 1 March). The file is read in chunks of
+``CSV_CHUNK_ROWS`` lines and each chunk is reduced to numpy date, product-code
+and unit arrays, so the text is never held in memory as a whole. The result
+goes through the same validation as JSON ``sales_data``.
+"""
+from __future__ import annotations
+
+import csv
+import os
+import warnings
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_numeric_dtype
+
+from security import validate_sales_frame
+
+
+CSV_CHUNK_ROWS = int(os.environ.get("CSV_CHUNK_ROWS", "50000"))
+CSV_MAX_ROWS = int(os.environ.get("CSV_MAX_ROWS", "5000000"))
+
+PRODUCT_HEADERS = ("product", "product name")
+UNITS_HEADERS = ("units sold", "unitssold", "number sold", "numbersold")
+
+
+class _PrefixedReader:
+    """File-like reader that yields ``prefix`` before the rest of ``stream``."""
+
+    def __init__(self, prefix: str, stream):
+        self._prefix = prefix
+        self._stream = stream
+
+    def read(self, size: int = -1) -> str:
+        if not self._prefix:
+            return self._stream.read(size)
+        if size is None or size < 0:
+            out, self._prefix = self._prefix + self._stream.read(), ""
+            return out
+        out, self._prefix = self._prefix[:size], self._prefix[size:]
+        return out
+
+
+def _split_line(line: str) -> list[str]:
+    return [cell.strip() for cell in next(csv.reader([line]), [])]
+
+
+def _is_number(text: str) -> bool:
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def _read_header(stream) -> tuple[list[str], str]:
+    """Return the column names and any data text consumed while looking for them."""
+    header = _split_line(stream.readline())
+    second = stream.readline()
+    cells = _split_line(second)
+    names = [c for c in cells[1:] if c]
+    # Two-row header: ",Cappuccino,Americano" under "Date,Number Sold,".
+    if cells and cells[0] == "" and names and not any(_is_number(n) for n in names):
+        return [header[0] if header else "Date", *names], ""
+    return header, second
+
+
+def _parse_day_first(values: pd.Series) -> pd.Series:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        dates = pd.to_datetime(values, format="%d/%m/%Y", errors="coerce")
+        # ISO dates are unambiguous; anything else is read day-first.
+        for fallback in ({"format": "ISO8601"}, {"format": "mixed", "dayfirst": True}):
+            retry = dates.isna().to_numpy() & (values != "").to_numpy()
+            if not retry.any():
+                break
+            dates[retry] = pd.to_datetime(values[retry], errors="coerce", **fallback)
+    return dates
+
+
+class _Collector:
+    """Accumulates per-chunk numpy arrays and dictionary-encodes products."""
+
+    def __init__(self):
+        self.categories: list[str] = []
+        self._codes: dict[str, int] = {}
+        self.dates: list[np.ndarray] = []
+        self.codes: list[np.ndarray] = []
+        self.units: list[np.ndarray] = []
+        self.rows = 0
+
+    def code(self, product: str) -> int:
+        code = self._codes.get(product)
+        if code is None:
+            code = self._codes[product] = len(self.categories)
+            self.categories.append(product)
+        return code
+
+    def add(self, dates: np.ndarray, codes: np.ndarray, units: np.ndarray) -> None:
+        self.dates.append(dates)
+        self.codes.append(codes.astype(np.int32))
+        self.units.append(units)
+        self.rows += len(units)
+
+    def columns(self) -> dict:
+        return {
+            "dates": np.concatenate(self.dates) if self.dates else np.array([], dtype="datetime64[ns]"),
+            "products": {
+                "categories": self.categories,
+                "codes": np.concatenate(self.codes) if self.codes else np.array([], dtype=np.int32),
+            },
+            "units": np.concatenate(self.units) if self.units else np.array([], dtype=np.float64),
+        }
+
+
+def read_sales_csv(
+    stream,
+    product: str | None = None,
+    chunk_rows: int = CSV_CHUNK_ROWS,
+    max_rows: int = CSV_MAX_ROWS,
+) -> tuple[bool, str, pd.DataFrame | None, str | None]:
+    """Parse a text stream holding a sales CSV.
+
+    Returns ``(ok, message, frame, layout)`` where ``layout`` is ``wide``,
+    ``long`` or ``single``. Rows with an empty date and empty cells in wide
+    files are skipped, as in the browser parser; other bad values are
+    reported with their 1-based line number.
+    """
+    header, pending = _read_header(stream)
+    lowered = [h.lower() for h in header]
+    if "date" not in lowered:
+        return False, 'CSV is missing a "Date" column.', None, None
+    date_col = header[lowered.index("date")]
+    product_col = next((header[lowered.index(h)] for h in PRODUCT_HEADERS if h in lowered), None)
+    units_col = next((header[lowered.index(h)] for h in UNITS_HEADERS if h in lowered), None)
+    value_cols = [h for h, low in zip(header, lowered) if h and low != "date" and low not in PRODUCT_HEADERS + UNITS_HEADERS]
+
+    if value_cols:
+        layout = "wide"
+    elif product_col is not None and units_col is not None:
+        layout = "long"
+    elif units_col is not None:
+        if not product or not product.strip():
+            return False, "A product name is required for a single-series CSV", None, None
+        layout = "single"
+    else:
+        return False, "CSV has no product or units columns", None, None
+
+    out = _Collector()
+    text_cols = [c for c in (date_col, product_col) if c is not None]
+    reader = pd.read_csv(
+        _PrefixedReader(pending, stream),
+        header=None,
+        names=header,
+        # Unit columns are parsed as numbers by the C parser; blank cells become NaN.
+        dtype={c: str for c in text_cols},
+        keep_default_na=False,
+        na_values=[""],
+        skipinitialspace=True,
+        # Blank lines are kept (and skipped as dateless rows) so line numbers stay exact.
+        skip_blank_lines=False,
+        chunksize=max(1, chunk_rows),
+    )
+    # Line numbers as seen in the file: header line(s) first, then data.
+    first_line = 2 if pending else 3
+    for chunk in reader:
+        lines = first_line + np.arange(len(chunk))
+        first_line += len(chunk)
+        raw_dates = chunk[date_col].fillna("").str.strip()
+        keep = (raw_dates != "").to_numpy()
+        dates = _parse_day_first(raw_dates)
+        bad = keep & dates.isna().to_numpy()
+        if bad.any():
+            i = int(np.flatnonzero(bad)[0])
+            return False, f"Line {lines[i]} has invalid date: {raw_dates.iat[i]}", None, layout
+        dates = dates.to_numpy()
+
+        if layout == "wide":
+            columns = value_cols
+            codes = np.array([out.code(col) for col in value_cols], dtype=np.int32)[:, None]
+        else:
+            columns = [units_col]
+            if layout == "long":
+                names = chunk[product_col].fillna("").str.strip()
+                local, uniques = pd.factorize(names)
+                codes = np.array([out.code(p) for p in uniques], dtype=np.int32)[local][None, :]
+                keep = keep & (names != "").to_numpy()
+            else:
+                codes = np.full((1, 1), out.code(product.strip()), dtype=np.int32)
+        ok, message = _add_values(out, chunk[columns], dates, lines, keep, codes)
+        if not ok:
+            return False, message, None, layout
+
+        if out.rows > max_rows:
+            return False, f"CSV has more than {max_rows} sales rows", None, layout
+
+    if out.rows == 0:
+        return False, "No valid rows found in CSV. Check date format and product columns.", None, layout
+    ok, message, frame = validate_sales_frame(out.columns())
+    return ok, message, frame, layout
+
+
+def _add_values(out: _Collector, block: pd.DataFrame, dates: np.ndarray, lines: np.ndarray,
+                keep: np.ndarray, codes: np.ndarray) -> tuple[bool, str]:
+    """Melt ``block`` (rows x unit columns) column by column into ``out``.
+
+    ``codes`` broadcasts to (columns, rows): one code per column for wide
+    files, one per row for long files.
+    """
+    units = np.empty((len(block.columns), len(block)), dtype=np.float64)
+    errors = []
+    for j, column in enumerate(block.columns):
+        values = block[column]
+        if is_numeric_dtype(values):
+            units[j] = values.to_numpy(dtype=np.float64)
+            continue
+        # Only columns holding some non-numeric text take the string path.
+        text = values.fillna("").astype(str).str.strip()
+        units[j] = pd.to_numeric(text, errors="coerce").to_numpy(dtype=np.float64)
+        bad = np.flatnonzero(keep & (text != "").to_numpy() & np.isnan(units[j]))
+        if bad.size:
+            errors.append((lines[bad[0]], j, f"Line {lines[bad[0]]} has non-numeric {column}: {text.iat[bad[0]]}"))
+    present = keep & ~np.isnan(units)
+    negative = np.argwhere((present & (units < 0)).T)  # (row, column) pairs in file order
+    if negative.size:
+        i, j = negative[0]
+        errors.append((lines[i], j, f"Line {lines[i]} has negative {block.columns[j]}: {units[j, i]:g}"))
+    if errors:
+        return False, min(errors)[2]
+    out.add(
+        np.broadcast_to(dates, units.shape)[present],
+        np.broadcast_to(codes, units.shape)[present],
+        units[present],
+    )
+    return True, "ok"
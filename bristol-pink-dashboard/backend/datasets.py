@@ -0,0 +1,107 @@
+"""Server-side store of validated sales datasets referenced by ``dataset_id``."""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from models.frames import frame_fingerprint
+
+
+DATASET_STORE_MAX = int(os.environ.get("DATASET_STORE_MAX", "32"))
+
+
+@dataclass
+class Dataset:
+    dataset_id: str
+    fingerprint: str
+    frame: pd.DataFrame
+    owner: str
+    created_at: datetime
+    parent_id: str | None = None
+
+    def summary(self) -> dict:
+        dates = self.frame["date"]
+        return {
+            "dataset_id": self.dataset_id,
+            "fingerprint": self.fingerprint,
+            "rows": int(len(self.frame)),
+            "products": [str(p) for p in self.frame["product"].unique()],
+            "start_date": dates.min().strftime("%Y-%m-%d"),
+            "end_date": dates.max().strftime("%Y-%m-%d"),
+            "created_at": self.created_at.isoformat(),
+            "parent_id": self.parent_id,
+        }
+
+
+class DatasetStore:
+    """Bounded, least-recently-used map of dataset_id -> Dataset.
+
+    Datasets are keyed by their owner and content hash, so a user uploading
+    the same rows twice gets the existing entry instead of a second copy,
+    while another user uploading them gets a dataset of their own.
+    """
+
+    def __init__(self, max_datasets: int = DATASET_STORE_MAX):
+        self.max_datasets = max_datasets
+        self._datasets: OrderedDict[str, Dataset] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, frame: pd.DataFrame, owner: str, parent_id: str | None = None) -> Dataset:
+        fingerprint = frame_fingerprint(frame)
+        dataset_id = hashlib.sha256(f"{owner}\0{fingerprint}".encode("utf-8")).hexdigest()[:24]
+        with self._lock:
+            existing = self._datasets.get(dataset_id)
+            if existing is not None:
+                self._datasets.move_to_end(dataset_id)
+                return existing
+            dataset = Dataset(
+                dataset_id=dataset_id,
+                fingerprint=fingerprint,
+                frame=frame.reset_index(drop=True),
+                owner=owner,
+                created_at=datetime.now(timezone.utc),
+                parent_id=parent_id,
+            )
+            self._datasets[dataset_id] = dataset
+            while len(self._datasets) > self.max_datasets:
+                self._datasets.popitem(last=False)
+            return dataset
+
+    def append(self, dataset_id: str, rows: pd.DataFrame, owner: str) -> tuple[Dataset | None, str]:
+        """Store ``dataset_id``'s rows followed by ``rows`` as a new dataset.
+
+        Appended rows must be dated after the dataset's last day. Returns
+        ``(dataset, "ok")``, or ``(None, reason)`` when the parent is unknown
+        or the dates overlap. The parent stays available under its own id.
+        """
+        parent = self.get(dataset_id)
+        if parent is None:
+            return None, f"Unknown dataset_id: {dataset_id}"
+        last_day = parent.frame["date"].max()
+        if rows["date"].min() <= last_day:
+            return None, f"Appended rows must be dated after {last_day.strftime('%Y-%m-%d')}"
+        frame = pd.concat([parent.frame, rows], ignore_index=True)
+        return self.put(frame, owner, parent_id=parent.dataset_id), "ok"
+
+    def get(self, dataset_id: str) -> Dataset | None:
+        with self._lock:
+            dataset = self._datasets.get(dataset_id)
+            if dataset is not None:
+                self._datasets.move_to_end(dataset_id)
+            return dataset
+
+    def delete(self, dataset_id: str) -> bool:
+        with self._lock:
+            return self._datasets.pop(dataset_id, None) is not None
+
+    def __len__(self) -> int:
+        return len(self._datasets)
+
+
+DATASETS = DatasetStore()
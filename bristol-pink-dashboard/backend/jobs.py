@@ -0,0 +1,410 @@
+"""Background job subsystem for long-running predictions and evaluations.
+
+Jobs are submitted to a bounded thread pool and their state is kept in a
+``JobStore``. The in-memory store is the default; the SQLite store keeps job
+state and results on disk so they outlive a worker restart and can be read
+(or cancelled) from any worker process sharing the database file.
+"""
+from __future__ import annotations
+
+import json
+import os
+import secrets
+import socket
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+
+JOB_STORE = os.environ.get("JOB_STORE", "memory")
+JOB_DB_PATH = os.environ.get("JOB_DB_PATH", os.path.join(os.path.dirname(__file__), "data", "jobs.db"))
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+JOB_MAX_ACTIVE_PER_USER = int(os.environ.get("JOB_MAX_ACTIVE_PER_USER", "3"))
+JOB_RESULT_TTL_SECONDS = int(os.environ.get("JOB_RESULT_TTL_SECONDS", "3600"))
+
+ACTIVE_STATUSES = ("queued", "running")
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _worker_alive(worker: str | None) -> bool:
+    """Whether the process that owns a job is still running (best effort, local host only)."""
+    host, _, pid = (worker or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    if os.name == "nt":
+        return int(pid) == os.getpid()
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once cancellation has been requested."""
+
+
+class JobLimitError(Exception):
+    """Raised when a user already has the maximum number of active jobs."""
+
+
+@dataclass
+class Job:
+    job_id: str
+    owner: str
+    kind: str
+    params: dict
+    status: str = "queued"
+    progress: float = 0.0
+    result: dict | list | None = None
+    error: str | None = None
+    cancel_requested: bool = False
+    worker: str = field(default_factory=_worker_id)
+    created_at: datetime = field(default_factory=_utcnow)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    def to_dict(self, include_result: bool = True) -> dict:
+        payload = {
+            "job_id": self.job_id,
+            "owner": self.owner,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status,
+            "progress": round(self.progress, 3),
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+        if include_result:
+            payload["result"] = self.result
+        return payload
+
+
+class JobStore(ABC):
+    """Persistence interface for job state."""
+
+    @abstractmethod
+    def save(self, job: Job) -> None:
+        """Insert or replace a job."""
+        ...
+
+    @abstractmethod
+    def update(self, job_id: str, **changes) -> Job | None:
+        """Apply field changes to a stored job and return it, or None if unknown."""
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Job | None:
+        ...
+
+    @abstractmethod
+    def list_for_owner(self, owner: str) -> list[Job]:
+        ...
+
+    @abstractmethod
+    def count_active(self, owner: str) -> int:
+        ...
+
+    @abstractmethod
+    def purge_finished_before(self, cutoff: datetime) -> int:
+        """Delete finished jobs older than ``cutoff``; returns the number removed."""
+        ...
+
+
+class InMemoryJobStore(JobStore):
+    def __init__(self):
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def save(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.job_id] = job
+
+    def update(self, job_id: str, **changes) -> Job | None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                for key, value in changes.items():
+                    setattr(job, key, value)
+            return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_for_owner(self, owner: str) -> list[Job]:
+        with self._lock:
+            return sorted((j for j in self._jobs.values() if j.owner == owner), key=lambda j: j.created_at)
+
+    def count_active(self, owner: str) -> int:
+        with self._lock:
+            return sum(1 for j in self._jobs.values() if j.owner == owner and j.status in ACTIVE_STATUSES)
+
+    def purge_finished_before(self, cutoff: datetime) -> int:
+        with self._lock:
+            expired = [
+                job_id
+                for job_id, j in self._jobs.items()
+                if j.status in FINISHED_STATUSES and j.finished_at is not None and j.finished_at < cutoff
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+            return len(expired)
+
+
+class SQLiteJobStore(JobStore):
+    """Job store backed by a SQLite file in WAL mode.
+
+    Finished jobs survive a restart. Jobs that were still queued or running in
+    a process that no longer exists are marked failed on start-up, since their
+    in-memory inputs are gone; jobs owned by live sibling workers are left alone.
+    """
+
+    _COLUMNS = (
+        "job_id", "owner", "kind", "params", "status", "progress", "result", "error",
+        "cancel_requested", "worker", "created_at", "started_at", "finished_at",
+    )
+
+    def __init__(self, path: str = JOB_DB_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                params TEXT NOT NULL,
+                status TEXT NOT NULL,
+                progress REAL NOT NULL,
+                result TEXT,
+                error TEXT,
+                cancel_requested INTEGER NOT NULL DEFAULT 0,
+                worker TEXT,
+                created_at TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_owner_status ON jobs (owner, status)")
+        self._fail_orphaned_jobs()
+
+    def _fail_orphaned_jobs(self) -> None:
+        rows = self._conn.execute(
+            "SELECT job_id, worker FROM jobs WHERE status IN ('queued', 'running')"
+        ).fetchall()
+        finished_at = _utcnow().isoformat()
+        orphaned = [(finished_at, job_id) for job_id, worker in rows if not _worker_alive(worker)]
+        self._conn.executemany(
+            "UPDATE jobs SET status = 'failed', error = 'Interrupted by server restart', finished_at = ? "
+            "WHERE job_id = ?",
+            orphaned,
+        )
+
+    @staticmethod
+    def _encode(column: str, value):
+        if column not in SQLiteJobStore._COLUMNS:
+            raise KeyError(column)
+        if column in ("params", "result"):
+            return json.dumps(value) if value is not None else None
+        if column == "cancel_requested":
+            return int(value)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
+
+    @staticmethod
+    def _to_row(job: Job) -> tuple:
+        data = asdict(job)
+        return tuple(SQLiteJobStore._encode(c, data[c]) for c in SQLiteJobStore._COLUMNS)
+
+    @staticmethod
+    def _from_row(row: tuple) -> Job:
+        data = dict(zip(SQLiteJobStore._COLUMNS, row))
+        data["params"] = json.loads(data["params"])
+        data["result"] = json.loads(data["result"]) if data["result"] is not None else None
+        data["cancel_requested"] = bool(data["cancel_requested"])
+        for key in ("created_at", "started_at", "finished_at"):
+            data[key] = datetime.fromisoformat(data[key]) if data[key] else None
+        return Job(**data)
+
+    def save(self, job: Job) -> None:
+        placeholders = ", ".join("?" for _ in self._COLUMNS)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO jobs ({', '.join(self._COLUMNS)}) VALUES ({placeholders})",
+                self._to_row(job),
+            )
+
+    def update(self, job_id: str, **changes) -> Job | None:
+        # Only the changed columns are written, so a concurrent cancel request
+        # from another process is not overwritten by a progress update.
+        columns = {key: self._encode(key, value) for key, value in changes.items()}
+        assignments = ", ".join(f"{key} = ?" for key in columns)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*columns.values(), job_id))
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE job_id = ?", (job_id,)
+            ).fetchone()
+        return self._from_row(row) if row else None
+
+    def list_for_owner(self, owner: str) -> list[Job]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE owner = ? ORDER BY created_at", (owner,)
+            ).fetchall()
+        return [self._from_row(r) for r in rows]
+
+    def count_active(self, owner: str) -> int:
+        with self._lock:
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE owner = ? AND status IN ('queued', 'running')", (owner,)
+            ).fetchone()
+        return int(count)
+
+    def purge_finished_before(self, cutoff: datetime) -> int:
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed', 'cancelled') AND finished_at < ?",
+                (cutoff.isoformat(),),
+            )
+        return cur.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class JobContext:
+    """Handle given to a running job for reporting progress and observing cancellation."""
+
+    def __init__(self, manager: "JobManager", job_id: str):
+        self._manager = manager
+        self.job_id = job_id
+
+    @property
+    def cancelled(self) -> bool:
+        return self._manager._is_cancel_requested(self.job_id)
+
+    def progress(self, fraction: float) -> None:
+        """Record progress in [0, 1]; raises JobCancelled if the job was cancelled."""
+        if self.cancelled:
+            raise JobCancelled()
+        self._manager._update(self.job_id, progress=max(0.0, min(1.0, float(fraction))))
+
+
+class JobManager:
+    """Runs jobs on a bounded thread pool and records their state in a JobStore."""
+
+    def __init__(
+        self,
+        store: JobStore,
+        max_workers: int = JOB_WORKERS,
+        max_active_per_user: int = JOB_MAX_ACTIVE_PER_USER,
+        result_ttl_seconds: int = JOB_RESULT_TTL_SECONDS,
+    ):
+        self.store = store
+        self.max_active_per_user = max_active_per_user
+        self.result_ttl = timedelta(seconds=result_ttl_seconds)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._futures: dict = {}
+        self._cancelled: set[str] = set()
+        self._lock = threading.Lock()
+
+    def submit(self, owner: str, kind: str, params: dict, func: Callable[[JobContext], dict | list]) -> Job:
+        """Queue ``func(ctx)``; its return value becomes the job result."""
+        self.purge_expired()
+        with self._lock:
+            if self.store.count_active(owner) >= self.max_active_per_user:
+                raise JobLimitError(f"At most {self.max_active_per_user} active jobs per user")
+            job = Job(job_id=secrets.token_urlsafe(12), owner=owner, kind=kind, params=params)
+            self.store.save(job)
+            self._futures[job.job_id] = self._executor.submit(self._run, job.job_id, func)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        self.purge_expired()
+        return self.store.get(job_id)
+
+    def list_for_owner(self, owner: str) -> list[Job]:
+        self.purge_expired()
+        return self.store.list_for_owner(owner)
+
+    def cancel(self, job_id: str) -> Job | None:
+        """Cancel a queued job immediately, or ask a running job to stop at its next progress check."""
+        job = self.store.get(job_id)
+        if job is None or job.status in FINISHED_STATUSES:
+            return job
+        with self._lock:
+            self._cancelled.add(job_id)
+            future = self._futures.get(job_id)
+            if future is not None and future.cancel():
+                self._futures.pop(job_id, None)
+                return self._update(job_id, status="cancelled", finished_at=_utcnow(), cancel_requested=True)
+        return self._update(job_id, cancel_requested=True)
+
+    def purge_expired(self) -> int:
+        return self.store.purge_finished_before(_utcnow() - self.result_ttl)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _is_cancel_requested(self, job_id: str) -> bool:
+        if job_id in self._cancelled:
+            return True
+        job = self.store.get(job_id)
+        # Another worker process may have requested cancellation through a shared store.
+        return job is not None and job.cancel_requested
+
+    def _update(self, job_id: str, **changes) -> Job | None:
+        return self.store.update(job_id, **changes)
+
+    def _run(self, job_id: str, func: Callable[[JobContext], dict | list]) -> None:
+        ctx = JobContext(self, job_id)
+        try:
+            if ctx.cancelled:
+                raise JobCancelled()
+            self._update(job_id, status="running", started_at=_utcnow())
+            result = func(ctx)
+            self._update(job_id, status="succeeded", progress=1.0, result=result, finished_at=_utcnow())
+        except JobCancelled:
+            self._update(job_id, status="cancelled", finished_at=_utcnow())
+        except Exception as ex:
+            self._update(job_id, status="failed", error=str(ex) or ex.__class__.__name__, finished_at=_utcnow())
+        finally:
+            with self._lock:
+                self._futures.pop(job_id, None)
+                self._cancelled.discard(job_id)
+
+
+def create_job_store(kind: str = JOB_STORE) -> JobStore:
+    if kind == "sqlite":
+        return SQLiteJobStore(JOB_DB_PATH)
+    return InMemoryJobStore()
+
+
+JOBS = JobManager(create_job_store())
@@ -1,23 +1,89 @@
-"""Models package – registry of all available predictors."""
-from .linear_regression import LinearRegressionPredictor
-from .random_forest import RandomForestPredictor
-from .gradient_boosting import GradientBoostingPredictor
-from .arima_model import ARIMAPredictor
-from .lstm_model import LSTMPredictor
-
-ALGORITHM_MAP = {
-    'linear_regression': LinearRegressionPredictor,
-    'random_forest': RandomForestPredictor,
-    'gradient_boosting': GradientBoostingPredictor,
-    'arima': ARIMAPredictor,
-    'lstm': LSTMPredictor,
+"""Models package – registry of all available predictors.
+
+Predictor modules are imported on first lookup, so importing the package (and
+the API) does not pull in torch or statsmodels until an ARIMA or LSTM model
+is actually requested.
+"""
+import importlib
+import importlib.util
+from collections.abc import Mapping
+
+# key -> (module, class name, display name, optional backend package)
+_REGISTRY = {
+    'linear_regression': ('.linear_regression', 'LinearRegressionPredictor', 'Linear Regression', None),
+    'random_forest': ('.random_forest', 'RandomForestPredictor', 'Random Forest', None),
+    'gradient_boosting': ('.gradient_boosting', 'GradientBoostingPredictor', 'Gradient Boosting', None),
+    'arima': ('.arima_model', 'ARIMAPredictor', 'ARIMA', 'statsmodels'),
+    'lstm': ('.lstm_model', 'LSTMPredictor', 'LSTM', 'torch'),
 }
 
-ALL_ALGORITHMS = list(ALGORITHM_MAP.keys())
+
+class _LazyAlgorithmMap(Mapping):
+    """Read-only algorithm key -> predictor class mapping that imports on first access."""
+
+    def __init__(self, registry: dict):
+        self._registry = registry
+        self._loaded: dict = {}
+
+    def __getitem__(self, key):
+        cls = self._loaded.get(key)
+        if cls is None:
+            module_name, class_name = self._registry[key][:2]
+            cls = getattr(importlib.import_module(module_name, __name__), class_name)
+            self._loaded[key] = cls
+        return cls
+
+    def __iter__(self):
+        return iter(self._registry)
+
+    def __len__(self) -> int:
+        return len(self._registry)
+
+    def is_loaded(self, key) -> bool:
+        return key in self._loaded
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({list(self._registry)})'
+
+
+ALGORITHM_MAP = _LazyAlgorithmMap(_REGISTRY)
+
+ALL_ALGORITHMS = list(_REGISTRY.keys())
+
+ALGORITHM_NAMES = {key: spec[2] for key, spec in _REGISTRY.items()}
+
+_CLASS_MODULES = {spec[1]: key for key, spec in _REGISTRY.items()}
+
+
+def algorithm_availability() -> dict:
+    """Report, without importing them, whether each algorithm's backend is installed.
+
+    Returns {key: {name, backend, available, loaded}}.
+    """
+    report = {}
+    for key, (_, _, display_name, backend) in _REGISTRY.items():
+        report[key] = {
+            'name': display_name,
+            'backend': backend or 'scikit-learn',
+            'available': backend is None or importlib.util.find_spec(backend) is not None,
+            'loaded': ALGORITHM_MAP.is_loaded(key),
+        }
+    return report
+
+
+def __getattr__(name):
+    # Keep `from models import LSTMPredictor` working without eager imports.
+    key = _CLASS_MODULES.get(name)
+    if key is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    return ALGORITHM_MAP[key]
+
 
 __all__ = [
     'ALGORITHM_MAP',
     'ALL_ALGORITHMS',
+    'ALGORITHM_NAMES',
+    'algorithm_availability',
     'LinearRegressionPredictor',
     'RandomForestPredictor',
     'GradientBoostingPredictor',
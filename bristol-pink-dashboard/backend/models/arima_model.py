@@ -1,6 +1,8 @@
 """ARIMA predictor – uses statsmodels auto_arima-style fitting."""
+import joblib
 import numpy as np
 import pandas as pd
+from collections import Counter
 from datetime import timedelta
 
 try:
@@ -10,6 +12,8 @@ except ImportError:
     HAS_STATSMODELS = False
 
 from .base import BasePredictor
+from .frames import partition_by_product, to_sales_frame
+from .instrumentation import span
 
 
 class ARIMAPredictor(BasePredictor):
@@ -21,11 +25,15 @@ class ARIMAPredictor(BasePredictor):
     """
 
     name = "ARIMA"
+    artifact_backend = 'statsmodels'
 
     def __init__(self, order=(2, 1, 2)):
         self.order = order
         self._model_fit = None
 
+    def _cache_params(self) -> tuple:
+        return (tuple(self.order),)
+
     # -- These are unused for ARIMA but required by the ABC --
     def fit(self, X: np.ndarray, y: np.ndarray) -> None:  # pragma: no cover
         pass
@@ -33,42 +41,78 @@ class ARIMAPredictor(BasePredictor):
     def predict_values(self, X: np.ndarray) -> np.ndarray:  # pragma: no cover
         return np.zeros(X.shape[0])
 
+    def _fit_series(self, ts):
+        model = StatsARIMA(ts, order=self.order)
+        return model.fit(method_kwargs={'warn_convergence': False})
+
+    def _save_artifact(self, fit, path: str) -> None:
+        """Save the fitted parameters and the series; the state space is rebuilt from them on load."""
+        series = fit.model.data.orig_endog
+        joblib.dump({
+            'order': tuple(fit.model.order),
+            'params': np.asarray(fit.params),
+            'dates': series.index.as_unit('ns').asi8,
+            'values': series.to_numpy(dtype=np.float64),
+        }, path)
+
+    def _load_artifact(self, path: str):
+        saved = joblib.load(path, mmap_mode='r')
+        ts = pd.Series(np.array(saved['values']), index=pd.DatetimeIndex(np.array(saved['dates'], dtype='datetime64[ns]'), freq='D'))
+        return StatsARIMA(ts, order=saved['order']).filter(np.array(saved['params']))
+
+    @staticmethod
+    def _extend(shift, ts):
+        """Run the previous fit's parameters over the shifted window, without estimating them again.
+
+        The state space is rebuilt from ``ts``, so dropped leading days leave
+        the model as well as new days entering it.
+        """
+        fit = shift.state.payload
+        try:
+            return StatsARIMA(ts, order=fit.model.order).filter(np.asarray(fit.params))
+        except Exception:  # refit instead
+            return None
+
     # -- Override the high-level predict method --
     def predict(self, sales_data, training_weeks: int, forecast_weeks: int = 4):
+        self.model_updates = Counter()
         if not HAS_STATSMODELS:
             # Graceful fallback – return empty predictions
             return []
 
-        df = pd.DataFrame(sales_data)
-        df['date'] = pd.to_datetime(df['date'])
+        df = to_sales_frame(sales_data)
 
         cutoff_date = df['date'].max() - timedelta(weeks=training_weeks)
-        training_df = df[df['date'] >= cutoff_date].copy()
-
-        products = training_df['product'].unique()
+        with span('partition'):
+            training = partition_by_product(df[df['date'] >= cutoff_date])
         all_predictions: list[dict] = []
 
         last_date = df['date'].max()
         n_forecast = forecast_weeks * 7
 
-        for product in products:
-            product_data = training_df[training_df['product'] == product].copy()
+        for product, product_data in training:
             if len(product_data) < 5:
                 continue
 
-            product_data = product_data.sort_values('date')
             ts = product_data.set_index('date')['unitsSold'].asfreq('D')
             ts = ts.ffill().bfill().fillna(0)
 
             if len(ts) < 5:
                 continue
 
+            cache_key = self._cache_key(product, product_data, training_weeks)
             try:
-                model = StatsARIMA(ts, order=self.order)
-                fit = model.fit(method_kwargs={'warn_convergence': False})
-                forecast = fit.get_forecast(steps=n_forecast)
-                predicted_mean = forecast.predicted_mean.values
-                conf_int = forecast.conf_int(alpha=0.05).values
+                fit = self._lookup_model(cache_key)
+                if fit is None:
+                    fit = self._fit_or_update(
+                        product, product_data, training_weeks,
+                        lambda: self._fit_series(ts), lambda shift: self._extend(shift, ts),
+                    )
+                    self._store_model(cache_key, fit)
+                with span('forecast'):
+                    forecast = fit.get_forecast(steps=n_forecast)
+                    predicted_mean = forecast.predicted_mean.values
+                    conf_int = forecast.conf_int(alpha=0.05).values
             except Exception:
                 # If ARIMA fails for this product, skip
                 continue
@@ -1,29 +1,198 @@
 """Base class for all prediction models."""
+import joblib
 import pandas as pd
 import numpy as np
 from abc import ABC, abstractmethod
+from collections import Counter
 from datetime import timedelta
 
+from .features import add_calendar_features, calendar_features
+from .frames import frame_fingerprint, partition_by_product, to_sales_frame
+from .incremental import WindowShift, WindowState, window_rows
+from .instrumentation import span
+
 
 class BasePredictor(ABC):
     """Abstract base for sales prediction models."""
 
     name: str = "Base"
 
+    # Optional LRUCache of fitted per-product models; SalesPredictor sets it.
+    cache = None
+    # Optional IncrementalStates for updating models as days are appended; SalesPredictor sets it.
+    incremental = None
+    # Optional ModelRegistry persisting cached models on disk; SalesPredictor sets it.
+    registry = None
+    # File suffix and backend package of registry artifacts (see _save_artifact).
+    artifact_suffix = '.joblib'
+    artifact_backend = 'scikit-learn'
+    # True when _update_model gives exactly the model a full fit would.
+    exact_updates = False
+    # Whether _fit_batch fits many windows at once; predict and the evaluator then use it.
+    batched = False
+
+    def _cache_params(self) -> tuple:
+        """Constructor settings that change the fitted model, included in cache keys."""
+        return ()
+
+    def _cache_key(self, product, product_data: pd.DataFrame, training_weeks: int) -> tuple | None:
+        if self.cache is None:
+            return None
+        return (
+            frame_fingerprint(product_data),
+            type(self).__name__,
+            self._cache_params(),
+            training_weeks,
+            product,
+        )
+
+    def _lookup_model(self, cache_key):
+        """The model cached for ``cache_key``, else one loaded from the registry (and then cached).
+
+        Counts the hit in ``model_updates`` as ``cached`` or ``registry``.
+        """
+        if cache_key is None:
+            return None
+        value = self.cache.get(cache_key)
+        if value is not None:
+            self.model_updates['cached'] += 1
+        elif self.registry is not None:
+            with span('registry_load'):
+                value = self.registry.load(self, cache_key)
+            if value is not None:
+                self.cache.put(cache_key, value)
+                self.model_updates['registry'] += 1
+        return value
+
+    def _store_model(self, cache_key, value) -> None:
+        """Cache a newly fitted model, and save it to the registry when there is one."""
+        if cache_key is None:
+            return
+        self.cache.put(cache_key, value)
+        if self.registry is not None:
+            with span('registry_save'):
+                self.registry.save(self, cache_key, value)
+
+    def _save_artifact(self, value, path: str) -> None:
+        """Write a cached model value to ``path`` for the registry.
+
+        Uncompressed joblib keeps numpy arrays memory-mappable by ``_load_artifact``.
+        """
+        joblib.dump(value, path)
+
+    def _load_artifact(self, path: str):
+        return joblib.load(path, mmap_mode='r')
+
+    def _lookup_shift(self, product, product_data: pd.DataFrame, training_weeks: int) -> WindowShift | None:
+        if self.incremental is None:
+            return None
+        return self.incremental.lookup(self, training_weeks, product, *window_rows(product_data))
+
+    def _remember_window(self, product, product_data: pd.DataFrame, training_weeks: int, payload,
+                         appended: int = 0) -> None:
+        if self.incremental is not None and payload is not None:
+            dates, values = window_rows(product_data)
+            self.incremental.remember(self, training_weeks, product, WindowState(dates, values, payload, appended))
+
+    def _incremental_payload(self, dates: np.ndarray, X: np.ndarray, y: np.ndarray):
+        """State needed to update the model just fitted on ``X``/``y``; None if the model cannot be updated."""
+        return None
+
+    def _update_model(self, shift: WindowShift, dates: np.ndarray, X: np.ndarray, y: np.ndarray):
+        """Set ``self.model`` for the shifted window from ``shift.state.payload``.
+
+        Returns the new payload, or None to fall back to a full ``fit``.
+        """
+        return None
+
+    def _fit_or_update(self, product, product_data: pd.DataFrame, training_weeks: int, fit, update):
+        """Return ``fit()``, or ``update(shift)`` when the window has only moved on since the last fit.
+
+        ``update`` may return None to fall back to ``fit``. A non-None result is
+        remembered as the state the next update starts from.
+        """
+        shift = self._lookup_shift(product, product_data, training_weeks)
+        if shift is not None:
+            with span('update'):
+                result = update(shift)
+            if result is not None:
+                self.model_updates['incremental'] += 1
+                self._remember_window(product, product_data, training_weeks, result, shift.state.appended + shift.added)
+                return result
+        with span('fit'):
+            result = fit()
+        self.model_updates['full'] += 1
+        self._remember_window(product, product_data, training_weeks, result)
+        return result
+
+    def _fit_window(self, product, product_data: pd.DataFrame, training_weeks: int, X: np.ndarray, y: np.ndarray) -> None:
+        """Set ``self.model`` for one product's training window."""
+        dates = product_data['date'].to_numpy()
+
+        def fit():
+            self.fit(X, y)
+            return self._incremental_payload(dates, X, y) if self.incremental is not None else None
+
+        self._fit_or_update(product, product_data, training_weeks, fit, lambda shift: self._update_model(shift, dates, X, y))
+
+    def _fit_batch(self, Xs: list[np.ndarray], ys: list[np.ndarray]) -> list[tuple]:
+        """Fit one model per ``(X, y)`` window; used when ``batched`` is set.
+
+        Returns ``(model, residual_std)`` per window, as ``predict`` caches
+        them. Predictors that can fit all windows together override this;
+        the default fits them one by one.
+        """
+        fitted = []
+        for X, y in zip(Xs, ys):
+            self.fit(X, y)
+            fitted.append((self.model, float(np.std(y - self.predict_values(X)))))
+        return fitted
+
+    def _fit_products(self, windows: list[tuple], training_weeks: int) -> list[tuple]:
+        """``(model, residual_std)`` for each ``(product, product_data, cache_key, X, y)`` window.
+
+        Cached models are reused and windows that have only moved on are
+        updated one by one. The remaining windows are fitted in one
+        ``_fit_batch`` call when the predictor is ``batched``, else one by one.
+        """
+        fitted = [None] * len(windows)
+        batch = []
+        for k, (product, product_data, cache_key, X, y) in enumerate(windows):
+            fitted[k] = self._lookup_model(cache_key)
+            if fitted[k] is not None:
+                continue
+            if self.batched and self._lookup_shift(product, product_data, training_weeks) is None:
+                batch.append(k)
+                continue
+            self._fit_window(product, product_data, training_weeks, X, y)
+            fitted[k] = (self.model, float(np.std(y - self.predict_values(X))))
+            self._store_model(cache_key, fitted[k])
+
+        if batch:
+            with span('fit'):
+                results = self._fit_batch([windows[k][3] for k in batch], [windows[k][4] for k in batch])
+            for k, result in zip(batch, results):
+                product, product_data, cache_key, X, y = windows[k]
+                self.model_updates['full'] += 1
+                if self.incremental is not None:
+                    payload = self._incremental_payload(product_data['date'].to_numpy(), X, y)
+                    self._remember_window(product, product_data, training_weeks, payload)
+                fitted[k] = result
+                self._store_model(cache_key, result)
+        return fitted
+
     def _prepare_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """Convert dates to numeric features."""
-        df = df.copy()
-        df['date'] = pd.to_datetime(df['date'])
-        df['day_of_week'] = df['date'].dt.dayofweek
-        df['day_of_month'] = df['date'].dt.day
-        df['week_of_year'] = df['date'].dt.isocalendar().week.astype(int)
-        df['month'] = df['date'].dt.month
-        df['days_since_start'] = (df['date'] - df['date'].min()).dt.days
-        return df
+        return add_calendar_features(df)
 
     @abstractmethod
     def fit(self, X: np.ndarray, y: np.ndarray) -> None:
-        """Train the model."""
+        """Train the model.
+
+        Implementations rebind ``self.model`` to a newly fitted estimator rather
+        than refitting in place, because fitted estimators may be shared with
+        the model cache.
+        """
         ...
 
     @abstractmethod
@@ -32,55 +201,57 @@ class BasePredictor(ABC):
         ...
 
     def predict(self, sales_data, training_weeks: int, forecast_weeks: int = 4) -> list[dict]:
-        """Generate predictions for each product."""
-        df = pd.DataFrame(sales_data)
-        df['date'] = pd.to_datetime(df['date'])
+        """Generate predictions for each product.
 
-        cutoff_date = df['date'].max() - timedelta(weeks=training_weeks)
-        training_df = df[df['date'] >= cutoff_date].copy()
+        ``model_updates`` counts how each product's model was obtained:
+        ``cached``, ``registry``, ``incremental`` or ``full``.
+        """
+        df = to_sales_frame(sales_data)
+        self.model_updates = Counter()
 
-        products = training_df['product'].unique()
+        cutoff_date = df['date'].max() - timedelta(weeks=training_weeks)
+        with span('partition'):
+            training = partition_by_product(df[df['date'] >= cutoff_date])
         all_predictions: list[dict] = []
 
         last_date = df['date'].max()
-        forecast_dates = [last_date + timedelta(days=i + 1) for i in range(forecast_weeks * 7)]
+        horizon = pd.date_range(last_date + timedelta(days=1), periods=forecast_weeks * 7, freq='D')
+        horizon_labels = horizon.strftime('%Y-%m-%d').tolist()
 
-        for product in products:
-            product_data = training_df[training_df['product'] == product].copy()
+        windows = []
+        for product, product_data in training:
             if len(product_data) < 3:
                 continue
+            with span('fingerprint'):
+                cache_key = self._cache_key(product, product_data, training_weeks)
+            X_train = calendar_features(product_data['date'])
+            y_train = product_data['unitsSold'].to_numpy()
+            windows.append((product, product_data, cache_key, X_train, y_train))
 
-            product_data = self._prepare_features(product_data)
+        for (product, product_data, *_rest), (self.model, residual_std) in zip(
+            windows, self._fit_products(windows, training_weeks)
+        ):
+            min_date = product_data['date'].min()
 
-            feature_cols = ['day_of_week', 'day_of_month', 'week_of_year', 'month', 'days_since_start']
-            X_train = product_data[feature_cols].values
-            y_train = product_data['unitsSold'].values
+            # Score the whole horizon in one call instead of one row per day.
+            with span('forecast'):
+                X_pred = calendar_features(horizon, origin=min_date)
+                raw = self.predict_values(X_pred)
 
-            self.fit(X_train, y_train)
+            # Python round()/max() per value keep the exact floats (and int 0) of the per-day loop.
+            predicted = [max(0, round(float(v), 1)) for v in raw]
+            spread = 1.96 * residual_std
+            lower = (np.asarray(predicted, dtype=np.float64) - spread).tolist()
+            upper = (np.asarray(predicted, dtype=np.float64) + spread).tolist()
 
-            min_date = product_data['date'].min()
-            train_preds = self.predict_values(X_train)
-            residual_std = float(np.std(y_train - train_preds))
-
-            for forecast_date in forecast_dates:
-                days_since = (forecast_date - min_date).days
-                X_pred = np.array([[
-                    forecast_date.dayofweek,
-                    forecast_date.day,
-                    forecast_date.isocalendar()[1],
-                    forecast_date.month,
-                    days_since,
-                ]])
-
-                predicted = max(0, round(float(self.predict_values(X_pred)[0]), 1))
-                ci_lower = max(0, round(predicted - 1.96 * residual_std, 1))
-                ci_upper = round(predicted + 1.96 * residual_std, 1)
-
-                all_predictions.append({
-                    'date': forecast_date.strftime('%Y-%m-%d'),
+            all_predictions.extend(
+                {
+                    'date': label,
                     'product': product,
-                    'predicted_sales': predicted,
-                    'confidence_interval': [ci_lower, ci_upper],
-                })
+                    'predicted_sales': pred,
+                    'confidence_interval': [max(0, round(lo, 1)), round(hi, 1)],
+                }
+                for label, pred, lo, hi in zip(horizon_labels, predicted, lower, upper)
+            )
 
         return all_predictions
@@ -0,0 +1,64 @@
+"""Limits on how long iterative training may run.
+
+A ``TrainingBudget`` combines a wall-clock deadline with an optional
+cancellation token. Training loops call ``stop_reason`` between epochs and
+stop cleanly, keeping the model trained so far, once it returns a reason.
+The token is any object with a boolean ``cancelled`` attribute, such as a
+job's ``JobContext`` or a ``CancellationToken``.
+"""
+from __future__ import annotations
+
+import threading
+import time
+
+# Stop reasons meaning training was cut short rather than finished; such models are not cached.
+BUDGET_STOP_REASONS = ('cancelled', 'deadline', 'time_budget')
+
+
+class CancellationToken:
+    """A token that can be cancelled from another thread."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+
+class TrainingBudget:
+    """A ``deadline`` (``time.time()`` seconds) and/or ``cancel`` token that training should respect."""
+
+    def __init__(self, deadline: float | None = None, cancel=None, reason: str = 'deadline'):
+        self.deadline = deadline
+        self.cancel = cancel
+        self.reason = reason  # reported when the deadline passes
+
+    @classmethod
+    def within(cls, ms: float | None, cancel=None) -> 'TrainingBudget':
+        """A budget ending ``ms`` milliseconds from now (no deadline when ``ms`` is None)."""
+        return cls(None if ms is None else time.time() + ms / 1000, cancel)
+
+    def limit(self, ms: float | None) -> 'TrainingBudget':
+        """This budget further limited to ``ms`` milliseconds from now, reported as ``time_budget``."""
+        if not ms or ms <= 0:
+            return self
+        deadline = time.time() + ms / 1000
+        if self.deadline is not None and self.deadline <= deadline:
+            return self
+        return TrainingBudget(deadline, self.cancel, 'time_budget')
+
+    def detached(self) -> 'TrainingBudget':
+        """The deadline without the cancellation token, for passing to worker processes."""
+        return TrainingBudget(self.deadline, None, self.reason)
+
+    def stop_reason(self) -> str | None:
+        """``cancelled``, ``deadline`` or ``time_budget`` once training should stop, else None."""
+        if self.cancel is not None and self.cancel.cancelled:
+            return 'cancelled'
+        if self.deadline is not None and time.time() >= self.deadline:
+            return self.reason
+        return None
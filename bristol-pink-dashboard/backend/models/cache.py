@@ -0,0 +1,119 @@
+"""Bounded in-process caches for fitted models and evaluation results."""
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+
+def estimate_size(value) -> int:
+    """Approximate memory footprint of a cached value, in bytes."""
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return 0
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache bounded by entry count and total bytes.
+
+    With ``ttl_seconds`` set, entries older than the TTL are treated as misses
+    and dropped on access.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int | None = None, ttl_seconds: float | None = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._sizes: dict = {}
+        self._stored_at: dict = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._entries and self._expired(key):
+                self._remove(key)
+                self.evictions += 1
+            if key not in self._entries:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def put(self, key, value, size: int | None = None) -> None:
+        if size is None:
+            size = estimate_size(value) if self.max_bytes is not None else 0
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = value
+            self._sizes[key] = size
+            self._stored_at[key] = time.monotonic()
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _expired(self, key) -> bool:
+        return self.ttl_seconds is not None and time.monotonic() - self._stored_at[key] > self.ttl_seconds
+
+    def _remove(self, key) -> None:
+        del self._entries[key]
+        del self._stored_at[key]
+        self._bytes -= self._sizes.pop(key)
+
+    def discard(self, key) -> None:
+        """Remove ``key`` if present."""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._sizes.clear()
+            self._stored_at.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl_seconds': self.ttl_seconds,
+            }
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._entries and not self._expired(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+MODEL_CACHE = LRUCache(
+    max_entries=int(os.environ.get('MODEL_CACHE_MAX_ENTRIES', '512')),
+    max_bytes=int(os.environ.get('MODEL_CACHE_MAX_MB', '256')) * 1024 * 1024,
+)
+
+RESULT_CACHE = LRUCache(
+    max_entries=int(os.environ.get('EVAL_CACHE_MAX_ENTRIES', '1024')),
+    ttl_seconds=float(os.environ.get('EVAL_CACHE_TTL_SECONDS', '3600')),
+)
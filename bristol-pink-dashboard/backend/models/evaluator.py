@@ -1,81 +1,225 @@
 """Model evaluator – computes MAE, RMSE, MAPE for each algorithm."""
+import multiprocessing
+import os
 import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from importlib.util import find_spec
 import pandas as pd
 import numpy as np
 from datetime import timedelta
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 
-from . import ALGORITHM_MAP, ALL_ALGORITHMS
+from . import ALGORITHM_MAP, ALGORITHM_NAMES, ALL_ALGORITHMS
+from .budget import BUDGET_STOP_REASONS
+from .cache import RESULT_CACHE
+from .features import DAYS_COL, calendar_features
+from .frames import frame_fingerprint, partition_by_product, to_sales_frame
+from .instrumentation import span
 
 
-def _prepare_features(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df['date'] = pd.to_datetime(df['date'])
-    df['day_of_week'] = df['date'].dt.dayofweek
-    df['day_of_month'] = df['date'].dt.day
-    df['week_of_year'] = df['date'].dt.isocalendar().week.astype(int)
-    df['month'] = df['date'].dt.month
-    df['days_since_start'] = (df['date'] - df['date'].min()).dt.days
-    return df
+BACKTEST_MODES = ('rolling', 'expanding')
+BACKTEST_MAX_FOLDS = int(os.environ.get('BACKTEST_MAX_FOLDS', '12'))
 
 
-FEATURE_COLS = ['day_of_week', 'day_of_month', 'week_of_year', 'month', 'days_since_start']
+@dataclass(frozen=True)
+class Fold:
+    """One backtest origin: train on ``[train_start, test_start)`` and score ``[test_start, end]``."""
 
+    index: int
+    train_start: pd.Timestamp
+    test_start: pd.Timestamp
+    end: pd.Timestamp
 
-def _evaluate_sklearn_model(model, train_df, test_df, products):
+    def to_dict(self) -> dict:
+        return {
+            'fold': self.index,
+            'train_start': self.train_start.strftime('%Y-%m-%d'),
+            'test_start': self.test_start.strftime('%Y-%m-%d'),
+            'test_end': self.end.strftime('%Y-%m-%d'),
+        }
+
+
+class BacktestData:
+    """A sales frame partitioned once, with calendar features computed once for every fold.
+
+    Each product's rows are sorted by date in ``parts.frame``, so a fold's
+    train and test rows are contiguous ranges found by counting rows before
+    the fold's boundaries. Feature rows are sliced from one matrix and only
+    ``days_since_start`` is rebased to the slice's first day.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.frame = df
+        self.parts = partition_by_product(df)
+        self.min_date, self.max_date = df['date'].min(), df['date'].max()
+        self._frame_ns = pd.DatetimeIndex(df['date']).as_unit('ns').asi8
+        self._ns = self._frame_ns[self.parts.order]
+        self.values = self.parts.frame['unitsSold'].to_numpy()
+        self.dates = self.parts.frame['date']
+        self._X = calendar_features(self.dates)
+
+    def folds(self, training_weeks: int, count: int = 1, mode: str = 'rolling') -> list[Fold]:
+        """Fold 0 is the one-week holdout ``evaluate`` has always used; each further fold ends a week earlier.
+
+        ``rolling`` trains on the ``training_weeks`` before each fold's end and
+        ``expanding`` on everything before its test week.
+        """
+        folds = []
+        for k in range(count):
+            end = self.max_date - timedelta(weeks=k)
+            train_start = self.min_date if mode == 'expanding' else end - timedelta(weeks=training_weeks)
+            folds.append(Fold(k, train_start, end - timedelta(weeks=1), end))
+        return folds
+
+    def _counts_before(self, bound, side: str = 'left') -> np.ndarray:
+        """Per product, the number of its rows dated before ``bound`` (or at it, with ``side='right'``)."""
+        value = pd.Timestamp(bound).value
+        before = self._ns <= value if side == 'right' else self._ns < value
+        cumulative = np.concatenate(([0], np.cumsum(before)))
+        offsets = self.parts.offsets
+        return cumulative[offsets[1:]] - cumulative[offsets[:-1]]
+
+    def sizes(self, fold: Fold) -> tuple[int, int]:
+        """Rows in the fold's train and test periods, across all products."""
+        ns = self._frame_ns
+        train_start, test_start, end = (pd.Timestamp(t).value for t in (fold.train_start, fold.test_start, fold.end))
+        return (
+            int(((ns >= train_start) & (ns < test_start)).sum()),
+            int(((ns >= test_start) & (ns <= end)).sum()),
+        )
+
+    def train_frame(self, fold: Fold) -> pd.DataFrame:
+        """The fold's training rows in input order."""
+        ns = self._frame_ns
+        return self.frame[(ns >= pd.Timestamp(fold.train_start).value) & (ns < pd.Timestamp(fold.test_start).value)]
+
+    def windows(self, fold: Fold) -> list[tuple]:
+        """``(product, train, test)`` row slices of ``parts.frame`` for products with training rows.
+
+        Products are ordered by first appearance in the training period, as
+        when the period is partitioned on its own.
+        """
+        offsets = self.parts.offsets[:-1]
+        train_lo = offsets + self._counts_before(fold.train_start)
+        test_lo = offsets + self._counts_before(fold.test_start)
+        test_hi = offsets + self._counts_before(fold.end, side='right')
+        out = []
+        for i, product in enumerate(self.parts.products):
+            if test_lo[i] > train_lo[i]:
+                first = self.parts.order[train_lo[i]:test_lo[i]].min()
+                out.append((first, product, slice(train_lo[i], test_lo[i]), slice(test_lo[i], test_hi[i])))
+        out.sort(key=lambda row: row[0])
+        return [row[1:] for row in out]
+
+    def features(self, rows: slice) -> np.ndarray:
+        """Calendar features of ``rows`` with ``days_since_start`` counted from their first date."""
+        X = self._X[rows].copy()
+        if len(X):
+            X[:, DAYS_COL] -= X[0, DAYS_COL]
+        return X
+
+
+def _evaluate_sklearn_model(model, data: BacktestData, fold: Fold):
     """Evaluate an sklearn-style model (fit/predict_values interface)."""
     all_y_true, all_y_pred = [], []
 
-    for product in products:
-        pt = train_df[train_df['product'] == product].copy()
-        pte = test_df[test_df['product'] == product].copy()
-        if len(pt) < 3 or len(pte) < 1:
-            continue
-        pt = _prepare_features(pt)
-        pte = _prepare_features(pte)
-        X_train, y_train = pt[FEATURE_COLS].values, pt['unitsSold'].values
-        X_test, y_test = pte[FEATURE_COLS].values, pte['unitsSold'].values
-        model.fit(X_train, y_train)
-        y_pred = np.maximum(model.predict_values(X_test), 0)
+    # Each slice counts days_since_start from its own first date, as before.
+    windows = [
+        (data.features(train), data.values[train], data.features(test), data.values[test])
+        for _product, train, test in data.windows(fold)
+        if train.stop - train.start >= 3 and test.stop - test.start >= 1
+    ]
+    if model.batched and windows:
+        with span('fit'):
+            fitted = model._fit_batch([w[0] for w in windows], [w[1] for w in windows])
+
+    for k, (X_train, y_train, X_test, y_test) in enumerate(windows):
+        if model.batched:
+            model.model = fitted[k][0]
+        else:
+            with span('fit'):
+                model.fit(X_train, y_train)
+        with span('forecast'):
+            y_pred = np.maximum(model.predict_values(X_test), 0)
         all_y_true.extend(y_test.tolist())
         all_y_pred.extend(y_pred.tolist())
 
     return np.array(all_y_true), np.array(all_y_pred)
 
 
-def _evaluate_ts_model(model_cls, train_df, test_df, products, training_weeks):
+def _evaluate_ts_model(model_cls, data: BacktestData, fold: Fold, training_weeks: int, budget=None):
     """Evaluate a time-series model (ARIMA / LSTM) by running its predict method
-    and comparing against the test period."""
+    and comparing against the test period.
+
+    Also returns the model's ``training_runs`` (empty for ARIMA).
+    """
     all_y_true, all_y_pred = [], []
 
     # The TS models generate forecasts from the end of their data,
     # so we give them only training data and compare to test dates.
-    test_dates = set()
-    for product in products:
-        pte = test_df[test_df['product'] == product]
-        for _, row in pte.iterrows():
-            test_dates.add(row['date'].strftime('%Y-%m-%d') if hasattr(row['date'], 'strftime') else str(row['date']))
-
+    train_df = data.train_frame(fold)
+    # Expanding folds train on more than training_weeks of history.
+    weeks = max(training_weeks, (fold.test_start - fold.train_start).days // 7 + 1)
     model = model_cls()
-    train_records = train_df.to_dict('records')
+    if budget is not None:
+        model.budget = budget
     # Forecast 1 week (the test period)
-    preds = model.predict(train_records, training_weeks, forecast_weeks=1)
+    preds = model.predict(train_df, weeks, forecast_weeks=1)
 
     pred_map = {}
     for p in preds:
         key = (p['date'], p['product'])
         pred_map[key] = p['predicted_sales']
 
-    for product in products:
-        pte = test_df[test_df['product'] == product]
-        for _, row in pte.iterrows():
-            date_str = row['date'].strftime('%Y-%m-%d') if hasattr(row['date'], 'strftime') else str(row['date'])
+    for product, _train, test in data.windows(fold):
+        labels = data.dates.iloc[test].dt.strftime('%Y-%m-%d').tolist()
+        for date_str, units in zip(labels, data.values[test].tolist()):
             key = (date_str, product)
             if key in pred_map:
-                all_y_true.append(row['unitsSold'])
+                all_y_true.append(units)
                 all_y_pred.append(pred_map[key])
 
-    return np.array(all_y_true), np.array(all_y_pred)
+    return np.array(all_y_true), np.array(all_y_pred), getattr(model, 'training_runs', {})
+
+
+def _training_summary(runs: dict) -> dict | None:
+    """Total epochs trained and products per stop reason, or None when nothing was trained iteratively."""
+    if not runs:
+        return None
+    return {
+        'epochs': sum(run['epochs'] for run in runs.values()),
+        'stop_reasons': dict(Counter(run['stop_reason'] for run in runs.values())),
+    }
+
+
+def _interrupted(metrics: dict) -> bool:
+    """Whether any training behind ``metrics`` was cut short by a deadline or cancellation."""
+    rows = [metrics, *metrics.get('folds', [])]
+    return any(
+        reason in BUDGET_STOP_REASONS
+        for row in rows
+        for reason in (row.get('training') or {}).get('stop_reasons', {})
+    )
+
+
+def _evaluate_fold(algorithm: str, data: BacktestData, fold: Fold, training_weeks: int, budget=None):
+    """Return ``(y_true, y_pred, seconds, training)`` for one fold, or None when it has too little data.
+
+    ``training`` is the ``_training_summary`` of an LSTM's networks, else None.
+    """
+    n_train, n_test = data.sizes(fold)
+    if n_train < 3 or n_test < 1:
+        return None
+    t0 = time.time()
+    if algorithm in TS_MODELS:
+        y_true, y_pred, runs = _evaluate_ts_model(ALGORITHM_MAP[algorithm], data, fold, training_weeks, budget)
+        training = _training_summary(runs)
+    else:
+        y_true, y_pred = _evaluate_sklearn_model(ALGORITHM_MAP[algorithm](), data, fold)
+        training = None
+    return y_true, y_pred, round(time.time() - t0, 3), training
 
 
 def _compute_metrics(y_true, y_pred):
@@ -97,79 +241,288 @@ def _compute_metrics(y_true, y_pred):
 
 TS_MODELS = {'arima', 'lstm'}
 
+# Worker processes for compare_all / compare_training_windows; 0 or 1 runs serially.
+EVAL_WORKERS = int(os.environ.get('EVAL_WORKERS', '0'))
+EVAL_THREADS_PER_WORKER = int(os.environ.get('EVAL_THREADS_PER_WORKER', '0'))
+EVAL_START_METHOD = os.environ.get('EVAL_START_METHOD', '')
 
-class ModelEvaluator:
-    """Evaluate one or all algorithms."""
+_WORKER_FRAME = None
+_WORKER_DATA = None
 
-    def __init__(self, algorithm: str = 'linear_regression'):
-        self.algorithm = algorithm
 
-    def evaluate(self, sales_data, training_weeks: int):
-        """Evaluate a single algorithm. Returns dict of metrics."""
-        df = pd.DataFrame(sales_data)
-        df['date'] = pd.to_datetime(df['date'])
-        max_date = df['date'].max()
-        test_start = max_date - timedelta(weeks=1)
-        train_start = max_date - timedelta(weeks=training_weeks)
+def _pool_context():
+    if EVAL_START_METHOD:
+        return multiprocessing.get_context(EVAL_START_METHOD)
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        # Fork a clean server that has already imported the models (and torch,
+        # which every worker loads to cap its threads), not the (possibly
+        # multi-threaded) request process.
+        ctx = multiprocessing.get_context('forkserver')
+        ctx.set_forkserver_preload([__name__] + (['torch'] if find_spec('torch') is not None else []))
+        return ctx
+    return multiprocessing.get_context('spawn')
 
-        train_df = df[(df['date'] >= train_start) & (df['date'] < test_start)].copy()
-        test_df = df[df['date'] >= test_start].copy()
 
-        if len(train_df) < 3 or len(test_df) < 1:
-            return {'mae': 0, 'rmse': 0, 'mape': 0}
+def _init_worker(df: pd.DataFrame, threads: int) -> None:
+    """Receive the dataset once per worker and cap its BLAS/OpenMP/torch threads."""
+    global _WORKER_FRAME, _WORKER_DATA
+    _WORKER_FRAME = df
+    _WORKER_DATA = None
+    try:
+        from threadpoolctl import threadpool_limits
+        threadpool_limits(limits=threads)
+    except ImportError:  # pragma: no cover
+        pass
+    # Model modules load lazily, so import torch here to cap it before an LSTM runs.
+    if find_spec('torch') is not None:
+        import torch
+        torch.set_num_threads(threads)
 
-        products = train_df['product'].unique()
 
-        t0 = time.time()
-        if self.algorithm in TS_MODELS:
-            y_true, y_pred = _evaluate_ts_model(
-                ALGORITHM_MAP[self.algorithm], train_df, test_df, products, training_weeks
-            )
-        else:
-            model = ALGORITHM_MAP.get(self.algorithm)
-            if model is None:
-                return {'mae': 0, 'rmse': 0, 'mape': 0}
-            y_true, y_pred = _evaluate_sklearn_model(model(), train_df, test_df, products)
-        elapsed = round(time.time() - t0, 3)
+def _worker_pool(df: pd.DataFrame, workers: int) -> ProcessPoolExecutor:
+    threads = EVAL_THREADS_PER_WORKER or max(1, (os.cpu_count() or 1) // workers)
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=_pool_context(),
+        initializer=_init_worker,
+        initargs=(df, threads),
+    )
+
+
+def _worker_data() -> BacktestData:
+    """The worker's dataset, partitioned on first use and shared by every task it runs."""
+    global _WORKER_DATA
+    if _WORKER_DATA is None:
+        _WORKER_DATA = BacktestData(_WORKER_FRAME)
+    return _WORKER_DATA
+
+
+def _evaluate_cell(algorithm: str, training_weeks: int, folds: int = 1, mode: str = 'rolling', budget=None) -> dict:
+    evaluator = ModelEvaluator(algorithm, cache=None, folds=folds, mode=mode, budget=budget)
+    return evaluator._evaluate_frame(_worker_data(), training_weeks)
+
 
-        metrics = _compute_metrics(y_true, y_pred)
-        metrics['training_time'] = elapsed
+def _evaluate_fold_cell(algorithm: str, training_weeks: int, index: int, folds: int, mode: str, budget=None):
+    data = _worker_data()
+    return _evaluate_fold(algorithm, data, data.folds(training_weeks, folds, mode)[index], training_weeks, budget)
+
+
+def _detached(budget):
+    """``budget`` without its cancellation token, which cannot be sent to worker processes."""
+    return None if budget is None else budget.detached()
+
+
+class ModelEvaluator:
+    """Evaluate one or all algorithms.
+
+    With ``folds`` > 1 an algorithm is backtested over that many weekly
+    origins (``rolling`` or ``expanding`` training windows, see
+    ``BacktestData.folds``). The result then carries per-fold metrics in
+    ``folds`` and metrics over all folds' predictions at the top level.
+    ``folds=1`` is the single one-week holdout.
+
+    Metrics are memoized in ``cache`` by (dataset fingerprint, algorithm,
+    training_weeks), plus the fold settings when ``folds`` > 1;
+    ``cache_hit`` records whether the last ``evaluate`` call was served from
+    it. Pass ``cache=None`` to always recompute.
+
+    ``budget`` (a ``TrainingBudget``) bounds LSTM training by a deadline
+    and/or cancellation token. The LSTM's epochs and stop reasons are
+    reported under ``training``; results whose training was cut short are
+    not cached. Worker processes only see the deadline.
+    """
+
+    def __init__(self, algorithm: str = 'linear_regression', cache=RESULT_CACHE, folds: int = 1,
+                 mode: str = 'rolling', workers: int | None = None, budget=None):
+        if not 1 <= folds <= BACKTEST_MAX_FOLDS:
+            raise ValueError(f'folds must be between 1 and {BACKTEST_MAX_FOLDS}')
+        if mode not in BACKTEST_MODES:
+            raise ValueError(f"mode must be one of: {', '.join(BACKTEST_MODES)}")
+        self.algorithm = algorithm
+        self.cache = cache
+        self.folds = folds
+        self.mode = mode
+        # Worker processes for the folds of a single evaluate call.
+        self.workers = EVAL_WORKERS if workers is None else workers
+        self.budget = budget
+        self.cache_hit = False
+
+    def evaluate(self, sales_data, training_weeks: int, fingerprint: str | None = None):
+        """Evaluate a single algorithm. Returns dict of metrics.
+
+        ``fingerprint`` may be supplied by callers that already hashed the data.
+        """
+        df = to_sales_frame(sales_data)
+        self.cache_hit = False
+        if self.cache is None:
+            return self._evaluate_frame(df, training_weeks)
+
+        if fingerprint is None:
+            with span('fingerprint'):
+                fingerprint = frame_fingerprint(df)
+        key = self._cache_key(fingerprint, training_weeks)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache_hit = True
+            return dict(cached)
+        metrics = self._evaluate_frame(df, training_weeks)
+        if not _interrupted(metrics):
+            self.cache.put(key, dict(metrics))
         return metrics
 
+    def _cache_key(self, fingerprint: str, training_weeks: int) -> tuple:
+        if self.folds == 1:
+            return (fingerprint, self.algorithm, training_weeks)
+        return (fingerprint, self.algorithm, training_weeks, self.folds, self.mode)
+
+    def _evaluate_frame(self, data, training_weeks: int):
+        """Metrics for a sales DataFrame, or a ``BacktestData`` shared with other evaluations."""
+        with span('evaluate', algorithm=self.algorithm):
+            return self._evaluate_window(data, training_weeks)
+
+    def _evaluate_window(self, data, training_weeks: int):
+        if ALGORITHM_MAP.get(self.algorithm) is None:
+            return {'mae': 0, 'rmse': 0, 'mape': 0}
+        if not isinstance(data, BacktestData):
+            with span('partition'):
+                data = BacktestData(data)
+        folds = data.folds(training_weeks, self.folds, self.mode)
+        results = self._run_folds(data, folds, training_weeks)
+
+        if self.folds == 1:
+            if results[0] is None:
+                return {'mae': 0, 'rmse': 0, 'mape': 0}
+            y_true, y_pred, elapsed, training = results[0]
+            metrics = {**_compute_metrics(y_true, y_pred), 'training_time': elapsed}
+            if training is not None:
+                metrics['training'] = training
+            return metrics
+
+        fold_rows, all_true, all_pred = [], [], []
+        for fold, result in zip(folds, results):
+            y_true, y_pred, elapsed, training = result if result is not None else (np.array([]), np.array([]), 0.0, None)
+            fold_rows.append({**fold.to_dict(), **_compute_metrics(y_true, y_pred),
+                              'training_time': elapsed, 'points': len(y_true)})
+            if training is not None:
+                fold_rows[-1]['training'] = training
+            all_true.append(y_true)
+            all_pred.append(y_pred)
+        metrics = _compute_metrics(np.concatenate(all_true), np.concatenate(all_pred))
+        metrics['training_time'] = round(sum(row['training_time'] for row in fold_rows), 3)
+        return {**metrics, 'mode': self.mode, 'folds': fold_rows}
+
+    def _run_folds(self, data: BacktestData, folds: list[Fold], training_weeks: int) -> list:
+        """``_evaluate_fold`` for each fold, in a process pool when ``workers`` > 1."""
+        if self.workers <= 1 or len(folds) <= 1:
+            return [_evaluate_fold(self.algorithm, data, fold, training_weeks, self.budget) for fold in folds]
+        pool = _worker_pool(data.frame, min(self.workers, len(folds)))
+        try:
+            futures = [
+                pool.submit(_evaluate_fold_cell, self.algorithm, training_weeks, fold.index, self.folds, self.mode,
+                            _detached(self.budget))
+                for fold in folds
+            ]
+            return [future.result() for future in futures]
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    @staticmethod
+    def _evaluate_grid(df, cells: list[tuple[str, int]], workers: int | None = None, progress=None,
+                       folds: int = 1, mode: str = 'rolling', budget=None) -> dict:
+        """Evaluate (algorithm, training_weeks) cells, returning {cell: (metrics, cached)}.
+
+        Cached cells are answered in-process, and the others share one
+        partitioned ``BacktestData``. With ``workers`` > 1 the remaining
+        cells run in a process pool that receives the dataset once per
+        worker; the folds of each cell then run serially. ``progress``, if
+        given, is called with the completed fraction after each cell; an
+        exception raised from it stops the grid.
+        """
+        workers = EVAL_WORKERS if workers is None else workers
+        with span('fingerprint'):
+            fingerprint = frame_fingerprint(df)
+        cells = list(dict.fromkeys(cells))
+        out: dict = {}
+        missing = []
+
+        def evaluator(algo_key):
+            return ModelEvaluator(algo_key, folds=folds, mode=mode, workers=0, budget=budget)
+
+        for algo_key, w in cells:
+            ev = evaluator(algo_key)
+            cached = ev.cache.get(ev._cache_key(fingerprint, w)) if ev.cache is not None else None
+            if cached is not None:
+                out[(algo_key, w)] = (dict(cached), True)
+            else:
+                missing.append((algo_key, w))
+
+        def record(cell, metrics):
+            ev = evaluator(cell[0])
+            if ev.cache is not None and not _interrupted(metrics):
+                ev.cache.put(ev._cache_key(fingerprint, cell[1]), dict(metrics))
+            out[cell] = (metrics, False)
+            if progress is not None:
+                progress(len(out) / len(cells))
+
+        if progress is not None and out:
+            progress(len(out) / len(cells))
+
+        if workers <= 1 or len(missing) <= 1:
+            if missing:
+                with span('partition'):
+                    data = BacktestData(df)
+            for algo_key, w in missing:
+                record((algo_key, w), evaluator(algo_key)._evaluate_frame(data, w))
+            return out
+
+        pool = _worker_pool(df, min(workers, len(missing)))
+        try:
+            futures = [(cell, pool.submit(_evaluate_cell, *cell, folds, mode, _detached(budget))) for cell in missing]
+            for cell, future in futures:
+                record(cell, future.result())
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+        return out
+
     @staticmethod
-    def compare_all(sales_data, training_weeks: int):
-        """Evaluate every registered algorithm. Returns a list of {algorithm, name, mae, rmse, mape, training_time}."""
+    def compare_all(sales_data, training_weeks: int, workers: int | None = None, progress=None,
+                    folds: int = 1, mode: str = 'rolling', budget=None):
+        """Evaluate every registered algorithm. Returns a list of {algorithm, name, mae, rmse, mape, training_time, cached}."""
+        df = to_sales_frame(sales_data)
+        grid = ModelEvaluator._evaluate_grid(df, [(a, training_weeks) for a in ALL_ALGORITHMS], workers, progress,
+                                             folds, mode, budget)
         results = []
         for algo_key in ALL_ALGORITHMS:
-            ev = ModelEvaluator(algo_key)
-            metrics = ev.evaluate(sales_data, training_weeks)
-            cls = ALGORITHM_MAP[algo_key]
+            metrics, cached = grid[(algo_key, training_weeks)]
             results.append({
                 'algorithm': algo_key,
-                'name': cls.name if hasattr(cls, 'name') else algo_key,
+                'name': ALGORITHM_NAMES.get(algo_key, algo_key),
                 **metrics,
+                'cached': cached,
             })
         return results
 
     @staticmethod
-    def compare_training_windows(sales_data, windows: list[int] | None = None):
+    def compare_training_windows(sales_data, windows: list[int] | None = None, workers: int | None = None, progress=None,
+                                 folds: int = 1, mode: str = 'rolling', budget=None):
         """Run every algorithm across multiple training windows.
-        Returns {windows: [...], results: {algo: [{window, mae, rmse, mape, training_time}, ...]}}
+        Returns {windows: [...], results: {algo: [{window, mae, rmse, mape, training_time, cached}, ...]}}
         """
         if windows is None:
             windows = [3, 4, 5, 6, 7, 8]
 
+        df = to_sales_frame(sales_data)
+        cells = [(a, w) for a in ALL_ALGORITHMS for w in windows]
+        grid = ModelEvaluator._evaluate_grid(df, cells, workers, progress, folds, mode, budget)
         out: dict = {'windows': windows, 'results': {}}
 
         for algo_key in ALL_ALGORITHMS:
             rows = []
             for w in windows:
-                ev = ModelEvaluator(algo_key)
-                metrics = ev.evaluate(sales_data, w)
-                rows.append({'window': w, **metrics})
-            cls = ALGORITHM_MAP[algo_key]
+                metrics, cached = grid[(algo_key, w)]
+                rows.append({'window': w, **metrics, 'cached': cached})
             out['results'][algo_key] = {
-                'name': cls.name if hasattr(cls, 'name') else algo_key,
+                'name': ALGORITHM_NAMES.get(algo_key, algo_key),
                 'data': rows,
             }
 
@@ -0,0 +1,69 @@
+"""Calendar feature engineering shared by the predictors and the evaluator.
+
+Calendar attributes only depend on the day, so they are computed once per
+span of whole years into a lookup table and gathered by day ordinal instead
+of running ``isocalendar()`` on every product slice and training window.
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+FEATURE_COLS = ['day_of_week', 'day_of_month', 'week_of_year', 'month', 'days_since_start']
+DAYS_COL = FEATURE_COLS.index('days_since_start')
+
+
+def day_ordinals(dates) -> np.ndarray:
+    """Days since 1970-01-01 for each date, as int64."""
+    index = pd.DatetimeIndex(dates)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.to_numpy().astype('datetime64[D]').astype(np.int64)
+
+
+@lru_cache(maxsize=32)
+def _calendar_table(first_year: int, last_year: int) -> tuple[int, np.ndarray]:
+    """Return ``(first_day, table)`` where row ``d - first_day`` holds the calendar
+    columns (day_of_week, day_of_month, week_of_year, month) for day ordinal ``d``.
+    """
+    days = pd.date_range(f'{first_year}-01-01', f'{last_year}-12-31', freq='D')
+    table = np.column_stack([
+        days.dayofweek,
+        days.day,
+        days.isocalendar().week.to_numpy(dtype=np.int64),
+        days.month,
+    ]).astype(np.float64)
+    table.flags.writeable = False
+    return int(day_ordinals(days[:1])[0]), table
+
+
+def calendar_table_info() -> dict:
+    """Hit/miss statistics of the calendar table cache."""
+    return _calendar_table.cache_info()._asdict()
+
+
+def calendar_features(dates, origin=None) -> np.ndarray:
+    """Return a C-contiguous float64 matrix with one row of FEATURE_COLS per date.
+
+    ``days_since_start`` counts from ``origin`` (default: the earliest date).
+    """
+    days = day_ordinals(dates)
+    X = np.empty((len(days), len(FEATURE_COLS)), dtype=np.float64)
+    if len(days) == 0:
+        return X
+    first, last = pd.Timestamp(days.min(), unit='D'), pd.Timestamp(days.max(), unit='D')
+    first_day, table = _calendar_table(first.year, last.year)
+    X[:, :4] = table[days - first_day]
+    origin_day = days.min() if origin is None else day_ordinals([origin])[0]
+    X[:, 4] = days - origin_day
+    return X
+
+
+def add_calendar_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a copy of ``df`` with a parsed ``date`` column and the FEATURE_COLS columns."""
+    df = df.copy()
+    df['date'] = pd.to_datetime(df['date'])
+    X = calendar_features(df['date'])
+    for i, col in enumerate(FEATURE_COLS):
+        df[col] = X[:, i].astype(np.int64)
+    return df
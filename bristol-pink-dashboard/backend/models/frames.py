@@ -0,0 +1,75 @@
+"""Helpers for turning incoming sales data into typed DataFrames."""
+import hashlib
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype
+
+
+def to_sales_frame(sales_data) -> pd.DataFrame:
+    """Return sales data as a DataFrame with a parsed ``date`` column.
+
+    Frames produced by ``security.validate_sales_frame`` are already typed and
+    are returned as-is, so callers must treat the result as read-only.
+    """
+    if isinstance(sales_data, pd.DataFrame) and is_datetime64_any_dtype(sales_data['date']):
+        return sales_data
+    df = pd.DataFrame(sales_data)
+    df['date'] = pd.to_datetime(df['date'])
+    return df
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Content hash of the date/product/unitsSold columns, independent of the index."""
+    hashed = pd.util.hash_pandas_object(df[['date', 'product', 'unitsSold']], index=False)
+    return hashlib.sha256(hashed.to_numpy().tobytes()).hexdigest()
+
+
+class ProductPartition:
+    """Rows of a sales frame grouped by product after a single sort.
+
+    Rows are ordered by (product, date) with ties kept in input order, and
+    products keep their order of first appearance. Each product's rows are a
+    contiguous ``start:stop`` range of ``frame``, so per-product slices are
+    views rather than boolean-mask copies.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        codes, uniques = pd.factorize(df['product'], sort=False)
+        order = np.lexsort((df['date'].to_numpy(), codes))
+        self.frame = df.take(order)
+        # Position in ``df`` of each row of ``frame``.
+        self.order = order
+        self.products = list(uniques)
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        # Rows with a missing product (code -1) sort first and belong to no group.
+        self.offsets = np.concatenate(([0], np.cumsum(counts))) + int((codes < 0).sum())
+        self._index = {product: i for i, product in enumerate(self.products)}
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def __contains__(self, product) -> bool:
+        return product in self._index
+
+    def __iter__(self):
+        """Yield ``(product, rows)`` in first-appearance order."""
+        for i, product in enumerate(self.products):
+            yield product, self.frame.iloc[self.offsets[i]:self.offsets[i + 1]]
+
+    def bounds(self, product) -> tuple[int, int]:
+        """``(start, stop)`` of the product's rows in ``frame``; ``(0, 0)`` if absent."""
+        i = self._index.get(product)
+        if i is None:
+            return 0, 0
+        return int(self.offsets[i]), int(self.offsets[i + 1])
+
+    def rows(self, product) -> pd.DataFrame:
+        """The product's rows (empty if the product does not occur)."""
+        start, stop = self.bounds(product)
+        return self.frame.iloc[start:stop]
+
+
+def partition_by_product(df: pd.DataFrame) -> ProductPartition:
+    """Group ``df`` by product once; see ``ProductPartition``."""
+    return ProductPartition(df)
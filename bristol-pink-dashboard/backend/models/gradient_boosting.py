@@ -1,5 +1,6 @@
 """Gradient Boosting predictor."""
 import numpy as np
+from sklearn.base import clone
 from sklearn.ensemble import GradientBoostingRegressor
 from .base import BasePredictor
 
@@ -11,7 +12,7 @@ class GradientBoostingPredictor(BasePredictor):
         self.model = GradientBoostingRegressor(n_estimators=100, random_state=42)
 
     def fit(self, X: np.ndarray, y: np.ndarray) -> None:
-        self.model.fit(X, y)
+        self.model = clone(self.model).fit(X, y)
 
     def predict_values(self, X: np.ndarray) -> np.ndarray:
         return np.maximum(self.model.predict(X), 0)
@@ -0,0 +1,104 @@
+"""Bookkeeping for updating fitted models when new days of sales arrive.
+
+After a full fit, a predictor stores a ``WindowState`` with the rows the
+model was trained on. On the next forecast for the same product,
+``window_shift`` checks whether the new training window is the stored one
+with leading days dropped and new days appended. If so, the predictor
+updates its model from those rows instead of refitting. The state is
+checked against the row values, not a dataset id, so it also applies to
+data sent inline.
+
+A full refit happens when the window does not line up, or when more than
+``INCREMENTAL_MAX_SHIFT`` of the window has been appended since the last
+full fit.
+"""
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from .cache import LRUCache
+
+
+INCREMENTAL_UPDATES = os.environ.get('INCREMENTAL_UPDATES', '1') != '0'
+INCREMENTAL_MAX_SHIFT = float(os.environ.get('INCREMENTAL_MAX_SHIFT', '0.25'))
+INCREMENTAL_STATE_MAX_ENTRIES = int(os.environ.get('INCREMENTAL_STATE_MAX_ENTRIES', '2048'))
+
+
+@dataclass
+class WindowState:
+    """A fitted model and the (date, value) rows it currently reflects."""
+
+    dates: np.ndarray
+    values: np.ndarray
+    payload: Any
+    appended: int = 0  # rows added by updates since the last full fit
+
+
+@dataclass
+class WindowShift:
+    state: WindowState
+    dropped: int  # leading rows of the state no longer in the window
+    added: int  # trailing rows of the window the state has not seen
+
+
+def window_rows(product_data: pd.DataFrame) -> tuple[np.ndarray, np.ndarray]:
+    return product_data['date'].to_numpy(), product_data['unitsSold'].to_numpy(dtype=np.float64)
+
+
+def window_shift(state: WindowState, dates: np.ndarray, values: np.ndarray) -> tuple[int, int] | None:
+    """Return ``(dropped, added)`` if the window is ``state`` minus leading rows plus later rows, else None."""
+    if len(dates) == 0 or len(state.dates) == 0:
+        return None
+    dropped = int(np.searchsorted(state.dates, dates[0]))
+    kept = len(state.dates) - dropped
+    if kept <= 0 or kept > len(dates):
+        return None
+    if not (np.array_equal(state.dates[dropped:], dates[:kept]) and np.array_equal(state.values[dropped:], values[:kept])):
+        return None
+    return dropped, len(dates) - kept
+
+
+class IncrementalStates:
+    """Latest ``WindowState`` per (predictor, settings, training window, product)."""
+
+    def __init__(self, max_entries: int = INCREMENTAL_STATE_MAX_ENTRIES, max_shift: float = INCREMENTAL_MAX_SHIFT):
+        self.max_shift = max_shift
+        self._states = LRUCache(max_entries=max_entries)
+
+    @staticmethod
+    def _key(predictor, training_weeks: int, product) -> tuple:
+        return (type(predictor).__name__, predictor._cache_params(), training_weeks, product)
+
+    def lookup(self, predictor, training_weeks: int, product, dates: np.ndarray, values: np.ndarray) -> WindowShift | None:
+        """The stored state and how the window moved, when an update (not a refit) is appropriate."""
+        state = self._states.get(self._key(predictor, training_weeks, product))
+        if state is None:
+            return None
+        shift = window_shift(state, dates, values)
+        if shift is None:
+            return None
+        dropped, added = shift
+        if added == 0 and dropped == 0:
+            # Only an exact update reproduces the full fit; others (e.g. a few
+            # fine-tuning epochs) would differ from it, so refit instead.
+            return WindowShift(state, 0, 0) if predictor.exact_updates else None
+        if state.appended + added > self.max_shift * len(dates):
+            return None
+        return WindowShift(state, dropped, added)
+
+    def remember(self, predictor, training_weeks: int, product, state: WindowState) -> None:
+        self._states.put(self._key(predictor, training_weeks, product), state, size=0)
+
+    def clear(self) -> None:
+        self._states.clear()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+INCREMENTAL_STATES = IncrementalStates()
@@ -0,0 +1,199 @@
+"""Per-request stage timing and latency histograms.
+
+Code marks stages with ``span('fit')``. While a request is being served (see
+``start_request``), span durations are summed per name on the request's
+``RequestTrace``, which ``app.py`` turns into a ``Server-Timing`` header and
+per-endpoint histograms. Spans opened with an ``algorithm`` label, and any
+spans nested inside one, are also observed in the per-algorithm histogram,
+including in background jobs. ``METRICS.render()`` writes everything in the
+Prometheus text format.
+
+The current trace and labels live in context variables, so concurrent
+requests on different threads never see each other's spans. Work done in
+evaluation worker processes is not traced.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+INSTRUMENTATION_ENABLED = os.environ.get('INSTRUMENTATION_ENABLED', '1') != '0'
+
+# Upper bounds in seconds, as in the Prometheus client defaults plus a long tail for model fitting.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class RequestTrace:
+    """Span totals for one request, in first-seen order."""
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.totals: dict[str, float] = {}
+        self.counts: dict[str, int] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.totals[name] = self.totals.get(name, 0.0) + seconds
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """``Server-Timing`` header value; repeated spans are summed and their count given as ``desc``."""
+        parts = []
+        for name, seconds in self.totals.items():
+            part = f'{name};dur={seconds * 1000:.2f}'
+            if self.counts[name] > 1:
+                part += f';desc="x{self.counts[name]}"'
+            parts.append(part)
+        parts.append(f'total;dur={self.elapsed() * 1000:.2f}')
+        return ', '.join(parts)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram for one label set."""
+
+    def __init__(self, buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        out, running = [], 0
+        for bound, n in zip((*self.buckets, float('inf')), self.counts):
+            running += n
+            out.append(('+Inf' if bound == float('inf') else repr(bound), running))
+        return out
+
+
+class MetricsRegistry:
+    """Thread-safe collection of histogram families keyed by label values."""
+
+    def __init__(self, namespace: str = 'pink'):
+        self.namespace = namespace
+        self._families: dict[str, tuple[str, tuple[str, ...], dict]] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, help_text: str, labels: tuple[str, ...]) -> None:
+        with self._lock:
+            self._families.setdefault(name, (help_text, labels, {}))
+
+    def observe(self, name: str, seconds: float, *label_values: str) -> None:
+        with self._lock:
+            _, _, series = self._families[name]
+            hist = series.get(label_values)
+            if hist is None:
+                hist = series[label_values] = Histogram()
+            hist.observe(seconds)
+
+    def snapshot(self, name: str) -> dict:
+        """Return ``{label values: (count, sum)}`` for one family."""
+        with self._lock:
+            _, _, series = self._families[name]
+            return {labels: (h.count, h.sum) for labels, h in series.items()}
+
+    def render(self) -> str:
+        """All families in the Prometheus text exposition format (version 0.0.4)."""
+        lines = []
+        with self._lock:
+            for name, (help_text, label_names, series) in self._families.items():
+                full = f'{self.namespace}_{name}'
+                lines.append(f'# HELP {full} {help_text}')
+                lines.append(f'# TYPE {full} histogram')
+                for values, hist in sorted(series.items()):
+                    labels = ','.join(f'{k}="{_escape(v)}"' for k, v in zip(label_names, values))
+                    sep = ',' if labels else ''
+                    for bound, count in hist.cumulative():
+                        lines.append(f'{full}_bucket{{{labels}{sep}le="{bound}"}} {count}')
+                    suffix = f'{{{labels}}}' if labels else ''
+                    lines.append(f'{full}_sum{suffix} {hist.sum!r}')
+                    lines.append(f'{full}_count{suffix} {hist.count}')
+        return '\n'.join(lines) + '\n'
+
+    def clear(self) -> None:
+        with self._lock:
+            for _, _, series in self._families.values():
+                series.clear()
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+METRICS = MetricsRegistry()
+METRICS.register(
+    'request_duration_seconds', 'Time to serve an API request.', ('endpoint', 'method', 'status')
+)
+METRICS.register(
+    'stage_duration_seconds', 'Time spent per request in each named stage.', ('endpoint', 'stage')
+)
+METRICS.register(
+    'model_stage_duration_seconds', 'Time spent in each model stage, per algorithm.', ('algorithm', 'stage')
+)
+
+_TRACE: ContextVar[RequestTrace | None] = ContextVar('request_trace', default=None)
+_ALGORITHM: ContextVar[str | None] = ContextVar('span_algorithm', default=None)
+
+
+def current_trace() -> RequestTrace | None:
+    return _TRACE.get()
+
+
+def start_request(endpoint: str):
+    """Begin tracing the current request; pass the returned token to ``finish_request``."""
+    if not INSTRUMENTATION_ENABLED:
+        return None
+    return _TRACE.set(RequestTrace(endpoint))
+
+
+def finish_request(token, method: str, status: int) -> RequestTrace | None:
+    """Stop tracing and record the request and its stages in ``METRICS``."""
+    if token is None:
+        return None
+    trace = _TRACE.get()
+    _TRACE.reset(token)
+    if trace is None:
+        return None
+    METRICS.observe('request_duration_seconds', trace.elapsed(), trace.endpoint, method, str(status))
+    for name, seconds in trace.totals.items():
+        METRICS.observe('stage_duration_seconds', seconds, trace.endpoint, name)
+    return trace
+
+
+@contextmanager
+def span(name: str, algorithm: str | None = None):
+    """Time the enclosed block as stage ``name``.
+
+    ``algorithm`` labels this span and every span nested in it for the
+    per-algorithm histogram.
+    """
+    if not INSTRUMENTATION_ENABLED:
+        yield
+        return
+    token = _ALGORITHM.set(algorithm) if algorithm is not None else None
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        label = _ALGORITHM.get()
+        if token is not None:
+            _ALGORITHM.reset(token)
+        trace = _TRACE.get()
+        if trace is not None:
+            trace.add(name, seconds)
+        if label is not None:
+            METRICS.observe('model_stage_duration_seconds', seconds, label, name)
@@ -1,17 +1,134 @@
 """Linear Regression predictor."""
+import os
+from dataclasses import dataclass, replace
+
 import numpy as np
+from sklearn.base import clone
 from sklearn.linear_model import LinearRegression
 from .base import BasePredictor
+from .features import DAYS_COL, calendar_features
+
+# Fit every product's regression together with fit_many instead of one sklearn fit per product.
+LINEAR_BATCHED = os.environ.get('LINEAR_BATCHED', '1') != '0'
+
+
+def _days_between(start, end) -> int:
+    return int((np.datetime64(end, 'D') - np.datetime64(start, 'D')).astype(np.int64))
+
+
+@dataclass(frozen=True)
+class SufficientStats:
+    """Sums that determine an ordinary least-squares fit, with ``days_since_start`` counted from ``origin``.
+
+    Rows can be added and removed in O(features^2) each, so a sliding training
+    window is updated without revisiting the rows that stay.
+    """
+
+    origin: np.datetime64
+    n: int
+    sx: np.ndarray
+    sxx: np.ndarray
+    sy: float
+    sxy: np.ndarray
+
+    @classmethod
+    def from_rows(cls, origin, X: np.ndarray, y: np.ndarray) -> 'SufficientStats':
+        return cls(origin, len(y), X.sum(axis=0), X.T @ X, float(y.sum()), X.T @ y)
+
+    def add(self, X: np.ndarray, y: np.ndarray, sign: int = 1) -> 'SufficientStats':
+        """Stats with rows ``X``/``y`` (days counted from ``origin``) added (``sign=1``) or removed (``sign=-1``)."""
+        if len(y) == 0:
+            return self
+        return replace(
+            self,
+            n=self.n + sign * len(y),
+            sx=self.sx + sign * X.sum(axis=0),
+            sxx=self.sxx + sign * (X.T @ X),
+            sy=self.sy + sign * float(y.sum()),
+            sxy=self.sxy + sign * (X.T @ y),
+        )
+
+    def solve(self, origin) -> tuple[np.ndarray, float]:
+        """Minimum-norm least-squares ``(coef, intercept)`` for features counted from ``origin``.
+
+        Centering and the pseudo-inverse match sklearn's ``LinearRegression``
+        on rank-deficient windows (e.g. a constant ``month``).
+        """
+        mean_x, mean_y = self.sx / self.n, self.sy / self.n
+        gram = self.sxx - self.n * np.outer(mean_x, mean_x)
+        coef = np.linalg.pinv(gram, rcond=1e-10, hermitian=True) @ (self.sxy - self.n * mean_x * mean_y)
+        intercept = mean_y - mean_x @ coef
+        # Re-express days_since_start relative to the new window's first day.
+        return coef, float(intercept + coef[DAYS_COL] * _days_between(self.origin, origin))
+
+
+def fit_many(Xs: list[np.ndarray], ys: list[np.ndarray]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Ordinary least squares for many ``(X, y)`` series at once.
+
+    Returns ``(coef, intercept, residual_std)`` with one row per series.
+    Series of the same length are stacked and solved with one batched
+    pseudo-inverse of their centred features, which gives the minimum-norm
+    solution sklearn's ``LinearRegression`` finds, including on
+    rank-deficient windows. ``residual_std`` is the standard deviation of
+    ``y`` minus the predictions clipped at 0, as in ``BasePredictor.predict``.
+    """
+    coef = np.empty((len(ys), Xs[0].shape[1]))
+    intercept = np.empty(len(ys))
+    residual_std = np.empty(len(ys))
+    groups: dict[int, list[int]] = {}
+    for k, y in enumerate(ys):
+        groups.setdefault(len(y), []).append(k)
+
+    for members in groups.values():
+        X = np.stack([Xs[k] for k in members]).astype(np.float64)  # (series, rows, features)
+        y = np.stack([ys[k] for k in members]).astype(np.float64)  # (series, rows)
+        mean_x, mean_y = X.mean(axis=1), y.mean(axis=1)
+        group_coef = np.matmul(np.linalg.pinv(X - mean_x[:, None, :]), (y - mean_y[:, None])[..., None])[..., 0]
+        group_intercept = mean_y - np.einsum('sf,sf->s', mean_x, group_coef)
+        pred = np.maximum(np.matmul(X, group_coef[..., None])[..., 0] + group_intercept[:, None], 0)
+        coef[members], intercept[members], residual_std[members] = group_coef, group_intercept, (y - pred).std(axis=1)
+    return coef, intercept, residual_std
+
+
+def _linear_model(coef: np.ndarray, intercept: float) -> LinearRegression:
+    """A fitted ``LinearRegression`` with the given parameters."""
+    model = LinearRegression()
+    model.coef_, model.intercept_, model.n_features_in_ = coef, intercept, len(coef)
+    return model
 
 
 class LinearRegressionPredictor(BasePredictor):
     name = "Linear Regression"
+    exact_updates = True
 
-    def __init__(self):
+    def __init__(self, batched: bool = LINEAR_BATCHED):
         self.model = LinearRegression()
+        self.batched = batched
 
     def fit(self, X: np.ndarray, y: np.ndarray) -> None:
-        self.model.fit(X, y)
+        self.model = clone(self.model).fit(X, y)
 
     def predict_values(self, X: np.ndarray) -> np.ndarray:
-        return np.maximum(self.model.predict(X), 0)
+        # LinearRegression.predict without its input validation.
+        return np.maximum(X @ self.model.coef_ + self.model.intercept_, 0)
+
+    def _fit_batch(self, Xs, ys):
+        coef, intercept, residual_std = fit_many(Xs, ys)
+        return [(_linear_model(c, float(i)), float(s)) for c, i, s in zip(coef, intercept, residual_std)]
+
+    def _incremental_payload(self, dates, X, y):
+        return SufficientStats.from_rows(dates[0], X, y)
+
+    def _update_model(self, shift, dates, X, y):
+        state, stats = shift.state, shift.state.payload
+        if shift.dropped:
+            dropped = calendar_features(state.dates[:shift.dropped], origin=stats.origin)
+            stats = stats.add(dropped, state.values[:shift.dropped], sign=-1)
+        if shift.added:
+            # X counts days from this window's first day; the stats count from their origin.
+            added = X[len(X) - shift.added:].copy()
+            added[:, DAYS_COL] += _days_between(stats.origin, dates[0])
+            stats = stats.add(added, y[len(y) - shift.added:])
+        coef, intercept = stats.solve(dates[0])
+        self.model = _linear_model(coef, intercept)
+        return stats
@@ -1,6 +1,10 @@
 """LSTM predictor – PyTorch-based model for time-series forecasting."""
+import copy
+import math
+import os
 import numpy as np
-import pandas as pd
+from collections import Counter
+from numpy.lib.stride_tricks import sliding_window_view
 from datetime import timedelta
 import warnings
 
@@ -15,33 +19,313 @@ except ImportError:
     HAS_TORCH = False
 
 from .base import BasePredictor
+from .budget import BUDGET_STOP_REASONS, TrainingBudget
+from .frames import partition_by_product, to_sales_frame
+from .instrumentation import span
 
 LOOKBACK = 7  # days of history per sample
-
-
-class _LSTMNet(nn.Module):
-    """Simple LSTM → Linear network for single-step regression."""
-
-    def __init__(self, input_size: int = 1, hidden_size: int = 32):
-        super().__init__()
-        self.lstm = nn.LSTM(input_size, hidden_size, batch_first=True)
-        self.fc = nn.Linear(hidden_size, 1)
-
-    def forward(self, x: torch.Tensor) -> torch.Tensor:
-        # x: (batch, seq_len, input_size)
-        _, (h_n, _) = self.lstm(x)          # h_n: (1, batch, hidden)
-        out = self.fc(h_n.squeeze(0))       # (batch, 1)
-        return out
+BATCH_SIZE = 8
+# Epochs used to fine-tune a previous network when new days are appended.
+FINE_TUNE_EPOCHS = int(os.environ.get('LSTM_FINE_TUNE_EPOCHS', '5'))
+# Train the networks of all products together (see _StackedLSTM) instead of one after another.
+LSTM_BATCHED = os.environ.get('LSTM_BATCHED', '1') != '0'
+# How recursive forecasts feed predictions back in; see LSTMPredictor._forecast.
+FORECAST_MODES = ('window', 'stateful')
+LSTM_FORECAST_MODE = os.environ.get('LSTM_FORECAST_MODE', 'window')
+# Early stopping: epochs without a better validation loss before a network stops (0 disables),
+# with the most recent fraction of each series' samples held out for validation.
+LSTM_PATIENCE = int(os.environ.get('LSTM_PATIENCE', '5'))
+LSTM_VALIDATION_FRACTION = float(os.environ.get('LSTM_VALIDATION_FRACTION', '0.2'))
+# Wall-clock limit per training run (one network, or one stacked group); 0 means no limit.
+LSTM_TIME_BUDGET_MS = float(os.environ.get('LSTM_TIME_BUDGET_MS', '0'))
+
+
+# The network needs torch at class-definition time; without it the predictor
+# returns no forecasts (see HAS_TORCH in predict).
+if HAS_TORCH:
+    class _LSTMNet(nn.Module):
+        """Simple LSTM → Linear network for single-step regression."""
+
+        def __init__(self, input_size: int = 1, hidden_size: int = 32):
+            super().__init__()
+            self.lstm = nn.LSTM(input_size, hidden_size, batch_first=True)
+            self.fc = nn.Linear(hidden_size, 1)
+
+        def forward(self, x: torch.Tensor) -> torch.Tensor:
+            # x: (batch, seq_len, input_size)
+            _, (h_n, _) = self.lstm(x)          # h_n: (1, batch, hidden)
+            out = self.fc(h_n.squeeze(0))       # (batch, 1)
+            return out
+
+        def steps(self, x: torch.Tensor, state=None):
+            """Run ``x`` (batch, steps) on from ``state`` (default zeros).
+
+            Returns the output after the last step, (batch,), and the final ``(h, c)``.
+            """
+            _, (h_n, c_n) = self.lstm(x.unsqueeze(-1), state)
+            return self.fc(h_n.squeeze(0)).squeeze(-1), (h_n, c_n)
+
+    def _input_gates(x, weight_ih, bias_ih, bias_hh):
+        """Input contributions and biases of ``x`` (networks, batch, steps) for every step: (steps, networks, batch, 4 * hidden)."""
+        n = x.shape[0]
+        return x.permute(2, 0, 1).unsqueeze(-1) * weight_ih.view(1, n, 1, -1) + (bias_ih + bias_hh).view(1, n, 1, -1)
+
+    def _lstm_cell(gates, c, hidden: int):
+        """One ``nn.LSTM`` cell update from pre-activation ``gates``; returns ``(act, c, tanh_c, h)``."""
+        # Gate activations in nn.LSTM order: sigmoid, except tanh for the cell gate.
+        act = torch.sigmoid(gates)
+        act[..., 2 * hidden:3 * hidden] = torch.tanh(gates[..., 2 * hidden:3 * hidden])
+        i, f, g, o = act.chunk(4, dim=-1)
+        c = f * c + i * g
+        tanh_c = torch.tanh(c)
+        return act, c, tanh_c, o * tanh_c
+
+    class _StackedLSTM(nn.Module):
+        """``n`` independent ``_LSTMNet`` networks evaluated in one batched pass.
+
+        Every parameter has a leading network dimension, and network ``k``
+        only sees row ``k`` of the input. Because the networks share no
+        weights, summing their losses gives each one the gradient it would
+        get on its own, and Adam's per-element updates keep them independent.
+        Parameter layout and gate order (input, forget, cell, output) follow
+        ``nn.LSTM``, so ``from_nets``/``to_nets`` convert without changing
+        outputs.
+        """
+
+        _PARAMS = (
+            ('weight_ih', 'lstm.weight_ih_l0'),
+            ('weight_hh', 'lstm.weight_hh_l0'),
+            ('bias_ih', 'lstm.bias_ih_l0'),
+            ('bias_hh', 'lstm.bias_hh_l0'),
+            ('fc_weight', 'fc.weight'),
+            ('fc_bias', 'fc.bias'),
+        )
+
+        def __init__(self, n: int, hidden_size: int = 32):
+            super().__init__()
+            self.hidden_size = hidden_size
+            # Same initialization as nn.LSTM and nn.Linear(hidden_size, 1).
+            bound = 1 / math.sqrt(hidden_size)
+
+            def uniform(*shape):
+                return nn.Parameter(torch.empty(*shape).uniform_(-bound, bound))
+
+            self.weight_ih = uniform(n, 4 * hidden_size, 1)
+            self.weight_hh = uniform(n, 4 * hidden_size, hidden_size)
+            self.bias_ih = uniform(n, 4 * hidden_size)
+            self.bias_hh = uniform(n, 4 * hidden_size)
+            self.fc_weight = uniform(n, 1, hidden_size)
+            self.fc_bias = uniform(n, 1)
+
+        @classmethod
+        def from_nets(cls, nets: list) -> '_StackedLSTM':
+            stacked = cls(len(nets), nets[0].lstm.hidden_size)
+            with torch.no_grad():
+                for name, attr in cls._PARAMS:
+                    getattr(stacked, name).copy_(torch.stack([net.get_parameter(attr) for net in nets]))
+            return stacked
+
+        def to_nets(self) -> list:
+            nets = [_LSTMNet(input_size=1, hidden_size=self.hidden_size) for _ in range(self.weight_ih.shape[0])]
+            with torch.no_grad():
+                for name, attr in self._PARAMS:
+                    for net, value in zip(nets, getattr(self, name)):
+                        net.get_parameter(attr).copy_(value)
+            return nets
+
+        def forward(self, x: torch.Tensor) -> torch.Tensor:
+            # x: (networks, batch, seq_len) -> (networks, batch)
+            return _StackedLSTMFunction.apply(
+                x, self.weight_ih, self.weight_hh, self.bias_ih, self.bias_hh, self.fc_weight, self.fc_bias,
+            )
+
+        @torch.no_grad()
+        def steps(self, x: torch.Tensor, state=None):
+            """Run ``x`` (networks, batch, steps) on from ``state`` (default zeros), without autograd.
+
+            Returns the output after the last step, (networks, batch), and the final ``(h, c)``.
+            """
+            n, batch, seq_len = x.shape
+            if state is None:
+                state = (x.new_zeros(n, batch, self.hidden_size), x.new_zeros(n, batch, self.hidden_size))
+            h, c = state
+            w_hh = self.weight_hh.transpose(1, 2)
+            x_gates = _input_gates(x, self.weight_ih, self.bias_ih, self.bias_hh)
+            for t in range(seq_len):
+                _, c, _, h = _lstm_cell(torch.baddbmm(x_gates[t], h, w_hh), c, self.hidden_size)
+            return torch.baddbmm(self.fc_bias.unsqueeze(1), h, self.fc_weight.transpose(1, 2)).squeeze(-1), (h, c)
+
+    class _StackedLSTMFunction(torch.autograd.Function):
+        """Forward pass and backpropagation through time of ``_StackedLSTM`` as one autograd node.
+
+        For networks this small, recording each gate operation for autograd
+        costs more than the arithmetic, so the gradients are written out.
+        """
+
+        @staticmethod
+        def forward(ctx, x, weight_ih, weight_hh, bias_ih, bias_hh, fc_weight, fc_bias):
+            n, batch, seq_len = x.shape
+            hidden = weight_hh.shape[2]
+            w_hh = weight_hh.transpose(1, 2)
+            x_gates = _input_gates(x, weight_ih, bias_ih, bias_hh)
+            h = x.new_zeros(n, batch, hidden)
+            c = x.new_zeros(n, batch, hidden)
+            hs, cs, tanh_cs, acts = [h], [c], [], []
+            for t in range(seq_len):
+                act, c, tanh_c, h = _lstm_cell(torch.baddbmm(x_gates[t], h, w_hh), c, hidden)
+                hs.append(h)
+                cs.append(c)
+                tanh_cs.append(tanh_c)
+                acts.append(act)
+            ctx.save_for_backward(
+                x, weight_hh, fc_weight, torch.stack(hs), torch.stack(cs), torch.stack(tanh_cs), torch.stack(acts),
+            )
+            return torch.baddbmm(fc_bias.unsqueeze(1), h, fc_weight.transpose(1, 2)).squeeze(-1)
+
+        @staticmethod
+        def backward(ctx, grad_out):
+            x, weight_hh, fc_weight, hs, cs, tanh_cs, acts = ctx.saved_tensors
+            seq_len, n, batch, _ = acts.shape
+            grad_fc_weight = torch.bmm(grad_out.unsqueeze(1), hs[-1])
+            grad_fc_bias = grad_out.sum(dim=1, keepdim=True)
+
+            # Local derivatives for every step at once, so each step below is a few operations:
+            # d(gates) = [dc, dc, dc, dh] * local, d(c) += dh * cell, and d(c_prev) = d(c) * f.
+            i, f, g, o = acts.chunk(4, dim=-1)
+            local = torch.cat([g * i * (1 - i), cs[:-1] * f * (1 - f), i * (1 - g * g), tanh_cs * o * (1 - o)], dim=-1)
+            cell = o * (1 - tanh_cs * tanh_cs)
+
+            dh = grad_out.unsqueeze(-1) * fc_weight  # (n, batch, hidden)
+            dc = torch.zeros_like(dh)
+            d_gates = [None] * seq_len
+            for t in reversed(range(seq_len)):
+                dc = dc + dh * cell[t]
+                d_gates[t] = torch.cat([dc, dc, dc, dh], dim=-1) * local[t]
+                dc = dc * f[t]
+                dh = torch.bmm(d_gates[t], weight_hh)
+
+            # Weight gradients summed over every step and sample: rows are (step, sample) pairs.
+            dz = torch.stack(d_gates, dim=1).reshape(n, seq_len * batch, -1)
+            h_prev = hs[:-1].transpose(0, 1).reshape(n, seq_len * batch, -1)
+            x_steps = x.transpose(1, 2).reshape(n, seq_len * batch, 1)
+            grad_bias = dz.sum(dim=1)
+            return (
+                None,
+                torch.bmm(dz.transpose(1, 2), x_steps),
+                torch.bmm(dz.transpose(1, 2), h_prev),
+                grad_bias,
+                grad_bias,
+                grad_fc_weight,
+                grad_fc_bias,
+            )
+
+
+if HAS_TORCH:
+    class _EarlyStopping:
+        """Patience on each network's validation loss, keeping every network's best parameters.
+
+        ``params`` are tensors with one row per network along dim 0.
+        """
+
+        def __init__(self, params: list, patience: int):
+            self.params = params
+            self.patience = patience
+            n = params[0].shape[0]
+            self.best_loss = torch.full((n,), math.inf)
+            self.best = [p.detach().clone() for p in params]
+            self.waited = torch.zeros(n, dtype=torch.long)
+            self.epochs = torch.zeros(n, dtype=torch.long)
+            self.active = torch.ones(n, dtype=torch.bool)
+
+        def update(self, losses: torch.Tensor) -> bool:
+            """Record an epoch's validation ``losses`` (networks,); True once every network has stopped."""
+            self.epochs += self.active
+            improved = self.active & (losses < self.best_loss)
+            self.best_loss = torch.where(improved, losses, self.best_loss)
+            for p, best in zip(self.params, self.best):
+                best.copy_(torch.where(improved.view(-1, *[1] * (p.dim() - 1)), p.detach(), best))
+            self.waited = torch.where(improved, 0, self.waited + 1)
+            self.active &= self.waited < self.patience
+            return not bool(self.active.any())
+
+        @torch.no_grad()
+        def restore(self) -> None:
+            for p, best in zip(self.params, self.best):
+                p.copy_(best)
+
+
+def _validation_split(n_samples: int, patience: int) -> int:
+    """Samples to hold out (the most recent) for early stopping; 0 when disabled or too few."""
+    n_val = int(n_samples * LSTM_VALIDATION_FRACTION) if patience > 0 else 0
+    return n_val if n_val >= 1 and n_samples - n_val >= 2 else 0
+
+
+def _samples(scaled: np.ndarray):
+    """Return float32 ``(X, y)``: windows of LOOKBACK scaled days and the day after each, or None if fewer than 2.
+
+    ``X`` is a strided view over ``scaled`` with one row per window, not a copy.
+    """
+    series = scaled[:, 0].astype(np.float32, copy=False)
+    if len(series) - LOOKBACK < 2:
+        return None
+    # Marked writeable only so torch.from_numpy accepts it; the windows overlap and are never written.
+    return sliding_window_view(series, LOOKBACK, writeable=True)[:-1], series[LOOKBACK:]
 
 
 class LSTMPredictor(BasePredictor):
     """LSTM (Long Short-Term Memory) neural network predictor."""
 
     name = "LSTM"
+    artifact_suffix = '.pt'
+    artifact_backend = 'torch'
 
-    def __init__(self, epochs: int = 50, units: int = 32):
+    # Request-wide deadline / cancellation, set by callers such as SalesPredictor and ModelEvaluator.
+    budget: TrainingBudget | None = None
+
+    def __init__(self, epochs: int = 50, units: int = 32, batched: bool = LSTM_BATCHED,
+                 forecast_mode: str = LSTM_FORECAST_MODE, patience: int = LSTM_PATIENCE,
+                 time_budget_ms: float = LSTM_TIME_BUDGET_MS):
+        if forecast_mode not in FORECAST_MODES:
+            raise ValueError(f"forecast_mode must be one of: {', '.join(FORECAST_MODES)}")
         self.epochs = epochs
         self.units = units
+        self.batched = batched
+        self.forecast_mode = forecast_mode
+        self.patience = patience
+        self.time_budget_ms = time_budget_ms
+        self.training_runs: dict = {}
+        self._forecast_budget: TrainingBudget | None = None
+
+    def _cache_params(self) -> tuple:
+        return (self.epochs, self.units, self.patience)
+
+    def _save_artifact(self, value, path: str) -> None:
+        """Save the network's ``state_dict`` and the scaler's data range as plain tensors."""
+        model, scaler, residual_std = value
+        torch.save({
+            'state_dict': model.state_dict(),
+            'scaler_range': torch.from_numpy(np.stack([scaler.data_min_, scaler.data_max_])),
+            'residual_std': residual_std,
+        }, path)
+
+    def _load_artifact(self, path: str):
+        saved = torch.load(path, weights_only=True)
+        state = saved['state_dict']
+        model = _LSTMNet(input_size=1, hidden_size=state['lstm.weight_hh_l0'].shape[1])
+        model.load_state_dict(state)
+        # Fitting on the saved minimum and maximum rows reproduces the scaler exactly.
+        scaler = MinMaxScaler().fit(saved['scaler_range'].numpy())
+        return model.eval(), scaler, saved['residual_std']
+
+    def _run_budget(self) -> TrainingBudget:
+        """The request budget, limited to ``time_budget_ms`` from the start of the current ``predict``.
+
+        Every network trained for one forecast shares the limit, whether the
+        networks are trained together or one by one.
+        """
+        if self._forecast_budget is None:
+            return (self.budget or TrainingBudget()).limit(self.time_budget_ms)
+        return self._forecast_budget
 
     # ABC stubs – LSTM overrides predict() directly
     def fit(self, X: np.ndarray, y: np.ndarray) -> None:
@@ -50,114 +334,317 @@ class LSTMPredictor(BasePredictor):
     def predict_values(self, X: np.ndarray) -> np.ndarray:
         return np.zeros(X.shape[0])
 
+    def _train(self, values: np.ndarray, previous=None):
+        """Fit a network on one product's daily series.
+
+        Returns ``(model, scaler, residual_std)``, or None when the series is
+        too short to build training samples. With ``previous`` (an earlier
+        result), a copy of its network is fine-tuned for ``FINE_TUNE_EPOCHS``
+        on ``values`` using its scaler, instead of being trained from scratch.
+        """
+        if previous is None:
+            scaler = MinMaxScaler()
+            scaled = scaler.fit_transform(values)
+        else:
+            scaler = previous[1]
+            scaled = scaler.transform(values)
+
+        samples = _samples(scaled)
+        if samples is None:
+            return None
+        X_arr, y_arr = samples
+        X_arr, y_arr = X_arr.reshape(-1, LOOKBACK, 1), y_arr.reshape(-1, 1)
+
+        X_t = torch.from_numpy(X_arr)
+        y_t = torch.from_numpy(y_arr)
+
+        # Build and train model
+        if previous is None:
+            model, epochs = _LSTMNet(input_size=1, hidden_size=self.units), self.epochs
+        else:
+            model, epochs = copy.deepcopy(previous[0]), FINE_TUNE_EPOCHS
+        criterion = nn.MSELoss()
+        optimizer = torch.optim.Adam(model.parameters(), lr=0.01)
+
+        # The most recent samples are held out to decide when to stop.
+        n_val = _validation_split(X_t.shape[0], self.patience)
+        n_samples = X_t.shape[0] - n_val
+        stopping = _EarlyStopping([p.unsqueeze(0) for p in model.parameters()], self.patience) if n_val else None
+        budget = self._run_budget()
+        reason, trained = 'completed', 0
+
+        model.train()
+        batch_size = BATCH_SIZE
+        for _ in range(epochs):
+            # Mini-batch training
+            indices = torch.randperm(n_samples)
+            for start in range(0, n_samples, batch_size):
+                idx = indices[start:start + batch_size]
+                xb, yb = X_t[idx], y_t[idx]
+                pred = model(xb)
+                loss = criterion(pred, yb)
+                optimizer.zero_grad()
+                loss.backward()
+                optimizer.step()
+            trained += 1
+
+            if stopping is not None:
+                with torch.no_grad():
+                    val_loss = criterion(model(X_t[n_samples:]), y_t[n_samples:])
+                if stopping.update(val_loss.view(1)):
+                    reason = 'patience'
+                    break
+            reason = budget.stop_reason() or reason
+            if reason != 'completed':
+                break
+        if stopping is not None:
+            stopping.restore()
+        model.training_run = {'epochs': trained, 'stop_reason': reason}
+
+        # Estimate CI from training residuals
+        model.eval()
+        with torch.no_grad():
+            train_preds_scaled = model(X_t).numpy().flatten()
+        train_preds = scaler.inverse_transform(
+            train_preds_scaled.reshape(-1, 1)
+        ).flatten()
+        train_actual = scaler.inverse_transform(
+            y_arr
+        ).flatten()
+        residual_std = float(np.std(train_actual - train_preds))
+        return model, scaler, residual_std
+
+    def _train_stacked(self, series: list[np.ndarray]) -> list:
+        """``_train`` from scratch for several series at once, as one ``_StackedLSTM`` per sample count.
+
+        Each network still gets its own scaler, shuffled mini-batches of
+        ``BATCH_SIZE``, validation split and early stopping; only the Python
+        loop is shared. The group stops when every network has stopped or
+        the budget runs out.
+        """
+        results: list = [None] * len(series)
+        scalers = [MinMaxScaler() for _ in series]
+        groups: dict[int, list] = {}
+        for k, (values, scaler) in enumerate(zip(series, scalers)):
+            samples = _samples(scaler.fit_transform(values))
+            if samples is not None:
+                groups.setdefault(len(samples[1]), []).append((k, *samples))
+
+        for n_samples, group in groups.items():
+            X_t = torch.from_numpy(np.stack([X for _, X, _ in group]))  # (networks, samples, LOOKBACK)
+            y_t = torch.from_numpy(np.stack([y for _, _, y in group]))  # (networks, samples)
+            model = _StackedLSTM(len(group), hidden_size=self.units)
+            optimizer = torch.optim.Adam(model.parameters(), lr=0.01)
+
+            n_val = _validation_split(n_samples, self.patience)
+            n_train = n_samples - n_val
+            stopping = _EarlyStopping(list(model.parameters()), self.patience) if n_val else None
+            budget = self._run_budget()
+            reason, trained = 'completed', 0
+
+            model.train()
+            for _ in range(self.epochs):
+                # An independent shuffle per network, as when trained one by one.
+                order = torch.rand(len(group), n_train).argsort(dim=1)
+                for start in range(0, n_train, BATCH_SIZE):
+                    idx = order[:, start:start + BATCH_SIZE]
+                    xb = X_t.gather(1, idx.unsqueeze(-1).expand(-1, -1, LOOKBACK))
+                    # Sum of per-network MSE losses.
+                    loss = ((model(xb) - y_t.gather(1, idx)) ** 2).mean(dim=1).sum()
+                    optimizer.zero_grad()
+                    loss.backward()
+                    optimizer.step()
+                trained += 1
+
+                # Networks that have stopped keep training with the others, but
+                # their best parameters are restored afterwards.
+                if stopping is not None:
+                    val_pred, _ = model.steps(X_t[:, n_train:])
+                    if stopping.update(((val_pred - y_t[:, n_train:]) ** 2).mean(dim=1)):
+                        break
+                reason = budget.stop_reason() or reason
+                if reason != 'completed':
+                    break
+            if stopping is not None:
+                stopping.restore()
+
+            model.eval()
+            with torch.no_grad():
+                train_preds_scaled = model(X_t).numpy()
+            for j, ((k, _, y), net, preds) in enumerate(zip(group, model.to_nets(), train_preds_scaled)):
+                scaler = scalers[k]
+                residuals = scaler.inverse_transform(y.reshape(-1, 1)) - scaler.inverse_transform(preds.reshape(-1, 1))
+                if stopping is not None and not stopping.active[j]:
+                    net.training_run = {'epochs': int(stopping.epochs[j]), 'stop_reason': 'patience'}
+                else:
+                    net.training_run = {'epochs': trained, 'stop_reason': reason}
+                results[k] = (net.eval(), scaler, float(np.std(residuals)))
+        return results
+
+    def _fit_products(self, series: list[tuple], training_weeks: int) -> list:
+        """``(model, scaler, residual_std)`` or None for each ``(product, product_data, values)``.
+
+        Cached (or registry) networks are reused and shifted windows are fine-tuned one by
+        one; with ``batched``, the networks trained from scratch are trained
+        together by ``_train_stacked``. Each trained product's epochs and stop
+        reason go into ``training_runs``; networks cut short by the budget
+        are neither cached nor remembered for incremental updates.
+        """
+        fitted: list = [None] * len(series)
+        fresh = []
+        for k, (product, product_data, values) in enumerate(series):
+            try:
+                cache_key = self._cache_key(product, product_data, training_weeks)
+                cached = self._lookup_model(cache_key)
+                if cached is not None:
+                    fitted[k] = cached
+                    continue
+                if self.batched and self._lookup_shift(product, product_data, training_weeks) is None:
+                    fresh.append(k)
+                    continue
+                fitted[k] = self._fit_or_update(
+                    product, product_data, training_weeks,
+                    lambda: self._train(values), lambda shift: self._train(values, shift.state.payload),
+                )
+                if self._record_run(product, fitted[k]):
+                    self._store_model(cache_key, fitted[k])
+            except Exception as e:
+                print(f"[LSTM] Error forecasting {product}: {e}")
+
+        if fresh:
+            try:
+                with span('fit'):
+                    trained = self._train_stacked([series[k][2] for k in fresh])
+            except Exception as e:
+                # Train one by one so a bad series only loses its own product.
+                print(f"[LSTM] Error training networks together, training one by one: {e}")
+                trained = [self._train_alone(series[k][0], series[k][2]) for k in fresh]
+            for k, result in zip(fresh, trained):
+                if result is None:
+                    continue
+                product, product_data, _ = series[k]
+                self.model_updates['full'] += 1
+                self._remember_window(product, product_data, training_weeks, result)
+                cache_key = self._cache_key(product, product_data, training_weeks)
+                if self._record_run(product, result):
+                    self._store_model(cache_key, result)
+                fitted[k] = result
+        return fitted
+
+    def _remember_window(self, product, product_data, training_weeks, payload, appended=0):
+        # A network cut short by the budget is not kept for later updates either.
+        run = getattr(payload[0], 'training_run', None) if payload is not None else None
+        if run is None or run['stop_reason'] not in BUDGET_STOP_REASONS:
+            super()._remember_window(product, product_data, training_weeks, payload, appended)
+
+    def _train_alone(self, product, values: np.ndarray):
+        """``_train`` from scratch, or None (logged) if it fails."""
+        try:
+            with span('fit'):
+                return self._train(values)
+        except Exception as e:
+            print(f"[LSTM] Error forecasting {product}: {e}")
+            return None
+
+    def _record_run(self, product, result) -> bool:
+        """Add a newly trained ``result`` to ``training_runs``; True if it finished and may be cached."""
+        if result is None:
+            return False
+        run = getattr(result[0], 'training_run', None)
+        if run is None:
+            return True
+        self.training_runs[product] = run
+        return run['stop_reason'] not in BUDGET_STOP_REASONS
+
+    def _forecast(self, models: list, windows: np.ndarray, n_forecast: int) -> np.ndarray:
+        """Scaled forecasts, (networks, n_forecast), feeding each prediction back as the next input.
+
+        ``windows`` holds each network's last LOOKBACK scaled values. The
+        inputs and predictions share one preallocated buffer. With
+        ``batched``, all networks run together as a ``_StackedLSTM``.
+
+        ``forecast_mode`` ``window`` re-runs each network over the latest
+        LOOKBACK values for every step, exactly as in training. ``stateful``
+        runs the window once and then carries the LSTM state forward, feeding
+        in one value per step. Its cost no longer grows with LOOKBACK x
+        horizon, but the state covers more history than the windows the
+        network was trained on, so forecasts differ slightly.
+        """
+        if self.batched:
+            stacked = _StackedLSTM.from_nets(models)
+
+            def run(x, state=None):
+                out, state = stacked.steps(x.unsqueeze(1), state)
+                return out[:, 0], state
+
+            runners = [(run, slice(0, len(models)))]
+        else:
+            runners = [(net.steps, slice(k, k + 1)) for k, net in enumerate(models)]
+
+        buffer = torch.empty(len(models), LOOKBACK + n_forecast)
+        buffer[:, :LOOKBACK] = torch.from_numpy(windows)
+        with torch.no_grad():
+            for run, rows in runners:
+                block = buffer[rows]
+                if self.forecast_mode == 'stateful' and n_forecast:
+                    block[:, LOOKBACK], state = run(block[:, :LOOKBACK])
+                    for i in range(LOOKBACK + 1, LOOKBACK + n_forecast):
+                        block[:, i], state = run(block[:, i - 1:i], state)
+                else:
+                    for i in range(n_forecast):
+                        block[:, LOOKBACK + i] = run(block[:, i:i + LOOKBACK])[0]
+        return buffer[:, LOOKBACK:].numpy().astype(np.float64)
+
     def predict(self, sales_data, training_weeks: int, forecast_weeks: int = 4):
+        self.model_updates = Counter()
+        self.training_runs = {}
         if not HAS_TORCH:
             return []
 
-        df = pd.DataFrame(sales_data)
-        df['date'] = pd.to_datetime(df['date'])
+        df = to_sales_frame(sales_data)
 
         cutoff_date = df['date'].max() - timedelta(weeks=training_weeks)
-        training_df = df[df['date'] >= cutoff_date].copy()
-
-        products = training_df['product'].unique()
+        with span('partition'):
+            training = partition_by_product(df[df['date'] >= cutoff_date])
         all_predictions: list[dict] = []
 
         last_date = df['date'].max()
         n_forecast = forecast_weeks * 7
+        forecast_dates = [last_date + timedelta(days=i + 1) for i in range(n_forecast)]
 
-        for product in products:
-            try:
-                product_data = training_df[training_df['product'] == product].copy()
-                if len(product_data) < LOOKBACK + 3:
-                    continue
-
-                product_data = product_data.sort_values('date')
-                ts = product_data.set_index('date')['unitsSold'].asfreq('D')
-                ts = ts.ffill().bfill().fillna(0)
-                values = ts.values.reshape(-1, 1).astype('float32')
-
-                scaler = MinMaxScaler()
-                scaled = scaler.fit_transform(values)
-
-                # Build supervised samples
-                X_seq, y_seq = [], []
-                for i in range(LOOKBACK, len(scaled)):
-                    X_seq.append(scaled[i - LOOKBACK:i, 0])
-                    y_seq.append(scaled[i, 0])
-
-                if len(X_seq) < 2:
-                    continue
-
-                X_arr = np.array(X_seq, dtype=np.float32).reshape(-1, LOOKBACK, 1)
-                y_arr = np.array(y_seq, dtype=np.float32).reshape(-1, 1)
-
-                X_t = torch.from_numpy(X_arr)
-                y_t = torch.from_numpy(y_arr)
-
-                # Build and train model
-                model = _LSTMNet(input_size=1, hidden_size=self.units)
-                criterion = nn.MSELoss()
-                optimizer = torch.optim.Adam(model.parameters(), lr=0.01)
-
-                model.train()
-                batch_size = 8
-                n_samples = X_t.shape[0]
-                for _ in range(self.epochs):
-                    # Mini-batch training
-                    indices = torch.randperm(n_samples)
-                    for start in range(0, n_samples, batch_size):
-                        idx = indices[start:start + batch_size]
-                        xb, yb = X_t[idx], y_t[idx]
-                        pred = model(xb)
-                        loss = criterion(pred, yb)
-                        optimizer.zero_grad()
-                        loss.backward()
-                        optimizer.step()
-
-                # Iteratively forecast
-                model.eval()
-                last_window = scaled[-LOOKBACK:, 0].tolist()
-                preds_scaled = []
-                with torch.no_grad():
-                    for _ in range(n_forecast):
-                        x_in = torch.tensor(
-                            [last_window[-LOOKBACK:]],
-                            dtype=torch.float32
-                        ).unsqueeze(-1)  # (1, LOOKBACK, 1)
-                        p = float(model(x_in).item())
-                        preds_scaled.append(p)
-                        last_window.append(p)
-
-                preds = scaler.inverse_transform(
-                    np.array(preds_scaled).reshape(-1, 1)
-                ).flatten()
-
-                # Estimate CI from training residuals
-                model.eval()
-                with torch.no_grad():
-                    train_preds_scaled = model(X_t).numpy().flatten()
-                train_preds = scaler.inverse_transform(
-                    train_preds_scaled.reshape(-1, 1)
-                ).flatten()
-                train_actual = scaler.inverse_transform(
-                    y_arr
-                ).flatten()
-                residual_std = float(np.std(train_actual - train_preds))
-
-                forecast_dates = [last_date + timedelta(days=i + 1) for i in range(n_forecast)]
-                for i, fdate in enumerate(forecast_dates):
-                    pred_val = max(0, round(float(preds[i]), 1))
-                    ci_lo = max(0, round(pred_val - 1.96 * residual_std, 1))
-                    ci_hi = round(pred_val + 1.96 * residual_std, 1)
-                    all_predictions.append({
-                        'date': fdate.strftime('%Y-%m-%d'),
-                        'product': product,
-                        'predicted_sales': pred_val,
-                        'confidence_interval': [ci_lo, ci_hi],
-                    })
-            except Exception as e:
-                print(f"[LSTM] Error forecasting {product}: {e}")
+        series = []
+        for product, product_data in training:
+            if len(product_data) < LOOKBACK + 3:
                 continue
+            ts = product_data.set_index('date')['unitsSold'].asfreq('D')
+            ts = ts.ffill().bfill().fillna(0)
+            series.append((product, product_data, ts.values.reshape(-1, 1).astype('float32')))
+
+        self._forecast_budget = (self.budget or TrainingBudget()).limit(self.time_budget_ms)
+        try:
+            fitted = self._fit_products(series, training_weeks)
+        finally:
+            self._forecast_budget = None
+        ready = [(s, f) for s, f in zip(series, fitted) if f is not None]
+        windows = [f[1].transform(values)[-LOOKBACK:, 0] for (_, _, values), f in ready]
+
+        if not ready:
+            return all_predictions
+        with span('forecast'):
+            forecasts = self._forecast([f[0] for _, f in ready], np.stack(windows), n_forecast)
+
+        for ((product, _, _), (_, scaler, residual_std)), preds_scaled in zip(ready, forecasts):
+            preds = scaler.inverse_transform(preds_scaled.reshape(-1, 1)).flatten()
+
+            for i, fdate in enumerate(forecast_dates):
+                pred_val = max(0, round(float(preds[i]), 1))
+                ci_lo = max(0, round(pred_val - 1.96 * residual_std, 1))
+                ci_hi = round(pred_val + 1.96 * residual_std, 1)
+                all_predictions.append({
+                    'date': fdate.strftime('%Y-%m-%d'),
+                    'product': product,
+                    'predicted_sales': pred_val,
+                    'confidence_interval': [ci_lo, ci_hi],
+                })
 
         return all_predictions
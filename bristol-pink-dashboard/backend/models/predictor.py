@@ -1,16 +1,51 @@
 """Thin wrapper kept for backward-compatibility with app.py imports."""
 from . import ALGORITHM_MAP
+from .cache import MODEL_CACHE
+from .incremental import INCREMENTAL_STATES, INCREMENTAL_UPDATES
+from .instrumentation import span
 from .linear_regression import LinearRegressionPredictor
+from .registry import MODEL_REGISTRY, MODEL_REGISTRY_ENABLED
 
 
 class SalesPredictor:
-    """Instantiates the right predictor model and delegates to it."""
+    """Instantiates the right predictor model and delegates to it.
 
-    def __init__(self, algorithm: str = 'linear_regression'):
+    Fitted per-product models are shared through ``MODEL_CACHE``, so repeating a
+    forecast over the same training slice skips ``fit()``. With
+    ``MODEL_REGISTRY`` enabled they are also saved to, and on a cache miss
+    loaded from, the on-disk ``MODEL_REGISTRY``. When the slice has only
+    moved on by a few appended days, models are updated from their previous
+    state in ``INCREMENTAL_STATES`` instead of refitted.
+
+    ``budget`` (a ``TrainingBudget``) bounds iterative training (LSTM) by a
+    deadline and/or cancellation token.
+    """
+
+    def __init__(self, algorithm: str = 'linear_regression', use_cache: bool = True, budget=None):
         cls = ALGORITHM_MAP.get(algorithm)
         if cls is None:
-            cls = LinearRegressionPredictor
+            algorithm, cls = 'linear_regression', LinearRegressionPredictor
+        self.algorithm = algorithm
         self._predictor = cls()
+        if use_cache:
+            self._predictor.cache = MODEL_CACHE
+            if INCREMENTAL_UPDATES:
+                self._predictor.incremental = INCREMENTAL_STATES
+            if MODEL_REGISTRY_ENABLED:
+                self._predictor.registry = MODEL_REGISTRY
+        if budget is not None:
+            self._predictor.budget = budget
 
     def predict(self, sales_data, training_weeks: int, forecast_weeks: int = 4):
-        return self._predictor.predict(sales_data, training_weeks, forecast_weeks)
+        with span('predict', algorithm=self.algorithm):
+            return self._predictor.predict(sales_data, training_weeks, forecast_weeks)
+
+    @property
+    def model_updates(self) -> dict:
+        """How many products' models the last ``predict`` took from cache or the registry, updated incrementally or refitted."""
+        return dict(getattr(self._predictor, 'model_updates', {}))
+
+    @property
+    def training_runs(self) -> dict:
+        """Epochs trained and stop reason per product trained by the last ``predict`` (iterative models only)."""
+        return dict(getattr(self._predictor, 'training_runs', {}))
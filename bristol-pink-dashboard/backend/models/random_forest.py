@@ -1,5 +1,6 @@
 """Random Forest predictor."""
 import numpy as np
+from sklearn.base import clone
 from sklearn.ensemble import RandomForestRegressor
 from .base import BasePredictor
 
@@ -11,7 +12,7 @@ class RandomForestPredictor(BasePredictor):
         self.model = RandomForestRegressor(n_estimators=100, random_state=42)
 
     def fit(self, X: np.ndarray, y: np.ndarray) -> None:
-        self.model.fit(X, y)
+        self.model = clone(self.model).fit(X, y)
 
     def predict_values(self, X: np.ndarray) -> np.ndarray:
         return np.maximum(self.model.predict(X), 0)
@@ -0,0 +1,290 @@
+"""On-disk registry of fitted models, shared across restarts and worker processes.
+
+``MODEL_CACHE`` only lives as long as the process. With ``MODEL_REGISTRY``
+enabled, ``SalesPredictor`` also saves every cached model to
+``MODEL_REGISTRY_DIR`` and loads from there when the in-process cache
+misses.
+
+An artifact is keyed by the model cache key: the fingerprint of the
+product's training rows, the predictor class and its settings, the
+training window and the product. It is stored as two files:
+
+- ``<id><suffix>`` - the fitted model, written by the predictor's
+  ``_save_artifact``. sklearn models use uncompressed joblib, so their
+  arrays are memory-mapped on load. LSTMs save a ``state_dict`` and scaler
+  range, and ARIMA saves its parameters and series.
+- ``<id>.json`` - metadata: the key fields, the format version, the
+  versions of numpy and the model's backend, the data file's size and
+  SHA-256 checksum, and when it was created.
+
+Metadata is written last, so a listed artifact always has its data. An
+artifact whose checksum, format version or library versions do not match
+is treated as a miss and removed. ``gc`` drops artifacts unused for
+``MODEL_REGISTRY_MAX_AGE_DAYS``, then the least recently used ones beyond
+``MODEL_REGISTRY_MAX_ENTRIES`` or ``MODEL_REGISTRY_MAX_MB``. A load counts
+as a use; it updates the metadata file's modification time. ``gc`` runs
+after a save, at most every ``MODEL_REGISTRY_GC_INTERVAL_SECONDS``. Artifacts
+are only checked against corruption, not tampering, so the directory must
+only be writable by the service.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from importlib import metadata
+
+MODEL_REGISTRY_ENABLED = os.environ.get('MODEL_REGISTRY', '0') != '0'
+MODEL_REGISTRY_DIR = os.environ.get(
+    'MODEL_REGISTRY_DIR', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'models')
+)
+MODEL_REGISTRY_MAX_ENTRIES = int(os.environ.get('MODEL_REGISTRY_MAX_ENTRIES', '2000'))
+MODEL_REGISTRY_MAX_MB = int(os.environ.get('MODEL_REGISTRY_MAX_MB', '1024'))
+MODEL_REGISTRY_MAX_AGE_DAYS = float(os.environ.get('MODEL_REGISTRY_MAX_AGE_DAYS', '30'))
+# Minimum time between the collections that run after saves.
+MODEL_REGISTRY_GC_INTERVAL_SECONDS = float(os.environ.get('MODEL_REGISTRY_GC_INTERVAL_SECONDS', '60'))
+
+# Bumped when the artifact layout changes; artifacts of other versions are misses and collected.
+ARTIFACT_VERSION = 1
+# Files without metadata younger than this may still be being written by another process.
+_ORPHAN_GRACE_SECONDS = 3600
+
+
+def artifact_id(key: tuple) -> str:
+    return hashlib.sha256(repr(key).encode('utf-8')).hexdigest()[:32]
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def _installed_version(package: str) -> str | None:
+    try:
+        return metadata.version(package)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def _library_versions(backend: str) -> dict:
+    return {package: _installed_version(package) for package in dict.fromkeys(('numpy', backend))}
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class ModelRegistry:
+    """Fitted models on disk, keyed like ``MODEL_CACHE``; see the module docstring."""
+
+    def __init__(self, directory: str = MODEL_REGISTRY_DIR, max_entries: int = MODEL_REGISTRY_MAX_ENTRIES,
+                 max_bytes: int = MODEL_REGISTRY_MAX_MB * 1024 * 1024,
+                 max_age_seconds: float = MODEL_REGISTRY_MAX_AGE_DAYS * 86400,
+                 gc_interval_seconds: float = MODEL_REGISTRY_GC_INTERVAL_SECONDS):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.gc_interval_seconds = gc_interval_seconds
+        self._last_gc = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saves = 0
+        self.errors = 0
+
+    def _path(self, ident: str, suffix: str) -> str:
+        return os.path.join(self.directory, ident + suffix)
+
+    def _temp_path(self, ident: str, suffix: str) -> str:
+        """A new temporary file for ``ident``, unique across threads and processes."""
+        fd, path = tempfile.mkstemp(suffix='.tmp', prefix=f'{ident}{suffix}.', dir=self.directory)
+        os.close(fd)
+        return path
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def load(self, predictor, key: tuple):
+        """The model saved for ``key``, or None when there is no valid artifact."""
+        ident = artifact_id(key)
+        meta = self.get(ident)
+        value = None
+        if meta is not None:
+            path = self._path(ident, meta['suffix'])
+            try:
+                if not self._compatible(meta, predictor) or _sha256(path) != meta['sha256']:
+                    raise ValueError('stale or corrupt artifact')
+                value = predictor._load_artifact(path)
+                os.utime(self._path(ident, '.json'))
+            except Exception:
+                self._count('errors')
+                self._delete(ident, meta['suffix'])
+                value = None
+        self._count('misses' if value is None else 'hits')
+        return value
+
+    def save(self, predictor, key: tuple, value) -> bool:
+        """Store ``value`` for ``key``; False (and nothing stored) if it could not be written."""
+        ident = artifact_id(key)
+        suffix = predictor.artifact_suffix
+        path = self._path(ident, suffix)
+        fingerprint, predictor_class, params, training_weeks, product = key
+        tmp = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp = self._temp_path(ident, suffix)
+            predictor._save_artifact(value, tmp)
+            os.replace(tmp, path)
+            meta = {
+                'artifact_id': ident,
+                'predictor': predictor_class,
+                'params': repr(params),
+                'product': str(product),
+                'training_weeks': training_weeks,
+                'fingerprint': fingerprint,
+                'version': ARTIFACT_VERSION,
+                'libraries': _library_versions(predictor.artifact_backend),
+                'suffix': suffix,
+                'bytes': os.path.getsize(path),
+                'sha256': _sha256(path),
+                'created_at': datetime.now(timezone.utc).isoformat(),
+            }
+            tmp = self._temp_path(ident, '.json')
+            with open(tmp, 'w', encoding='utf-8') as fh:
+                json.dump(meta, fh)
+            os.replace(tmp, self._path(ident, '.json'))
+        except Exception:
+            self._count('errors')
+            if tmp is not None:
+                _remove(tmp)
+            return False
+        self._count('saves')
+        if self._last_gc is None or time.monotonic() - self._last_gc >= self.gc_interval_seconds:
+            self.gc()
+        return True
+
+    @staticmethod
+    def _compatible(meta: dict, predictor) -> bool:
+        return (
+            meta.get('version') == ARTIFACT_VERSION
+            and meta.get('predictor') == type(predictor).__name__
+            and meta.get('libraries') == _library_versions(predictor.artifact_backend)
+        )
+
+    def get(self, ident: str) -> dict | None:
+        """Metadata of a stored artifact."""
+        if not ident or not all(c in '0123456789abcdef' for c in ident):
+            return None
+        try:
+            with open(self._path(ident, '.json'), encoding='utf-8') as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def _entries(self) -> list[tuple[float, str, dict]]:
+        """``(last_used, id, meta)`` of every artifact, least recently used first."""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            ident = name[:-5]
+            meta = self.get(ident)
+            try:
+                used = os.path.getmtime(self._path(ident, '.json'))
+            except OSError:
+                continue
+            entries.append((used, ident, meta or {}))
+        entries.sort(key=lambda entry: entry[0])
+        return entries
+
+    def list(self) -> list[dict]:
+        """Metadata of stored artifacts, most recently used first, with ``last_used_at``."""
+        return [
+            {**meta, 'last_used_at': datetime.fromtimestamp(used, timezone.utc).isoformat()}
+            for used, _ident, meta in reversed(self._entries())
+            if meta
+        ]
+
+    def _delete(self, ident: str, suffix: str | None) -> None:
+        _remove(self._path(ident, '.json'))
+        if suffix:
+            _remove(self._path(ident, suffix))
+
+    def gc(self, now: float | None = None) -> int:
+        """Apply the age, count and size limits and remove leftover files; returns artifacts removed."""
+        now = time.time() if now is None else now
+        removed = 0
+        with self._lock:
+            self._last_gc = time.monotonic()
+            entries = self._entries()
+            keep = []
+            for used, ident, meta in entries:
+                if not meta or meta.get('version') != ARTIFACT_VERSION or now - used > self.max_age_seconds:
+                    self._delete(ident, meta.get('suffix'))
+                    removed += 1
+                else:
+                    keep.append((ident, meta))
+            total = sum(meta.get('bytes', 0) for _ident, meta in keep)
+            while keep and (len(keep) > self.max_entries or total > self.max_bytes):
+                ident, meta = keep.pop(0)
+                total -= meta.get('bytes', 0)
+                self._delete(ident, meta.get('suffix'))
+                removed += 1
+            self._remove_orphans({ident for ident, _meta in keep}, now)
+        return removed
+
+    def _remove_orphans(self, live: set, now: float) -> None:
+        """Delete data and temporary files that no metadata refers to, once they are old enough."""
+        for name in os.listdir(self.directory) if os.path.isdir(self.directory) else ():
+            if name.endswith('.json') or (name.split('.', 1)[0] in live and not name.endswith('.tmp')):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if now - os.path.getmtime(path) > _ORPHAN_GRACE_SECONDS:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            if os.path.isdir(self.directory):
+                for name in os.listdir(self.directory):
+                    _remove(os.path.join(self.directory, name))
+            self.hits = self.misses = self.saves = self.errors = 0
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        return {
+            'directory': self.directory,
+            'entries': len(entries),
+            'bytes': sum(meta.get('bytes', 0) for _used, _ident, meta in entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'saves': self.saves,
+            'errors': self.errors,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'max_age_seconds': self.max_age_seconds,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+
+MODEL_REGISTRY = ModelRegistry()
@@ -0,0 +1,226 @@
+"""On-demand profiling of live API requests.
+
+Profiling is off until a manager either arms it for the next N requests
+(``POST /api/profiles/arm``) or sends ``X-Profile: 1`` on a request. Only
+requests that pass ``require_auth`` can be profiled, and the check done for
+every other request is an integer read and a header lookup.
+
+Two modes are available:
+
+- ``sample``: a background thread samples the request thread's stack every
+  ``PROFILE_SAMPLE_INTERVAL_MS``. The stacks are stored in collapsed form
+  (``frame;frame;frame count``) for flamegraph tools.
+- ``cprofile``: deterministic ``cProfile`` statistics, stored as a
+  ``pstats`` file.
+
+Profiles are written to ``PROFILE_DIR``. Only the newest
+``PROFILE_MAX_KEEP`` are kept.
+"""
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", os.path.join(os.path.dirname(__file__), "data", "profiles"))
+PROFILE_MAX_KEEP = int(os.environ.get("PROFILE_MAX_KEEP", "50"))
+PROFILE_MODE = os.environ.get("PROFILE_MODE", "sample")
+PROFILE_SAMPLE_INTERVAL_MS = float(os.environ.get("PROFILE_SAMPLE_INTERVAL_MS", "5"))
+PROFILE_MAX_ARMED = int(os.environ.get("PROFILE_MAX_ARMED", "100"))
+
+PROFILE_MODES = ("sample", "cprofile")
+PROFILE_HEADER = "X-Profile"
+
+
+def _frame_label(code) -> str:
+    # co_qualname is new in Python 3.11.
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{os.path.basename(code.co_filename)}:{name}:{code.co_firstlineno}"
+
+
+class StackSampler:
+    """Collects collapsed stacks of one thread, from below ``root`` down to the running frame."""
+
+    def __init__(self, thread_id: int, root, interval_ms: float = PROFILE_SAMPLE_INTERVAL_MS):
+        self.thread_id = thread_id
+        self.root = root
+        self.interval = interval_ms / 1000
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None and frame is not self.root:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+                self.samples += 1
+
+    def __enter__(self) -> "StackSampler":
+        self._thread = threading.Thread(target=self._sample, name="profile-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """Profiles on disk as ``<id>.json`` metadata plus ``<id>.collapsed`` or ``<id>.prof`` data."""
+
+    SUFFIXES = {"collapsed": ".collapsed", "pstats": ".prof"}
+
+    def __init__(self, directory: str = PROFILE_DIR, max_keep: int = PROFILE_MAX_KEEP):
+        self.directory = directory
+        self.max_keep = max_keep
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def new_id() -> str:
+        # Sortable by creation time.
+        return datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f") + "-" + secrets.token_hex(3)
+
+    def _path(self, profile_id: str, suffix: str) -> str:
+        return os.path.join(self.directory, profile_id + suffix)
+
+    def save(self, meta: dict, collapsed: str | None = None, profiler: cProfile.Profile | None = None) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        profile_id = meta["profile_id"]
+        if collapsed is not None:
+            with open(self._path(profile_id, ".collapsed"), "w", encoding="utf-8") as fh:
+                fh.write(collapsed)
+        if profiler is not None:
+            profiler.dump_stats(self._path(profile_id, ".prof"))
+        # Metadata last, so listed profiles always have their data.
+        tmp = self._path(profile_id, ".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh)
+        os.replace(tmp, self._path(profile_id, ".json"))
+        self._prune()
+
+    def _ids(self) -> list[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-5] for name in os.listdir(self.directory) if name.endswith(".json"))
+
+    def _prune(self) -> None:
+        with self._lock:
+            ids = self._ids()
+            for profile_id in ids[: max(0, len(ids) - self.max_keep)]:
+                for suffix in (".json", *self.SUFFIXES.values()):
+                    try:
+                        os.remove(self._path(profile_id, suffix))
+                    except FileNotFoundError:
+                        pass
+
+    def list(self) -> list[dict]:
+        """Metadata of stored profiles, newest first."""
+        return [meta for meta in map(self.get, reversed(self._ids())) if meta is not None]
+
+    def get(self, profile_id: str) -> dict | None:
+        if not profile_id or os.sep in profile_id or profile_id.startswith("."):
+            return None
+        try:
+            with open(self._path(profile_id, ".json"), encoding="utf-8") as fh:
+                return json.load(fh)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def data_path(self, profile_id: str, kind: str) -> str | None:
+        """Path of the ``collapsed`` or ``pstats`` file of a stored profile, if it exists."""
+        if kind not in self.SUFFIXES or self.get(profile_id) is None:
+            return None
+        path = self._path(profile_id, self.SUFFIXES[kind])
+        return path if os.path.exists(path) else None
+
+
+class RequestProfiler:
+    """Decides which requests to profile and runs them under the profiler."""
+
+    def __init__(self, store: ProfileStore, mode: str = PROFILE_MODE, interval_ms: float = PROFILE_SAMPLE_INTERVAL_MS):
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"mode must be one of {PROFILE_MODES}")
+        self.store = store
+        self.mode = mode
+        self.interval_ms = interval_ms
+        self._armed = 0
+        self._armed_mode = mode
+        self._armed_endpoint: str | None = None
+        self._lock = threading.Lock()
+
+    def arm(self, count: int, mode: str | None = None, endpoint: str | None = None) -> dict:
+        """Profile the next ``count`` authenticated requests (to ``endpoint`` only, if given); 0 disarms."""
+        mode = mode or self.mode
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"mode must be one of: {', '.join(PROFILE_MODES)}")
+        with self._lock:
+            self._armed = max(0, min(int(count), PROFILE_MAX_ARMED))
+            self._armed_mode = mode
+            self._armed_endpoint = endpoint
+        return self.status()
+
+    def status(self) -> dict:
+        with self._lock:
+            return {"remaining": self._armed, "mode": self._armed_mode, "endpoint": self._armed_endpoint}
+
+    def claim(self, role: str, header: str | None, endpoint: str | None) -> tuple[str, str] | None:
+        """Return ``(trigger, mode)`` when this request should be profiled."""
+        if header == "1" and role == "manager":
+            return "header", self.mode
+        if not self._armed:
+            return None
+        with self._lock:
+            if not self._armed or self._armed_endpoint not in (None, endpoint):
+                return None
+            self._armed -= 1
+            return "armed", self._armed_mode
+
+    def run(self, func, meta: dict, mode: str):
+        """Call ``func()`` under the profiler and store the profile; returns ``(result, profile_id)``."""
+        meta = {**meta, "profile_id": ProfileStore.new_id(), "mode": mode,
+                "started_at": datetime.now(timezone.utc).isoformat()}
+        started = time.perf_counter()
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:  # another profiler is active in this process
+                return func(), None
+            try:
+                result = func()
+                meta["status"] = getattr(result, "status_code", None)
+            finally:
+                profiler.disable()
+                meta["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                self.store.save(meta, profiler=profiler)
+        else:
+            sampler = StackSampler(threading.get_ident(), sys._getframe(), self.interval_ms)
+            try:
+                with sampler:
+                    result = func()
+                meta["status"] = getattr(result, "status_code", None)
+            finally:
+                meta["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                meta["samples"] = sampler.samples
+                meta["interval_ms"] = self.interval_ms
+                self.store.save(meta, collapsed=sampler.collapsed())
+        return result, meta["profile_id"]
+
+
+PROFILER = RequestProfiler(ProfileStore())
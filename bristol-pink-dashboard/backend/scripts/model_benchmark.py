@@ -0,0 +1,280 @@
+"""Microbenchmark the model layer directly, without Flask, auth or audit logging.
+
+Times these stages for each available algorithm on a deterministic synthetic
+dataset (``scripts/synthetic_sales.py``):
+
+- ``predict`` - ``BasePredictor.predict`` (or the ARIMA/LSTM override), model cache off
+- ``fit`` / ``predict_values`` - one product's training slice; for LSTM ``fit`` is
+  ``_train`` because its ``fit`` is a stub, and ARIMA, which fits inside
+  ``predict``, has neither
+- ``evaluate`` - ``ModelEvaluator.evaluate``, result cache off
+- ``prepare_features`` - ``BasePredictor._prepare_features`` on the whole frame, listed under ``base``
+
+Each case runs ``--warmup`` untimed calls, then ``--repeats`` timed calls.
+Samples outside the 1.5 x IQR fences are dropped before the summary. Peak
+Python allocations come from one extra call under tracemalloc, and the
+process RSS is sampled in the background during the timed calls.
+
+    python scripts/model_benchmark.py
+    python scripts/model_benchmark.py --algorithms linear_regression random_forest --repeats 20
+    python scripts/model_benchmark.py --output /tmp/new.json --compare reports/model_benchmark.json
+
+The JSON report (``reports/model_benchmark.json`` by default) keys cases by
+``algorithm/stage``. With ``--compare`` the script exits with status 1 when a
+case's median is slower than in the given report by more than the tolerance.
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from models import ALGORITHM_MAP, ALL_ALGORITHMS, algorithm_availability  # noqa: E402
+from models.evaluator import TS_MODELS, ModelEvaluator  # noqa: E402
+from models.features import calendar_features  # noqa: E402
+from models.frames import partition_by_product  # noqa: E402
+from models.linear_regression import LinearRegressionPredictor  # noqa: E402
+from synthetic_sales import generate_sales_frame  # noqa: E402
+
+PRODUCTS = 10
+WEEKS = 52
+TRAINING_WEEKS = 8
+FORECAST_WEEKS = 4
+WARMUP = 1
+REPEATS = 7
+STAGES = ("predict", "fit", "predict_values", "evaluate", "prepare_features")
+
+RSS_SAMPLE_INTERVAL_SECONDS = 0.002
+REGRESSION_TOLERANCE = 0.25
+REGRESSION_MIN_DELTA_MS = 1.0
+
+REPORT_PATH = BACKEND_ROOT / "reports" / "model_benchmark.json"
+
+
+def _rss_bytes() -> int:
+    """Current resident set size; falls back to the peak where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm", encoding="ascii") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RSSSampler:
+    """Records the highest RSS seen by a background thread while the block runs."""
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.start = self.peak = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _rss_bytes())
+
+    def __enter__(self) -> "RSSSampler":
+        self.start = self.peak = _rss_bytes()
+        self._thread = threading.Thread(target=self._sample, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_bytes())
+
+
+def reject_outliers(samples: list[float]) -> tuple[list[float], list[float]]:
+    """Split samples into those inside the Tukey fences (1.5 x IQR) and the rest."""
+    if len(samples) < 4:
+        return list(samples), []
+    q1, q3 = np.percentile(samples, [25, 75])
+    low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    kept = [s for s in samples if low <= s <= high]
+    return kept, [s for s in samples if not low <= s <= high]
+
+
+def measure(fn, warmup: int = WARMUP, repeats: int = REPEATS) -> dict:
+    """Time ``fn`` after ``warmup`` calls and report latency, allocation peak and RSS growth."""
+    for _ in range(warmup):
+        fn()
+    gc.collect()
+    samples = []
+    with RSSSampler() as rss:
+        for _ in range(repeats):
+            started = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - started) * 1000)
+    kept, rejected = reject_outliers(samples)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, traced_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "samples": len(samples),
+        "rejected": len(rejected),
+        "median_ms": round(float(np.median(kept)), 3),
+        "mean_ms": round(float(np.mean(kept)), 3),
+        "stdev_ms": round(float(np.std(kept, ddof=1)) if len(kept) > 1 else 0.0, 3),
+        "min_ms": round(min(kept), 3),
+        "max_ms": round(max(kept), 3),
+        "tracemalloc_peak_kb": round(traced_peak / 1024, 1),
+        "rss_peak_delta_mb": round((rss.peak - rss.start) / (1024 * 1024), 2),
+    }
+
+
+def _training_slice(frame, training_weeks: int):
+    """The first product's rows in the training window, as predict() would see them."""
+    cutoff = frame["date"].max() - timedelta(weeks=training_weeks)
+    _, rows = next(iter(partition_by_product(frame[frame["date"] >= cutoff])))
+    return rows
+
+
+def build_cases(frame, algorithms: list[str], stages: list[str], training_weeks: int) -> dict:
+    """Return ``{"algorithm/stage": zero-argument callable}`` for the requested stages."""
+    cases = {}
+    if "prepare_features" in stages:
+        cases["base/prepare_features"] = lambda: LinearRegressionPredictor()._prepare_features(frame)
+
+    rows = _training_slice(frame, training_weeks)
+    X, y = calendar_features(rows["date"]), rows["unitsSold"].to_numpy()
+    values = rows["unitsSold"].to_numpy(dtype=np.float32).reshape(-1, 1)
+    for algorithm in algorithms:
+        cls = ALGORITHM_MAP[algorithm]
+        if "predict" in stages:
+            cases[f"{algorithm}/predict"] = (
+                lambda cls=cls: cls().predict(frame, training_weeks, forecast_weeks=FORECAST_WEEKS)
+            )
+        if algorithm == "lstm" and "fit" in stages:
+            cases["lstm/fit"] = lambda cls=cls: cls()._train(values)
+        elif algorithm not in TS_MODELS:
+            fitted = cls()
+            fitted.fit(X, y)
+            if "fit" in stages:
+                cases[f"{algorithm}/fit"] = lambda cls=cls: cls().fit(X, y)
+            if "predict_values" in stages:
+                cases[f"{algorithm}/predict_values"] = lambda fitted=fitted: fitted.predict_values(X)
+        if "evaluate" in stages:
+            cases[f"{algorithm}/evaluate"] = (
+                lambda algorithm=algorithm: ModelEvaluator(algorithm, cache=None).evaluate(frame, training_weeks)
+            )
+    return cases
+
+
+def compare_reports(current: dict, baseline: dict, tolerance: float = REGRESSION_TOLERANCE,
+                    min_delta_ms: float = REGRESSION_MIN_DELTA_MS) -> list[dict]:
+    """Cases whose median grew by more than ``tolerance`` (relative) and ``min_delta_ms`` (absolute)."""
+    regressions = []
+    for key, case in current["cases"].items():
+        before = baseline.get("cases", {}).get(key)
+        if before is None:
+            continue
+        delta = case["median_ms"] - before["median_ms"]
+        if delta > min_delta_ms and case["median_ms"] > before["median_ms"] * (1 + tolerance):
+            regressions.append({
+                "case": key,
+                "baseline_median_ms": before["median_ms"],
+                "median_ms": case["median_ms"],
+                "ratio": round(case["median_ms"] / before["median_ms"], 2),
+            })
+    return regressions
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "HEAD"], cwd=BACKEND_ROOT, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def _versions() -> dict:
+    import pandas
+    import sklearn
+
+    versions = {"python": platform.python_version(), "numpy": np.__version__,
+                "pandas": pandas.__version__, "sklearn": sklearn.__version__}
+    for module in ("torch", "statsmodels"):
+        if module in sys.modules:
+            versions[module] = sys.modules[module].__version__
+    return versions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--algorithms", nargs="+", choices=ALL_ALGORITHMS)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--products", type=int, default=PRODUCTS)
+    parser.add_argument("--weeks", type=int, default=WEEKS)
+    parser.add_argument("--training-weeks", type=int, default=TRAINING_WEEKS)
+    parser.add_argument("--warmup", type=int, default=WARMUP)
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--output", type=Path, default=REPORT_PATH)
+    parser.add_argument("--compare", type=Path, help="earlier report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    args = parser.parse_args(argv)
+
+    available = algorithm_availability()
+    algorithms = args.algorithms or [a for a in ALL_ALGORITHMS if available[a]["available"]]
+    frame = generate_sales_frame(args.products, args.weeks)
+
+    results = {}
+    for key, fn in build_cases(frame, algorithms, args.stages, args.training_weeks).items():
+        results[key] = measure(fn, args.warmup, args.repeats)
+        r = results[key]
+        print(f"{key:32} median={r['median_ms']:9.3f}ms  rejected={r['rejected']}  "
+              f"alloc={r['tracemalloc_peak_kb']:.0f}KB  rss+={r['rss_peak_delta_mb']}MB")
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "versions": _versions(),
+        "config": {
+            "products": args.products,
+            "weeks": args.weeks,
+            "training_weeks": args.training_weeks,
+            "forecast_weeks": FORECAST_WEEKS,
+            "warmup": args.warmup,
+            "repeats": args.repeats,
+        },
+        "cases": results,
+    }
+    regressions = []
+    if args.compare is not None:
+        regressions = compare_reports(report, json.loads(args.compare.read_text(encoding="utf-8")), args.tolerance)
+        report["compared_with"] = str(args.compare)
+        report["regressions"] = regressions
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Wrote {args.output}")
+
+    for r in regressions:
+        print(f"REGRESSION {r['case']}: {r['baseline_median_ms']}ms -> {r['median_ms']}ms (x{r['ratio']})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""Scaling benchmark: predict/evaluate latency and throughput across dataset sizes.
+
+Times every registered algorithm on deterministic synthetic datasets from 3 to
+1000 products and 8 weeks to 5 years of history. The table is written to the
+``scaling`` section of ``reports/performance_report.json``, and each cell's
+p50 is compared with ``reports/scaling_baseline.json`` when that file exists.
+
+    python scripts/scaling_benchmark.py                    # full grid
+    python scripts/scaling_benchmark.py --quick            # small grid for CI
+    python scripts/scaling_benchmark.py --update-baseline  # store this run as the baseline
+
+Exits with status 1 when a regression is detected.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+if str(BACKEND_ROOT) not in sys.path:
+    sys.path.insert(0, str(BACKEND_ROOT))
+
+from models import ALL_ALGORITHMS, algorithm_availability  # noqa: E402
+from models.evaluator import ModelEvaluator  # noqa: E402
+from models.predictor import SalesPredictor  # noqa: E402
+from synthetic_sales import generate_sales_frame  # noqa: E402
+
+PRODUCTS = [3, 30, 300, 1000]
+WEEKS = [8, 52, 260]
+QUICK_PRODUCTS = [3, 30]
+QUICK_WEEKS = [8, 52]
+OPERATIONS = ("predict", "evaluate")
+
+REPEATS = 5
+# Once a cell's median exceeds this, larger sizes of that algorithm/operation are skipped.
+CELL_BUDGET_SECONDS = 60.0
+FORECAST_WEEKS = 4
+# The API caps training windows at 8 weeks, so longer histories measure the
+# cost of carrying the extra rows (windowing, partitioning, hashing).
+TRAINING_WEEKS = 8
+
+REGRESSION_TOLERANCE = 0.25
+REGRESSION_MIN_DELTA_MS = 20.0
+
+REPORTS_DIR = BACKEND_ROOT / "reports"
+REPORT_PATH = REPORTS_DIR / "performance_report.json"
+BASELINE_PATH = REPORTS_DIR / "scaling_baseline.json"
+
+
+def _latency_summary(samples_ms: list[float]) -> dict:
+    p50, p95, p99 = np.percentile(samples_ms, [50, 95, 99])
+    return {
+        "count": len(samples_ms),
+        "p50_ms": round(float(p50), 2),
+        "p95_ms": round(float(p95), 2),
+        "p99_ms": round(float(p99), 2),
+        "min_ms": round(min(samples_ms), 2),
+        "max_ms": round(max(samples_ms), 2),
+    }
+
+
+def _run_operation(operation: str, algorithm: str, frame, training_weeks: int) -> None:
+    if operation == "predict":
+        SalesPredictor(algorithm, use_cache=False).predict(frame, training_weeks, forecast_weeks=FORECAST_WEEKS)
+    else:
+        ModelEvaluator(algorithm, cache=None).evaluate(frame, training_weeks)
+
+
+def measure_cell(operation: str, algorithm: str, products: int, weeks: int, repeats: int = REPEATS,
+                 training_weeks: int = TRAINING_WEEKS) -> dict:
+    """Time one operation/algorithm/size cell; the first run is an untimed warm-up."""
+    frame = generate_sales_frame(products, weeks)
+    training_weeks = min(training_weeks, weeks)
+    _run_operation(operation, algorithm, frame, training_weeks)
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        _run_operation(operation, algorithm, frame, training_weeks)
+        samples.append((time.perf_counter() - started) * 1000)
+    summary = _latency_summary(samples)
+    return {
+        "operation": operation,
+        "algorithm": algorithm,
+        "products": products,
+        "weeks": weeks,
+        "rows": len(frame),
+        "training_weeks": training_weeks,
+        **summary,
+        "series_per_sec": round(products / (summary["p50_ms"] / 1000), 2) if summary["p50_ms"] else None,
+    }
+
+
+def run_grid(products: list[int], weeks: list[int], algorithms: list[str], operations=OPERATIONS,
+             repeats: int = REPEATS, budget_seconds: float = CELL_BUDGET_SECONDS,
+             training_weeks: int = TRAINING_WEEKS, log=print) -> list[dict]:
+    rows = []
+    for operation in operations:
+        for algorithm in algorithms:
+            # Sizes that took longer than the budget; any cell at least as large is skipped.
+            over_budget: list[tuple[int, int]] = []
+            for n_products in sorted(products):
+                for n_weeks in sorted(weeks):
+                    cell = {"operation": operation, "algorithm": algorithm, "products": n_products, "weeks": n_weeks}
+                    if any(n_products >= p and n_weeks >= w for p, w in over_budget):
+                        rows.append({**cell, "skipped": "over budget"})
+                        continue
+                    row = measure_cell(operation, algorithm, n_products, n_weeks, repeats, training_weeks)
+                    rows.append(row)
+                    log(f"{operation:8} {algorithm:18} {n_products:5}p {n_weeks:4}w "
+                        f"p50={row['p50_ms']:.1f}ms {row['series_per_sec']} series/s")
+                    if row["p50_ms"] / 1000 > budget_seconds:
+                        over_budget.append((n_products, n_weeks))
+    return rows
+
+
+def _cell_key(row: dict) -> tuple:
+    return row["operation"], row["algorithm"], row["products"], row["weeks"]
+
+
+def find_regressions(rows: list[dict], baseline: list[dict], tolerance: float = REGRESSION_TOLERANCE,
+                     min_delta_ms: float = REGRESSION_MIN_DELTA_MS) -> list[dict]:
+    """Cells whose p50 grew by more than ``tolerance`` (relative) and ``min_delta_ms`` (absolute)."""
+    previous = {_cell_key(r): r for r in baseline if "p50_ms" in r}
+    regressions = []
+    for row in rows:
+        before = previous.get(_cell_key(row))
+        if before is None or "p50_ms" not in row:
+            continue
+        delta = row["p50_ms"] - before["p50_ms"]
+        if delta > min_delta_ms and row["p50_ms"] > before["p50_ms"] * (1 + tolerance):
+            regressions.append({
+                "operation": row["operation"],
+                "algorithm": row["algorithm"],
+                "products": row["products"],
+                "weeks": row["weeks"],
+                "baseline_p50_ms": before["p50_ms"],
+                "p50_ms": row["p50_ms"],
+                "ratio": round(row["p50_ms"] / before["p50_ms"], 2),
+            })
+    return regressions
+
+
+def _write_report(section: dict) -> None:
+    report = json.loads(REPORT_PATH.read_text(encoding="utf-8")) if REPORT_PATH.exists() else {}
+    report["scaling"] = section
+    REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+    REPORT_PATH.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="small grid (3-30 products, 8-52 weeks)")
+    parser.add_argument("--products", type=int, nargs="+")
+    parser.add_argument("--weeks", type=int, nargs="+")
+    parser.add_argument("--algorithms", nargs="+", choices=ALL_ALGORITHMS)
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS, default=list(OPERATIONS))
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--training-weeks", type=int, default=TRAINING_WEEKS)
+    parser.add_argument("--budget-seconds", type=float, default=CELL_BUDGET_SECONDS)
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    available = algorithm_availability()
+    algorithms = args.algorithms or [a for a in ALL_ALGORITHMS if available[a]["available"]]
+    products = args.products or (QUICK_PRODUCTS if args.quick else PRODUCTS)
+    weeks = args.weeks or (QUICK_WEEKS if args.quick else WEEKS)
+
+    rows = run_grid(products, weeks, algorithms, args.operations, args.repeats, args.budget_seconds,
+                    args.training_weeks)
+
+    baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8")) if BASELINE_PATH.exists() else None
+    regressions = find_regressions(rows, baseline["cells"], args.tolerance) if baseline else []
+    section = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "repeats": args.repeats,
+        "training_weeks": args.training_weeks,
+        "forecast_weeks": FORECAST_WEEKS,
+        "table": rows,
+        "baseline": str(BASELINE_PATH.relative_to(BACKEND_ROOT)) if baseline else None,
+        "regressions": regressions,
+    }
+    _write_report(section)
+    print(f"Wrote scaling table to {REPORT_PATH}")
+
+    if args.update_baseline:
+        BASELINE_PATH.write_text(
+            json.dumps({"generated_at": section["generated_at"], "cells": rows}, indent=2), encoding="utf-8"
+        )
+        print(f"Wrote {BASELINE_PATH}")
+
+    for r in regressions:
+        print(f"REGRESSION {r['operation']} {r['algorithm']} {r['products']}p {r['weeks']}w: "
+              f"{r['baseline_p50_ms']}ms -> {r['p50_ms']}ms (x{r['ratio']})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Measure API cold start: import time, time-to-first-request and resident memory.
+
+Each run starts a fresh interpreter so module imports are not shared between
+samples.
+"""
+from __future__ import annotations
+
+import json
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+
+RUNS = 5
+
+# Executed in a child interpreter; prints one JSON object.
+_CHILD = r"""
+import json, resource, sys, time
+started = time.perf_counter()
+from app import app
+imported = time.perf_counter()
+with app.test_client() as client:
+    health = client.get('/api/health')
+    first_request = time.perf_counter()
+    token = client.post('/api/auth/login', json={'username': 'manager', 'password': 'manager123'}).get_json()['token']
+    rows = [{'date': f'2025-01-{d:02d}', 'product': 'Cappuccino', 'unitsSold': 80 + d % 7} for d in range(1, 29)]
+    predict = client.post('/api/predict', headers={'Authorization': f'Bearer {token}'},
+                          json={'sales_data': rows, 'training_weeks': 4, 'algorithm': 'linear_regression'})
+    first_forecast = time.perf_counter()
+assert health.status_code == 200 and predict.status_code == 200
+print(json.dumps({
+    'import_ms': (imported - started) * 1000,
+    'first_request_ms': (first_request - started) * 1000,
+    'first_forecast_ms': (first_forecast - started) * 1000,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'torch_loaded': 'torch' in sys.modules,
+    'statsmodels_loaded': 'statsmodels' in sys.modules,
+}))
+"""
+
+
+def _run_once() -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD],
+        cwd=BACKEND_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _summary(samples: list[float]) -> dict:
+    return {
+        "median": round(statistics.median(samples), 2),
+        "min": round(min(samples), 2),
+        "max": round(max(samples), 2),
+    }
+
+
+def main() -> None:
+    runs = [_run_once() for _ in range(RUNS)]
+
+    report = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "runs": RUNS,
+        "import_ms": _summary([r["import_ms"] for r in runs]),
+        "time_to_first_request_ms": _summary([r["first_request_ms"] for r in runs]),
+        "time_to_first_forecast_ms": _summary([r["first_forecast_ms"] for r in runs]),
+        "max_rss_mb": _summary([r["max_rss_mb"] for r in runs]),
+        "torch_loaded": any(r["torch_loaded"] for r in runs),
+        "statsmodels_loaded": any(r["statsmodels_loaded"] for r in runs),
+    }
+
+    reports_dir = BACKEND_ROOT / "reports"
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    json_path = reports_dir / "startup_report.json"
+    json_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report, indent=2))
+    print(f"Wrote {json_path}")
+
+
+if __name__ == "__main__":
+    main()
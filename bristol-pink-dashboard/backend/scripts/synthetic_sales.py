@@ -0,0 +1,40 @@
+"""Deterministic synthetic sales data for benchmarks.
+
+Each product gets its own base level, linear trend, weekly pattern and
+noise. The same arguments always produce the same frame.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+END_DATE = "2025-12-31"
+
+
+def generate_sales_frame(products: int, weeks: int, seed: int = 0, end_date: str = END_DATE) -> pd.DataFrame:
+    """Return a typed ``date``/``product``/``unitsSold`` frame with ``products`` x ``weeks * 7`` rows."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(end=end_date, periods=weeks * 7, freq="D")
+    days = np.arange(len(dates))
+
+    base = rng.uniform(20, 150, size=(products, 1))
+    trend = rng.normal(0, 0.02, size=(products, 1)) * base / 7
+    weekly = rng.uniform(0.7, 1.3, size=(products, 7))[:, dates.dayofweek]
+    noise = rng.normal(0, 0.08, size=(products, len(dates)))
+    units = np.maximum(0, np.round((base + trend * days / 7) * weekly * (1 + noise)))
+
+    names = np.array([f"Product {i:04d}" for i in range(products)], dtype=object)
+    return pd.DataFrame({
+        "date": np.tile(dates.to_numpy(), products),
+        "product": pd.Series(np.repeat(names, len(dates))),
+        "unitsSold": units.ravel().astype(np.float64),
+    })
+
+
+def generate_sales_rows(products: int, weeks: int, seed: int = 0) -> list[dict]:
+    """The same data as ``generate_sales_frame`` in the JSON row format."""
+    frame = generate_sales_frame(products, weeks, seed)
+    return [
+        {"date": d, "product": p, "unitsSold": u}
+        for d, p, u in zip(frame["date"].dt.strftime("%Y-%m-%d"), frame["product"], frame["unitsSold"])
+    ]
@@ -2,15 +2,20 @@
 from __future__ import annotations
 
 import json
-import os
 import secrets
-from dataclasses import dataclass
+import warnings
 from datetime import datetime, timedelta, timezone
 from functools import wraps
 from typing import Callable
 
+import numpy as np
 import pandas as pd
-from flask import jsonify, request
+from flask import jsonify, make_response, request
+
+from audit import AUDIT_LOG
+from models.instrumentation import span
+from profiling import PROFILE_HEADER, PROFILER
+from sessions import SESSIONS, Session
 
 
 TOKEN_TTL_HOURS = 8
@@ -23,27 +28,10 @@ USERS = {
 }
 
 
-@dataclass
-class Session:
-    username: str
-    role: str
-    expires_at: datetime
-
-
-SESSIONS: dict[str, Session] = {}
-
-
 def _utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
-def _audit_log_path() -> str:
-    base_dir = os.path.dirname(__file__)
-    logs_dir = os.path.join(base_dir, "logs")
-    os.makedirs(logs_dir, exist_ok=True)
-    return os.path.join(logs_dir, "audit.log")
-
-
 def write_audit_event(event_type: str, status: str, detail: dict | None = None) -> None:
     payload = {
         "ts": _utcnow().isoformat(),
@@ -54,15 +42,14 @@ def write_audit_event(event_type: str, status: str, detail: dict | None = None)
         "ip": request.remote_addr if request else None,
         "detail": detail or {},
     }
-    with open(_audit_log_path(), "a", encoding="utf-8") as f:
-        f.write(json.dumps(payload) + "\n")
+    AUDIT_LOG.write(json.dumps(payload))
 
 
 def create_session(username: str) -> tuple[str, dict]:
     user = USERS[username]
     token = secrets.token_urlsafe(32)
     expires_at = _utcnow() + timedelta(hours=TOKEN_TTL_HOURS)
-    SESSIONS[token] = Session(username=username, role=user["role"], expires_at=expires_at)
+    SESSIONS.save(token, Session(username=username, role=user["role"], expires_at=expires_at))
     return token, {
         "username": username,
         "role": user["role"],
@@ -71,7 +58,7 @@ def create_session(username: str) -> tuple[str, dict]:
 
 
 def delete_session(token: str) -> None:
-    SESSIONS.pop(token, None)
+    SESSIONS.delete(token)
 
 
 def get_session_from_request() -> Session | None:
@@ -79,20 +66,35 @@ def get_session_from_request() -> Session | None:
     if not auth_header.startswith("Bearer "):
         return None
     token = auth_header.replace("Bearer ", "", 1).strip()
-    session = SESSIONS.get(token)
-    if session is None:
-        return None
-    if session.expires_at < _utcnow():
-        delete_session(token)
-        return None
-    return session
+    return SESSIONS.get(token)
+
+
+def _run_profiled(func: Callable, args, kwargs, trigger: str, mode: str):
+    meta = {
+        "endpoint": request.url_rule.rule if request.url_rule is not None else request.path,
+        "method": request.method,
+        "path": request.full_path.rstrip("?"),
+        "user": request.user["username"],
+        "trigger": trigger,
+    }
+    response, profile_id = PROFILER.run(lambda: make_response(func(*args, **kwargs)), meta, mode)
+    if profile_id is not None:
+        response.headers["X-Profile-Id"] = profile_id
+    return response
+
 
+def require_auth(roles: list[str] | None = None, profile: bool = True) -> Callable:
+    """Reject requests without a live session (401) or with a role outside ``roles`` (403).
+
+    With ``profile``, the request may be profiled when ``PROFILER`` is armed
+    or a manager sends ``X-Profile: 1``.
+    """
 
-def require_auth(roles: list[str] | None = None) -> Callable:
     def decorator(func: Callable):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            session = get_session_from_request()
+            with span("auth"):
+                session = get_session_from_request()
             if session is None:
                 write_audit_event("auth_required", "denied", {"reason": "missing_or_invalid_token"})
                 return jsonify({"error": "Authentication required"}), 401
@@ -104,6 +106,11 @@ def require_auth(roles: list[str] | None = None) -> Callable:
                 )
                 return jsonify({"error": "Insufficient permissions"}), 403
             request.user = {"username": session.username, "role": session.role}
+            if profile:
+                rule = request.url_rule.rule if request.url_rule is not None else None
+                claim = PROFILER.claim(session.role, request.headers.get(PROFILE_HEADER), rule)
+                if claim is not None:
+                    return _run_profiled(func, args, kwargs, *claim)
             return func(*args, **kwargs)
 
         return wrapper
@@ -111,34 +118,190 @@ def require_auth(roles: list[str] | None = None) -> Callable:
     return decorator
 
 
-def validate_sales_data(sales_data: list[dict]) -> tuple[bool, str]:
-    if not isinstance(sales_data, list) or len(sales_data) == 0:
-        return False, "sales_data must be a non-empty list"
+REQUIRED_SALES_FIELDS = ("date", "product", "unitsSold")
+
+
+def _first_index(mask) -> int | None:
+    positions = np.flatnonzero(np.asarray(mask, dtype=bool))
+    return int(positions[0]) if positions.size else None
 
-    required_fields = {"date", "product", "unitsSold"}
-    for i, row in enumerate(sales_data):
-        if not isinstance(row, dict):
-            return False, f"Row {i} must be an object"
-        missing = required_fields - set(row.keys())
-        if missing:
-            return False, f"Row {i} missing required fields: {', '.join(sorted(missing))}"
 
-        product = str(row.get("product", "")).strip()
-        if not product:
-            return False, f"Row {i} has an empty product"
- 
+def _parse_dates(values: pd.Series) -> tuple[pd.Series, int | None, int | None]:
+    """Parse a date column in one vectorized call.
+
+    Values the fast path cannot parse are re-checked one by one with the
+    original ``pd.to_datetime`` semantics so mixed formats still parse and
+    error messages stay identical. Returns ``(dates, first_nat, first_error)``.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        dates = pd.to_datetime(values, errors="coerce")
+    first_nat = first_error = None
+    recovered: dict[int, pd.Timestamp] = {}
+    for i in np.flatnonzero(dates.isna().to_numpy()):
         try:
-            parsed_date = pd.to_datetime(row["date"])
-            if pd.isna(parsed_date):
-                return False, f"Row {i} has invalid date"
+            parsed = pd.to_datetime(values.iat[i])
         except Exception:
-            return False, f"Row {i} has invalid date format"
+            first_error = i if first_error is None else first_error
+            continue
+        if pd.isna(parsed):
+            first_nat = i if first_nat is None else first_nat
+        else:
+            recovered[i] = parsed
+    if recovered and first_nat is None and first_error is None:
+        merged = dates.astype(object)
+        for i, parsed in recovered.items():
+            merged.iat[i] = parsed
+        dates = pd.to_datetime(merged)
+    return dates, first_nat, first_error
+
+
+def _parse_units(values: pd.Series, original: Callable[[int], object]) -> tuple[pd.Series, int | None]:
+    """Coerce unitsSold to float64, matching ``float(value)`` acceptance.
 
+    Null cells are re-checked against ``original(i)``, the value as sent,
+    because the frame stores an explicit ``None`` (which ``float`` rejects) as NaN.
+    """
+    try:
+        units = pd.to_numeric(values, errors="coerce").astype("float64")
+    except (TypeError, ValueError):
+        units = pd.Series(np.nan, index=values.index, dtype="float64")
+    first_error = None
+    for i in np.flatnonzero(units.isna().to_numpy()):
         try:
-            units = float(row["unitsSold"])
+            units.iat[i] = float(original(i))
         except Exception:
-            return False, f"Row {i} has non-numeric unitsSold"
-        if units < 0:
-            return False, f"Row {i} has negative unitsSold"
+            first_error = i if first_error is None else first_error
+    return units, first_error
+
+
+def _check_sales_columns(product: pd.Series, date_values: pd.Series, unit_values: pd.Series,
+                         original_unit: Callable[[int], object], errors: list) -> tuple[pd.Series, pd.Series]:
+    """Run the product, date and unitsSold checks, appending ``(row, order, message)`` to ``errors``."""
+    i = _first_index(product.map(str).str.strip() == "")
+    if i is not None:
+        errors.append((i, 1, f"Row {i} has an empty product"))
+
+    dates, first_nat, first_bad_date = _parse_dates(date_values)
+    if first_nat is not None:
+        errors.append((first_nat, 2, f"Row {first_nat} has invalid date"))
+    if first_bad_date is not None:
+        errors.append((first_bad_date, 2, f"Row {first_bad_date} has invalid date format"))
 
-    return True, "ok"
\ No newline at end of file
+    units, first_bad_units = _parse_units(unit_values, original_unit)
+    if first_bad_units is not None:
+        errors.append((first_bad_units, 3, f"Row {first_bad_units} has non-numeric unitsSold"))
+    i = _first_index(units.to_numpy() < 0)
+    if i is not None:
+        errors.append((i, 4, f"Row {i} has negative unitsSold"))
+    return dates, units
+
+
+SALES_COLUMN_FIELDS = ("dates", "products", "units")
+
+
+def _validate_sales_columns(columns: dict) -> tuple[bool, str, pd.DataFrame | None]:
+    """Validate the columnar form of ``sales_data``.
+
+    ``{"dates": [...], "products": [...], "units": [...]}`` holds one entry
+    per row in each array; ``products`` may instead be dictionary-encoded as
+    ``{"categories": [...], "codes": [...]}``. Row-level errors use the same
+    messages as the row format.
+    """
+    absent = [field for field in SALES_COLUMN_FIELDS if field not in columns]
+    if absent:
+        return False, f"sales_data columns missing: {', '.join(absent)}", None
+
+    products = columns["products"]
+    if isinstance(products, dict):
+        categories, codes = products.get("categories"), products.get("codes")
+        if not isinstance(categories, list) or not isinstance(codes, (list, np.ndarray)):
+            return False, "sales_data products must have categories and codes lists", None
+        try:
+            codes = np.asarray(codes, dtype=np.int64)
+        except (TypeError, ValueError, OverflowError):
+            return False, "sales_data product codes must be integers", None
+        if codes.ndim != 1 or (codes.size and (codes.min() < 0 or codes.max() >= len(categories))):
+            return False, "sales_data product codes must index into categories", None
+        products = np.asarray(categories, dtype=object)[codes]
+
+    raw_dates, raw_units = columns["dates"], columns["units"]
+    if not all(isinstance(values, (list, np.ndarray)) for values in (raw_dates, products, raw_units)):
+        return False, "sales_data columns must be lists", None
+    n_rows = len(raw_dates)
+    if n_rows == 0:
+        return False, "sales_data must be a non-empty list", None
+    if len(products) != n_rows or len(raw_units) != n_rows:
+        return False, "sales_data columns must have the same length", None
+
+    product = pd.Series(products)
+    errors: list[tuple[int, int, str]] = []
+    dates, units = _check_sales_columns(
+        product, pd.Series(raw_dates), pd.Series(raw_units), raw_units.__getitem__, errors
+    )
+    if errors:
+        _, _, message = min(errors)
+        return False, message, None
+    return True, "ok", pd.DataFrame({"date": dates, "product": product, "unitsSold": units})
+
+
+def validate_sales_frame(sales_data: list[dict] | dict) -> tuple[bool, str, pd.DataFrame | None]:
+    """Validate sales rows column-wise and return the typed frame on success.
+
+    ``sales_data`` is a list of ``{date, product, unitsSold}`` rows or the
+    columnar dict accepted by ``_validate_sales_columns``. The frame has a
+    datetime ``date`` column, the original ``product`` values and float
+    ``unitsSold``, and can be passed straight to the predictors.
+    Error messages match the row-by-row checks: the lowest failing row wins,
+    and within a row the checks apply in the order object, missing fields,
+    empty product, date, numeric, negative.
+    """
+    with span("validate"):
+        if isinstance(sales_data, dict):
+            return _validate_sales_columns(sales_data)
+        return _validate_sales_rows(sales_data)
+
+
+def _validate_sales_rows(sales_data: list[dict]) -> tuple[bool, str, pd.DataFrame | None]:
+    if not isinstance(sales_data, list) or len(sales_data) == 0:
+        return False, "sales_data must be a non-empty list", None
+
+    n_objects = next((i for i, row in enumerate(sales_data) if not isinstance(row, dict)), len(sales_data))
+    if n_objects == 0:
+        return False, "Row 0 must be an object", None
+
+    with span("frame"):
+        df = pd.DataFrame(sales_data[:n_objects])
+    errors: list[tuple[int, int, str]] = []
+
+    absent = [field for field in REQUIRED_SALES_FIELDS if field not in df.columns]
+    nulls = np.zeros(n_objects, dtype=bool)
+    for field in REQUIRED_SALES_FIELDS:
+        if field in df.columns:
+            nulls |= df[field].isna().to_numpy()
+    # A null cell is either an explicit None or a missing key; only the latter fails.
+    for i in np.flatnonzero(nulls) if not absent else [0]:
+        missing = set(REQUIRED_SALES_FIELDS) - set(sales_data[i].keys())
+        if missing:
+            errors.append((int(i), 0, f"Row {i} missing required fields: {', '.join(sorted(missing))}"))
+            break
+
+    if not absent:
+        product = df["product"]
+        dates, units = _check_sales_columns(
+            product, df["date"], df["unitsSold"], lambda i: sales_data[i].get("unitsSold"), errors
+        )
+
+    if errors:
+        _, _, message = min(errors)
+        return False, message, None
+    if n_objects < len(sales_data):
+        return False, f"Row {n_objects} must be an object", None
+
+    frame = pd.DataFrame({"date": dates, "product": product, "unitsSold": units})
+    return True, "ok", frame
+
+
+def validate_sales_data(sales_data: list[dict]) -> tuple[bool, str]:
+    ok, msg, _ = validate_sales_frame(sales_data)
+    return ok, msg
@@ -0,0 +1,243 @@
+"""Login session storage.
+
+Sessions live in a ``SessionStore``. The in-memory store is the default and
+is private to one process; the SQLite store keeps sessions in a WAL-mode file
+so a token issued by one worker process is accepted by the others.
+``SessionRegistry`` fronts the store with a small per-process read-through
+cache and a background sweeper that deletes expired sessions in bulk.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from models.cache import LRUCache
+
+
+SESSION_STORE = os.environ.get("SESSION_STORE", "memory")
+SESSION_DB_PATH = os.environ.get("SESSION_DB_PATH", os.path.join(os.path.dirname(__file__), "data", "sessions.db"))
+SESSION_CACHE_MAX_ENTRIES = int(os.environ.get("SESSION_CACHE_MAX_ENTRIES", "1024"))
+SESSION_CACHE_TTL_SECONDS = float(os.environ.get("SESSION_CACHE_TTL_SECONDS", "5"))
+SESSION_SWEEP_INTERVAL_SECONDS = float(os.environ.get("SESSION_SWEEP_INTERVAL_SECONDS", "300"))
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+@dataclass
+class Session:
+    username: str
+    role: str
+    expires_at: datetime
+
+
+class SessionStore(ABC):
+    """Persistence interface for sessions keyed by bearer token."""
+
+    @abstractmethod
+    def save(self, token: str, session: Session) -> None:
+        ...
+
+    @abstractmethod
+    def get(self, token: str) -> Session | None:
+        ...
+
+    @abstractmethod
+    def delete(self, token: str) -> None:
+        ...
+
+    @abstractmethod
+    def purge_expired(self, now: datetime) -> int:
+        """Delete sessions that expired before ``now``; returns the number removed."""
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+
+class InMemorySessionStore(SessionStore):
+    def __init__(self):
+        self._sessions: dict[str, Session] = {}
+        self._lock = threading.Lock()
+
+    def save(self, token: str, session: Session) -> None:
+        with self._lock:
+            self._sessions[token] = session
+
+    def get(self, token: str) -> Session | None:
+        with self._lock:
+            return self._sessions.get(token)
+
+    def delete(self, token: str) -> None:
+        with self._lock:
+            self._sessions.pop(token, None)
+
+    def purge_expired(self, now: datetime) -> int:
+        with self._lock:
+            expired = [token for token, s in self._sessions.items() if s.expires_at < now]
+            for token in expired:
+                del self._sessions[token]
+            return len(expired)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+
+class SQLiteSessionStore(SessionStore):
+    """Session store backed by a SQLite file in WAL mode, shared by worker processes."""
+
+    def __init__(self, path: str = SESSION_DB_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS sessions (
+                token TEXT PRIMARY KEY,
+                username TEXT NOT NULL,
+                role TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_expires_at ON sessions (expires_at)")
+
+    def save(self, token: str, session: Session) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (token, username, role, expires_at) VALUES (?, ?, ?, ?)",
+                (token, session.username, session.role, session.expires_at.timestamp()),
+            )
+
+    def get(self, token: str) -> Session | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT username, role, expires_at FROM sessions WHERE token = ?", (token,)
+            ).fetchone()
+        if row is None:
+            return None
+        username, role, expires_at = row
+        return Session(username=username, role=role, expires_at=datetime.fromtimestamp(expires_at, timezone.utc))
+
+    def delete(self, token: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE token = ?", (token,))
+
+    def purge_expired(self, now: datetime) -> int:
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM sessions WHERE expires_at < ?", (now.timestamp(),))
+        return cur.rowcount
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()
+        return int(count)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class SessionRegistry:
+    """Session lookups through a per-process cache, with periodic expiry sweeps.
+
+    Cached entries are trusted for ``cache_ttl_seconds``, so a logout in one
+    worker can take that long to reach the caches of the others. Expiry is
+    always checked against the session itself. The sweeper thread starts with
+    the first saved session and runs every ``sweep_interval_seconds``.
+    """
+
+    def __init__(
+        self,
+        store: SessionStore,
+        cache_max_entries: int = SESSION_CACHE_MAX_ENTRIES,
+        cache_ttl_seconds: float = SESSION_CACHE_TTL_SECONDS,
+        sweep_interval_seconds: float = SESSION_SWEEP_INTERVAL_SECONDS,
+    ):
+        self.store = store
+        self.cache = None
+        if cache_ttl_seconds > 0:
+            self.cache = LRUCache(max_entries=cache_max_entries, ttl_seconds=cache_ttl_seconds)
+        self.sweep_interval = sweep_interval_seconds
+        self._sweeper: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def save(self, token: str, session: Session) -> None:
+        self.store.save(token, session)
+        if self.cache is not None:
+            self.cache.put(token, session, size=0)
+        self._ensure_sweeper()
+
+    def get(self, token: str) -> Session | None:
+        """Return the live session for ``token``; expired sessions are deleted and yield None."""
+        session = self.cache.get(token) if self.cache is not None else None
+        if session is None:
+            session = self.store.get(token)
+            if session is None:
+                return None
+            if self.cache is not None:
+                self.cache.put(token, session, size=0)
+        if session.expires_at < _utcnow():
+            self.delete(token)
+            return None
+        return session
+
+    def delete(self, token: str) -> None:
+        self.store.delete(token)
+        if self.cache is not None:
+            self.cache.discard(token)
+
+    def sweep(self) -> int:
+        """Delete every expired session; returns the number removed from the store."""
+        removed = self.store.purge_expired(_utcnow())
+        if removed and self.cache is not None:
+            self.cache.clear()
+        return removed
+
+    def clear(self) -> None:
+        """Forget this process's cached sessions (the store is untouched)."""
+        if self.cache is not None:
+            self.cache.clear()
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def _ensure_sweeper(self) -> None:
+        if self.sweep_interval <= 0 or self._sweeper is not None:
+            return
+        with self._lock:
+            if self._sweeper is None:
+                self._sweeper = threading.Thread(target=self._sweep_loop, name="session-sweeper", daemon=True)
+                self._sweeper.start()
+
+    def _sweep_loop(self) -> None:
+        while not self._stop.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except sqlite3.Error:
+                pass  # retried on the next interval
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        if self._sweeper is not None:
+            self._sweeper.join()
+            self._sweeper = None
+
+
+def create_session_store(kind: str = SESSION_STORE) -> SessionStore:
+    if kind == "sqlite":
+        return SQLiteSessionStore(SESSION_DB_PATH)
+    return InMemorySessionStore()
+
+
+SESSIONS = SessionRegistry(create_session_store())
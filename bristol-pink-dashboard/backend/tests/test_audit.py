@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import gzip
+import json
+import threading
+import time
+
+import pytest
+
+import audit
+import security
+from app import app
+from audit import AuditLogWriter
+
+
+@pytest.fixture
+def client():
+    app.config["TESTING"] = True
+    with app.test_client() as c:
+        yield c
+
+
+def _read_lines(path) -> list[str]:
+    return path.read_text(encoding="utf-8").splitlines()
+
+
+def _stall(writer: AuditLogWriter) -> threading.Event:
+    """Hold the writer thread inside its first batch until the returned event is set."""
+    release = threading.Event()
+    real = writer._write_batch
+
+    def slow(batch):
+        release.wait(5)
+        real(batch)
+
+    writer._write_batch = slow
+    return release
+
+
+def test_writer_batches_lines_and_flush_waits_for_disk(tmp_path):
+    path = tmp_path / "logs" / "audit.log"
+    writer = AuditLogWriter(str(path), batch_size=4)
+    for i in range(10):
+        writer.write(json.dumps({"n": i}))
+
+    assert writer.flush()
+    assert [json.loads(line)["n"] for line in _read_lines(path)] == list(range(10))
+    assert writer.stats()["written"] == 10
+    writer.close()
+
+
+def test_close_drains_queue_and_later_writes_append_directly(tmp_path):
+    path = tmp_path / "audit.log"
+    writer = AuditLogWriter(str(path))
+    release = _stall(writer)
+    for i in range(5):
+        writer.write(str(i))
+    release.set()
+    writer.close()
+
+    assert _read_lines(path) == ["0", "1", "2", "3", "4"]
+    writer.write("late")
+    assert _read_lines(path)[-1] == "late"
+
+
+def test_rotation_compresses_segments_and_keeps_backup_count(tmp_path):
+    path = tmp_path / "audit.log"
+    writer = AuditLogWriter(str(path), batch_size=1, max_bytes=20, backup_count=2)
+    for i in range(6):
+        writer.write(f"event-{i:02d}-" + "x" * 10)
+        assert writer.flush()
+    writer.close()
+
+    segments = writer.segments()
+    assert len(segments) == 2 and writer.rotations == 5
+    rotated = [gzip.open(s, "rt", encoding="utf-8").read().strip() for s in segments]
+    assert [line[:8] for line in rotated + _read_lines(path)] == ["event-03", "event-04", "event-05"]
+
+
+def test_time_based_rotation(tmp_path):
+    path = tmp_path / "audit.log"
+    writer = AuditLogWriter(str(path), batch_size=1, max_bytes=0, rotate_seconds=60)
+    writer.write("first")
+    assert writer.flush()
+    writer._opened_at -= 61
+    writer.write("second")
+    assert writer.flush()
+    writer.close()
+
+    assert len(writer.segments()) == 1
+    assert _read_lines(path) == ["second"]
+
+
+@pytest.mark.parametrize("policy, expected", [("drop_new", ["0", "1", "2"]), ("drop_oldest", ["0", "2", "3"])])
+def test_overflow_policy_when_queue_is_full(tmp_path, policy, expected):
+    path = tmp_path / "audit.log"
+    writer = AuditLogWriter(str(path), queue_size=2, overflow=policy)
+    release = _stall(writer)
+    writer.write("0")
+    deadline = time.monotonic() + 5
+    while writer.stats()["queued"] and time.monotonic() < deadline:
+        time.sleep(0.01)  # writer thread has taken "0" and is stalled
+    for line in ("1", "2", "3"):
+        writer.write(line)
+    release.set()
+    writer.close()
+
+    assert writer.dropped == 1
+    assert _read_lines(path) == expected
+
+
+def test_invalid_overflow_policy_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        AuditLogWriter(str(tmp_path / "audit.log"), overflow="spill")
+
+
+def test_request_latency_does_not_wait_for_disk(client, tmp_path, monkeypatch):
+    disk_delay = 0.5
+    writer = AuditLogWriter(str(tmp_path / "audit.log"), fsync_interval=0)
+    real_sync = writer._sync
+
+    def slow_sync():
+        time.sleep(disk_delay)
+        real_sync()
+
+    writer._sync = slow_sync
+    monkeypatch.setattr(security, "AUDIT_LOG", writer)
+
+    started = time.perf_counter()
+    res = client.post("/api/auth/login", json={"username": "manager", "password": "manager123"})
+    elapsed = time.perf_counter() - started
+
+    assert res.status_code == 200
+    assert elapsed < disk_delay
+    assert writer.flush(timeout=10)
+    assert json.loads(_read_lines(tmp_path / "audit.log")[0])["event"] == "login"
+    writer.close()
+
+
+def test_drop_oldest_keeps_flush_and_stop_items(tmp_path):
+    path = tmp_path / "audit.log"
+    writer = AuditLogWriter(str(path), queue_size=2, overflow="drop_oldest")
+    release = _stall(writer)
+    writer.write("0")
+    deadline = time.monotonic() + 5
+    while writer.stats()["queued"] and time.monotonic() < deadline:
+        time.sleep(0.01)  # writer thread has taken "0" and is stalled
+    flushed = []
+    flusher = threading.Thread(target=lambda: flushed.append(writer.flush(timeout=5)))
+    flusher.start()
+    while writer.stats()["queued"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)  # the flush event is queued first
+    for line in ("1", "2", "3"):
+        writer.write(line)
+    release.set()
+    flusher.join(5)
+    assert flushed == [True]
+
+    release = _stall(writer)
+    writer.write("4")
+    while writer.stats()["queued"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # The stop sentinel close() queues, with lines from writers racing it behind.
+    writer._queue.put(audit._STOP)
+    writer.write("5")
+    writer.write("6")
+    release.set()
+    writer._thread.join(5)
+    assert not writer._thread.is_alive()
+    # Each overflow evicted the one queued line, never the control item ahead of it.
+    assert writer.dropped == 3
+    assert _read_lines(path) == ["0", "3", "4", "6"]
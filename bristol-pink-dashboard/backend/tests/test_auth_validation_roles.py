@@ -3,6 +3,7 @@ from __future__ import annotations
 import pytest
 
 from app import app
+from security import validate_sales_data, validate_sales_frame
 
 
 @pytest.fixture
@@ -107,6 +108,97 @@ def test_validation_rejects_missing_fields(client):
     assert "missing required fields" in res.get_json()["error"].lower()
 
 
+def test_validation_reports_first_failing_row():
+    data = _sample_sales_data()
+    data[3]["unitsSold"] = None
+    data[6]["product"] = "  "
+    data[1]["date"] = "not-a-date"
+
+    ok, msg = validate_sales_data(data)
+    assert ok is False
+    assert msg == "Row 1 has invalid date format"
+
+    data[1]["date"] = ""
+    assert validate_sales_data(data) == (False, "Row 1 has invalid date")
+
+    data[1]["date"] = "2025-03-02"
+    assert validate_sales_data(data) == (False, "Row 3 has non-numeric unitsSold")
+
+    data[3]["unitsSold"] = 10
+    assert validate_sales_data(data) == (False, "Row 6 has an empty product")
+
+    data[6] = "oops"
+    assert validate_sales_data(data) == (False, "Row 6 must be an object")
+
+
+def test_validate_sales_frame_returns_typed_frame():
+    data = _sample_sales_data()
+    data[0]["unitsSold"] = "80"
+    data[1]["date"] = "03/02/2025"
+
+    ok, msg, frame = validate_sales_frame(data)
+    assert ok is True and msg == "ok"
+    assert list(frame.columns) == ["date", "product", "unitsSold"]
+    assert str(frame["date"].dtype).startswith("datetime64")
+    assert frame["unitsSold"].dtype == float
+    assert frame["unitsSold"].iloc[0] == 80.0
+    assert frame["date"].iloc[1].strftime("%Y-%m-%d") == "2025-03-02"
+
+
+def _columns(rows: list[dict]) -> dict:
+    categories = list(dict.fromkeys(r["product"] for r in rows))
+    return {
+        "dates": [r["date"] for r in rows],
+        "products": {"categories": categories, "codes": [categories.index(r["product"]) for r in rows]},
+        "units": [r["unitsSold"] for r in rows],
+    }
+
+
+def test_columnar_sales_data_matches_row_format():
+    rows = _sample_sales_data()
+    _, _, expected = validate_sales_frame(rows)
+
+    parallel = {
+        "dates": [r["date"] for r in rows],
+        "products": [r["product"] for r in rows],
+        "units": [r["unitsSold"] for r in rows],
+    }
+    for columns in (parallel, _columns(rows)):
+        ok, msg, frame = validate_sales_frame(columns)
+        assert ok is True and msg == "ok"
+        assert frame.equals(expected)
+
+
+def test_columnar_sales_data_errors():
+    rows = _sample_sales_data()
+    columns = _columns(rows)
+    columns["units"][3] = -1
+    assert validate_sales_frame(columns)[:2] == (False, "Row 3 has negative unitsSold")
+
+    columns = _columns(rows)
+    del columns["dates"]
+    assert validate_sales_frame(columns)[:2] == (False, "sales_data columns missing: dates")
+
+    columns = _columns(rows)
+    columns["units"].pop()
+    assert validate_sales_frame(columns)[:2] == (False, "sales_data columns must have the same length")
+
+    columns = _columns(rows)
+    columns["products"]["codes"][0] = 7
+    assert validate_sales_frame(columns)[:2] == (False, "sales_data product codes must index into categories")
+
+
+def test_predict_accepts_columnar_sales_data(client):
+    token = _login(client, "analyst", "analyst123")
+    headers = {"Authorization": f"Bearer {token}"}
+    body = {"training_weeks": 4, "algorithm": "linear_regression"}
+
+    rows_res = client.post("/api/predict", headers=headers, json={**body, "sales_data": _sample_sales_data()})
+    cols_res = client.post("/api/predict", headers=headers, json={**body, "sales_data": _columns(_sample_sales_data())})
+    assert cols_res.status_code == 200
+    assert cols_res.get_json()["predictions"] == rows_res.get_json()["predictions"]
+
+
 def test_manager_can_access_algorithms(client):
     token = _login(client, "manager", "manager123")
     res = client.get("/api/algorithms", headers={"Authorization": f"Bearer {token}"})
@@ -114,3 +206,5 @@ def test_manager_can_access_algorithms(client):
     payload = res.get_json()
     assert "algorithms" in payload
     assert "linear_regression" in payload["algorithms"]
+    assert set(payload["availability"]) == set(payload["algorithms"])
+    assert payload["availability"]["linear_regression"]["available"] is True
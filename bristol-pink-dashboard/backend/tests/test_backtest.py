@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import app
+from models import evaluator
+from models.cache import RESULT_CACHE
+
+
+def _sample_sales_data(days: int = 56) -> list[dict]:
+    start = date(2025, 1, 1)
+    return [
+        {"date": (start + timedelta(days=i)).isoformat(), "product": product, "unitsSold": base + (i % 7) + (i * 7) % 5}
+        for i in range(days)
+        for product, base in (("Cappuccino", 80), ("Croissant", 48), ("Latte", 60))
+        if not (product == "Latte" and i < 30)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    RESULT_CACHE.clear()
+    yield
+    RESULT_CACHE.clear()
+
+
+@pytest.fixture
+def client():
+    app.config["TESTING"] = True
+    with app.test_client() as c:
+        yield c
+
+
+def _headers(client) -> dict[str, str]:
+    res = client.post("/api/auth/login", json={"username": "analyst", "password": "analyst123"})
+    return {"Authorization": f"Bearer {res.get_json()['token']}"}
+
+
+def _scores(metrics: dict) -> dict:
+    return {k: metrics[k] for k in ("mae", "rmse", "mape")}
+
+
+def test_each_fold_matches_single_holdout_on_truncated_data():
+    data = _sample_sales_data()
+    df = pd.DataFrame(data)
+    df["date"] = pd.to_datetime(df["date"])
+
+    result = evaluator.ModelEvaluator("linear_regression", cache=None, folds=4).evaluate(data, 4)
+    assert [f["fold"] for f in result["folds"]] == [0, 1, 2, 3]
+    assert result["mode"] == "rolling"
+    assert result["folds"][0]["test_end"] == "2025-02-25"
+    assert result["folds"][1]["test_start"] == "2025-02-11"
+
+    for k, fold in enumerate(result["folds"]):
+        truncated = df[df["date"] <= df["date"].max() - timedelta(weeks=k)]
+        single = evaluator.ModelEvaluator("linear_regression", cache=None).evaluate(truncated, 4)
+        assert _scores(fold) == _scores(single)
+        assert fold["points"] > 0
+
+    assert "folds" not in evaluator.ModelEvaluator("linear_regression", cache=None).evaluate(data, 4)
+
+
+def test_aggregate_metrics_pool_every_fold(monkeypatch):
+    seen = []
+    real = evaluator._compute_metrics
+
+    def recording(y_true, y_pred):
+        seen.append(len(y_true))
+        return real(y_true, y_pred)
+
+    monkeypatch.setattr(evaluator, "_compute_metrics", recording)
+    result = evaluator.ModelEvaluator("random_forest", cache=None, folds=3).evaluate(_sample_sales_data(), 5)
+    assert seen[-1] == sum(f["points"] for f in result["folds"]) == sum(seen[:-1])
+
+
+def test_expanding_folds_train_from_first_day_and_skip_empty_folds():
+    data = _sample_sales_data(days=24)
+    result = evaluator.ModelEvaluator("gradient_boosting", cache=None, folds=4, mode="expanding").evaluate(data, 4)
+    assert {f["train_start"] for f in result["folds"]} == {"2025-01-01"}
+    # The last fold's test week starts on the first day, so it has no training rows.
+    assert result["folds"][3]["points"] == 0
+    assert result["folds"][3]["mae"] == 0
+
+    with pytest.raises(ValueError):
+        evaluator.ModelEvaluator("linear_regression", folds=0)
+    with pytest.raises(ValueError):
+        evaluator.ModelEvaluator("linear_regression", mode="sliding")
+
+
+def test_parallel_folds_match_serial():
+    data = _sample_sales_data()
+    serial = evaluator.ModelEvaluator("linear_regression", cache=None, folds=3, workers=0).evaluate(data, 4)
+    parallel = evaluator.ModelEvaluator("linear_regression", cache=None, folds=3, workers=2).evaluate(data, 4)
+    strip = lambda m: [{k: v for k, v in f.items() if k != "training_time"} for f in m["folds"]]
+    assert strip(parallel) == strip(serial)
+    assert _scores(parallel) == _scores(serial)
+
+
+def test_backtest_features_rebase_days_per_slice():
+    df = pd.DataFrame(_sample_sales_data())
+    df["date"] = pd.to_datetime(df["date"])
+    data = evaluator.BacktestData(df)
+    fold = data.folds(4, 2)[1]
+    for product, train, _test in data.windows(fold):
+        dates = data.dates.iloc[train]
+        np.testing.assert_array_equal(data.features(train), evaluator.calendar_features(dates))
+
+
+def test_endpoints_accept_folds_and_keep_single_holdout_default(client):
+    headers = _headers(client)
+    payload = {"sales_data": _sample_sales_data(), "training_weeks": 4}
+
+    single = client.post("/api/evaluate", headers=headers, json=payload).get_json()
+    assert "folds" not in single
+
+    res = client.post("/api/evaluate", headers=headers, json={**payload, "folds": 3, "backtest_mode": "expanding"})
+    assert res.status_code == 200
+    body = res.get_json()
+    assert len(body["folds"]) == 3 and body["mode"] == "expanding" and body["cached"] is False
+    again = client.post("/api/evaluate", headers=headers, json={**payload, "folds": 3, "backtest_mode": "expanding"})
+    assert again.get_json()["cached"] is True
+
+    compare = client.post("/api/evaluate/compare", headers=headers, json={**payload, "folds": 2}).get_json()
+    lr = next(row for row in compare["results"] if row["algorithm"] == "linear_regression")
+    assert len(lr["folds"]) == 2
+
+    for bad in ({"folds": 0}, {"folds": "x"}, {"folds": 2, "backtest_mode": "sliding"}):
+        assert client.post("/api/evaluate", headers=headers, json={**payload, **bad}).status_code == 400
+    assert client.post("/api/jobs", headers=headers, json={**payload, "kind": "compare", "folds": 99}).status_code == 400
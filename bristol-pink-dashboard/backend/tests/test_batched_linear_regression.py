@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LinearRegression
+
+from models import evaluator
+from models.cache import MODEL_CACHE, RESULT_CACHE
+from models.incremental import INCREMENTAL_STATES
+from models.linear_regression import LinearRegressionPredictor, fit_many
+from models.random_forest import RandomForestPredictor
+
+
+def _sample_sales_data(days: int = 56) -> list[dict]:
+    start = date(2025, 1, 1)
+    return [
+        {"date": (start + timedelta(days=i)).isoformat(), "product": product, "unitsSold": base + (i % 7) + (i * 7) % 5}
+        for i in range(days)
+        for product, base in (("Cappuccino", 80), ("Croissant", 48), ("Latte", 60))
+        if not (product == "Latte" and i < 30)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def _clear_state():
+    for store in (MODEL_CACHE, RESULT_CACHE, INCREMENTAL_STATES):
+        store.clear()
+    yield
+    for store in (MODEL_CACHE, RESULT_CACHE, INCREMENTAL_STATES):
+        store.clear()
+
+
+def test_fit_many_matches_sklearn_per_series():
+    rng = np.random.default_rng(0)
+    Xs, ys = [], []
+    for n in (3, 7, 28, 91):
+        X = rng.normal(size=(n, 5))
+        Xs.append(X)
+        ys.append(X @ rng.normal(size=5) + rng.normal(size=n) + 20)
+    # Rank deficient: a constant column and a duplicated one, as in a window within one month.
+    X = rng.normal(size=(14, 5))
+    X[:, 2] = 1.0
+    X[:, 4] = X[:, 0]
+    Xs.append(X)
+    ys.append(rng.normal(size=14) - 1)
+
+    coef, intercept, residual_std = fit_many(Xs, ys)
+    for k, (X, y) in enumerate(zip(Xs, ys)):
+        reference = LinearRegression().fit(X, y)
+        np.testing.assert_allclose(X @ coef[k] + intercept[k], reference.predict(X), atol=1e-8)
+        assert residual_std[k] == pytest.approx(np.std(y - np.maximum(reference.predict(X), 0)))
+
+
+@pytest.mark.parametrize("batched", [False, True])
+def test_predict_and_evaluate_match_per_product_fits(batched):
+    data = _sample_sales_data()
+    predictor = LinearRegressionPredictor(batched=batched)
+    assert predictor.predict(data, 4) == LinearRegressionPredictor(batched=False).predict(data, 4)
+    assert predictor.model_updates == {"full": 3}
+
+    df = pd.DataFrame(data)
+    df["date"] = pd.to_datetime(df["date"])
+    backtest = evaluator.BacktestData(df)
+    for fold in backtest.folds(4, 3):
+        got = evaluator._evaluate_sklearn_model(LinearRegressionPredictor(batched=batched), backtest, fold)
+        want = evaluator._evaluate_sklearn_model(LinearRegressionPredictor(batched=False), backtest, fold)
+        np.testing.assert_array_equal(got[0], want[0])
+        np.testing.assert_allclose(got[1], want[1], atol=1e-8)
+
+
+def test_default_fit_batch_fits_windows_one_by_one():
+    class BatchedForest(RandomForestPredictor):
+        batched = True
+
+    data = _sample_sales_data()
+    predictor = BatchedForest()
+    assert predictor.predict(data, 4) == RandomForestPredictor().predict(data, 4)
+    assert predictor.model_updates == {"full": 3}
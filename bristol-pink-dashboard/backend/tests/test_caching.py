@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import os
+from datetime import date, timedelta
+
+import pytest
+
+from models import ALL_ALGORITHMS, evaluator, lstm_model
+from models.cache import LRUCache, MODEL_CACHE, RESULT_CACHE
+from models.predictor import SalesPredictor
+from models.random_forest import RandomForestPredictor
+from security import validate_sales_frame
+
+
+def _sample_sales_data(days: int = 35) -> list[dict]:
+    rows: list[dict] = []
+    start = date(2025, 1, 1)
+    for i in range(days):
+        d = (start + timedelta(days=i)).isoformat()
+        rows.append({"date": d, "product": "Cappuccino", "unitsSold": 80 + (i % 9)})
+        rows.append({"date": d, "product": "Croissant", "unitsSold": 48 + (i % 7)})
+    return rows
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    MODEL_CACHE.clear()
+    RESULT_CACHE.clear()
+    yield
+    MODEL_CACHE.clear()
+    RESULT_CACHE.clear()
+
+
+def test_lru_cache_evicts_by_count_and_bytes():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.stats()["evictions"] == 1
+
+    sized = LRUCache(max_entries=10, max_bytes=100)
+    sized.put("x", "x", size=60)
+    sized.put("y", "y", size=60)
+    assert "x" not in sized and "y" in sized
+    sized.put("huge", "h", size=500)
+    assert "huge" not in sized
+    assert sized.stats()["bytes"] == 60
+
+
+def test_lru_cache_counts_hits_and_misses():
+    cache = LRUCache()
+    assert cache.get("missing") is None
+    cache.put("k", "v")
+    assert cache.get("k") == "v"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_lru_cache_expires_entries_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("models.cache.time.monotonic", lambda: now[0])
+    cache = LRUCache(ttl_seconds=10)
+    cache.put("k", "v")
+    now[0] += 5
+    assert cache.get("k") == "v"
+    now[0] += 6
+    assert "k" not in cache
+    assert cache.get("k") is None
+    assert len(cache) == 0
+
+
+def test_repeat_forecast_skips_fit(monkeypatch):
+    data = _sample_sales_data()
+    first = SalesPredictor("random_forest").predict(data, 4)
+    assert MODEL_CACHE.stats()["entries"] == 2
+
+    def no_fit(*_args, **_kwargs):
+        raise AssertionError("fit() should not run on a cache hit")
+
+    monkeypatch.setattr(RandomForestPredictor, "fit", no_fit)
+    second = SalesPredictor("random_forest").predict(data, 4)
+    assert second == first
+    assert MODEL_CACHE.stats()["hits"] == 2
+
+
+def test_cache_key_tracks_training_slice_and_window():
+    data = _sample_sales_data()
+    SalesPredictor("linear_regression").predict(data, 4)
+    SalesPredictor("linear_regression").predict(data, 5)
+    changed = [dict(row) for row in data]
+    changed[-1]["unitsSold"] += 10
+    SalesPredictor("linear_regression").predict(changed, 4)
+
+    stats = MODEL_CACHE.stats()
+    assert stats["hits"] == 1  # unchanged Cappuccino slice in the edited dataset
+    assert stats["entries"] == 5
+
+
+def test_uncached_predictor_does_not_touch_cache():
+    SalesPredictor("linear_regression", use_cache=False).predict(_sample_sales_data(), 4)
+    assert MODEL_CACHE.stats()["entries"] == 0
+
+
+def test_lstm_reuses_cached_network(monkeypatch):
+    if not lstm_model.HAS_TORCH:
+        pytest.skip("torch not available")
+
+    data = _sample_sales_data(days=20)
+    predictor = SalesPredictor("lstm")
+    predictor._predictor.epochs = 1
+    first = predictor.predict(data, 4, forecast_weeks=1)
+
+    monkeypatch.setattr(lstm_model.LSTMPredictor, "_train", lambda *_a, **_k: pytest.fail("retrained"))
+    repeat = SalesPredictor("lstm")
+    repeat._predictor.epochs = 1
+    assert repeat.predict(data, 4, forecast_weeks=1) == first
+
+
+def test_evaluate_memoizes_by_fingerprint_algorithm_and_window(monkeypatch):
+    data = _sample_sales_data()
+    ev = evaluator.ModelEvaluator("linear_regression")
+    first = ev.evaluate(data, 4)
+    assert ev.cache_hit is False
+
+    calls = []
+    real = evaluator._evaluate_sklearn_model
+    monkeypatch.setattr(evaluator, "_evaluate_sklearn_model", lambda *a, **k: calls.append(1) or real(*a, **k))
+    again = evaluator.ModelEvaluator("linear_regression")
+    assert again.evaluate(data, 4) == first
+    assert again.cache_hit is True
+    assert calls == []
+
+    uncached = evaluator.ModelEvaluator("linear_regression", cache=None)
+    recomputed = uncached.evaluate(data, 4)
+    assert len(calls) == 1
+    assert {k: recomputed[k] for k in ("mae", "rmse", "mape")} == {k: first[k] for k in ("mae", "rmse", "mape")}
+
+
+def test_compare_training_windows_computes_only_missing_cells(monkeypatch):
+    data = _sample_sales_data()
+    evaluator.ModelEvaluator("linear_regression").evaluate(data, 4)
+    evaluator.ModelEvaluator("random_forest").evaluate(data, 5)
+
+    calls = []
+    def counting(self, df, training_weeks):
+        calls.append((self.algorithm, training_weeks))
+        return {"mae": 1.0, "rmse": 1.0, "mape": 1.0, "training_time": 0.0}
+
+    monkeypatch.setattr(evaluator.ModelEvaluator, "_evaluate_frame", counting)
+    out = evaluator.ModelEvaluator.compare_training_windows(data, [4, 5])
+
+    assert ("linear_regression", 4) not in calls
+    assert ("random_forest", 5) not in calls
+    assert len(calls) == len(ALL_ALGORITHMS) * 2 - 2
+    lr_rows = out["results"]["linear_regression"]["data"]
+    assert [row["cached"] for row in lr_rows] == [True, False]
+
+    compare = evaluator.ModelEvaluator.compare_all(data, 5)
+    assert all(row["cached"] for row in compare)
+
+
+def test_parallel_grid_matches_serial_results():
+    ok, _, df = validate_sales_frame(_sample_sales_data(days=28))
+    assert ok
+    cells = [("linear_regression", 3), ("gradient_boosting", 4), ("linear_regression", 4)]
+
+    serial = evaluator.ModelEvaluator._evaluate_grid(df, cells, workers=1)
+    RESULT_CACHE.clear()
+    parallel = evaluator.ModelEvaluator._evaluate_grid(df, cells, workers=2)
+
+    assert list(parallel) == list(serial) == cells
+    for cell in cells:
+        metrics, cached = parallel[cell]
+        assert cached is False
+        assert {k: v for k, v in metrics.items() if k != "training_time"} == {
+            k: v for k, v in serial[cell][0].items() if k != "training_time"
+        }
+
+    # The pool filled the result cache, so repeating the grid is served in-process.
+    again = evaluator.ModelEvaluator._evaluate_grid(df, cells, workers=2)
+    assert all(cached for _, cached in again.values())
+
+
+@pytest.mark.skipif(not lstm_model.HAS_TORCH, reason="torch not available")
+def test_pool_workers_cap_torch_threads(monkeypatch):
+    import torch
+
+    ok, _, df = validate_sales_frame(_sample_sales_data(days=28))
+    assert ok
+    # A count different from torch's default (the CPU count) on any machine.
+    threads = (os.cpu_count() or 1) + 1
+    monkeypatch.setattr(evaluator, "EVAL_THREADS_PER_WORKER", threads)
+    # The worker only imports torch when unpickling the task, after its initializer ran.
+    with evaluator._worker_pool(df, 2) as pool:
+        assert pool.submit(torch.get_num_threads).result() == threads
@@ -1,18 +1,26 @@
 from __future__ import annotations
 
+import subprocess
+import sys
 from datetime import date, timedelta
+from pathlib import Path
 
 import numpy as np
+import pandas as pd
 import pytest
 
 from app import app
-from models import arima_model, evaluator, lstm_model
+from models import arima_model, evaluator, features, lstm_model
+from models.frames import partition_by_product
 from models.gradient_boosting import GradientBoostingPredictor
 from models.linear_regression import LinearRegressionPredictor
 from models.predictor import SalesPredictor
 from models.random_forest import RandomForestPredictor
 
 
+BACKEND_ROOT = Path(__file__).resolve().parents[1]
+
+
 @pytest.fixture
 def client():
     app.config["TESTING"] = True
@@ -192,6 +200,87 @@ def test_model_predict_values_are_non_negative():
         assert np.all(preds >= 0)
 
 
+def test_base_predict_scores_horizon_in_one_call(monkeypatch):
+    calls = []
+    real_predict_values = RandomForestPredictor.predict_values
+
+    def counting(self, X):
+        calls.append(X.shape)
+        return real_predict_values(self, X)
+
+    monkeypatch.setattr(RandomForestPredictor, "predict_values", counting)
+    out = RandomForestPredictor().predict(_sample_sales_data(), training_weeks=4, forecast_weeks=52)
+
+    assert len(out) == 2 * 52 * 7
+    # One residual pass over the training rows per product, then one horizon pass per product.
+    assert [shape[0] for shape in calls[2:]] == [364, 364]
+    assert len(calls) == 4
+
+    model = RandomForestPredictor()
+    single = model.predict(_sample_sales_data(), training_weeks=4, forecast_weeks=1)
+    first = single[0]
+    assert first["date"] == "2025-02-10"
+    assert first["confidence_interval"][0] <= first["predicted_sales"] <= first["confidence_interval"][1]
+
+
+def test_calendar_features_match_pandas_calendar():
+    dates = pd.to_datetime(["2024-12-28", "2024-12-30", "2025-01-05", "2026-03-01"])
+    X = features.calendar_features(dates)
+
+    assert X.flags["C_CONTIGUOUS"] and X.dtype == np.float64
+    assert X[:, 0].tolist() == list(dates.dayofweek)
+    assert X[:, 1].tolist() == list(dates.day)
+    assert X[:, 2].tolist() == list(dates.isocalendar().week)
+    assert X[:, 3].tolist() == list(dates.month)
+    assert X[:, 4].tolist() == [0, 2, 8, 428]
+
+    shifted = features.calendar_features(dates, origin=pd.Timestamp("2024-12-01"))
+    assert shifted[:, 4].tolist() == [27, 29, 35, 455]
+
+    before = features.calendar_table_info()["hits"]
+    features.calendar_features(dates[1:])
+    assert features.calendar_table_info()["hits"] == before + 1
+
+
+def test_partition_by_product_matches_boolean_mask_slices():
+    df = pd.DataFrame({
+        "date": pd.to_datetime(["2025-01-03", "2025-01-01", "2025-01-02", "2025-01-01", "2025-01-02"]),
+        "product": ["Tea", "Cake", "Tea", "Tea", "Cake"],
+        "unitsSold": [3.0, 1.0, 2.0, 1.0, 2.0],
+    })
+    parts = partition_by_product(df)
+
+    assert parts.products == ["Tea", "Cake"]
+    for product, rows in parts:
+        expected = df[df["product"] == product].sort_values("date")
+        pd.testing.assert_frame_equal(rows, expected)
+    assert parts.bounds("Cake") == (3, 5)
+    assert "Coffee" not in parts and parts.rows("Coffee").empty
+
+
+def test_importing_app_does_not_load_heavy_model_backends():
+    code = (
+        "import sys, app, models; "
+        "assert models.ALGORITHM_NAMES['lstm'] == 'LSTM'; "
+        "assert not models.ALGORITHM_MAP.is_loaded('lstm'); "
+        "print('torch' in sys.modules, 'statsmodels' in sys.modules)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_ROOT, capture_output=True, text=True, check=True)
+    assert out.stdout.split() == ["False", "False"]
+
+
+def test_algorithm_registry_resolves_classes_on_first_use():
+    import models
+
+    assert models.ALGORITHM_MAP["random_forest"] is RandomForestPredictor
+    assert models.RandomForestPredictor is RandomForestPredictor
+    assert models.ALGORITHM_MAP.get("unknown") is None
+    for key, cls in models.ALGORITHM_MAP.items():
+        assert models.ALGORITHM_NAMES[key] == cls.name
+    with pytest.raises(AttributeError):
+        models.NotAPredictor
+
+
 def test_arima_predict_without_statsmodels_returns_empty(monkeypatch):
     monkeypatch.setattr(arima_model, "HAS_STATSMODELS", False)
     model = arima_model.ARIMAPredictor()
@@ -224,6 +313,91 @@ def test_lstm_predict_with_data_runs_when_available():
     assert isinstance(out, list)
 
 
+def test_stacked_lstm_matches_separate_networks():
+    if not lstm_model.HAS_TORCH:
+        pytest.skip("torch not available")
+    import torch
+
+    nets = [lstm_model._LSTMNet(input_size=1, hidden_size=8) for _ in range(3)]
+    stacked = lstm_model._StackedLSTM.from_nets(nets)
+    x = torch.rand(3, 5, lstm_model.LOOKBACK)
+    separate = torch.stack([net(x[k].unsqueeze(-1)).squeeze(-1) for k, net in enumerate(nets)])
+    combined = stacked(x)
+    assert torch.allclose(combined, separate, atol=1e-6)
+
+    separate.sum().backward()
+    combined.sum().backward()
+    for k, net in enumerate(nets):
+        assert torch.allclose(stacked.weight_hh.grad[k], net.lstm.weight_hh_l0.grad, atol=1e-6)
+        assert torch.allclose(stacked.weight_ih.grad[k], net.lstm.weight_ih_l0.grad, atol=1e-6)
+        assert torch.allclose(stacked.fc_weight.grad[k], net.fc.weight.grad, atol=1e-6)
+    for net, back in zip(nets, stacked.to_nets()):
+        assert all(torch.equal(a, b) for a, b in zip(net.parameters(), back.parameters()))
+
+
+def test_batched_lstm_trains_all_products_together(monkeypatch):
+    if not lstm_model.HAS_TORCH:
+        pytest.skip("torch not available")
+    monkeypatch.setattr(lstm_model.LSTMPredictor, "_train", lambda *_a, **_k: pytest.fail("trained one by one"))
+    calls = []
+    real = lstm_model.LSTMPredictor._train_stacked
+    monkeypatch.setattr(
+        lstm_model.LSTMPredictor, "_train_stacked",
+        lambda self, series: calls.append(len(series)) or real(self, series),
+    )
+
+    out = lstm_model.LSTMPredictor(epochs=2, units=8, batched=True).predict(_sample_sales_data(days=30), 4, forecast_weeks=1)
+    assert calls == [2]
+    assert len(out) == 14
+    assert {row["product"] for row in out} == {"Cappuccino", "Croissant"}
+    assert all(row["confidence_interval"][0] <= row["predicted_sales"] <= row["confidence_interval"][1] for row in out)
+
+
+def test_lstm_forecast_modes_and_stacked_forecast_agree():
+    if not lstm_model.HAS_TORCH:
+        pytest.skip("torch not available")
+    import torch
+
+    nets = [lstm_model._LSTMNet(input_size=1, hidden_size=8) for _ in range(3)]
+    windows = np.random.default_rng(0).random((3, lstm_model.LOOKBACK), dtype=np.float32)
+
+    # Window mode re-runs the full lookback for every step, as the legacy loop did.
+    expected = np.zeros((3, 6))
+    for k, net in enumerate(nets):
+        history = windows[k].tolist()
+        for i in range(6):
+            with torch.no_grad():
+                x = torch.tensor(history[-lstm_model.LOOKBACK:]).view(1, -1, 1)
+                history.append(net(x).item())
+        expected[k] = history[lstm_model.LOOKBACK:]
+
+    for batched in (False, True):
+        window = lstm_model.LSTMPredictor(batched=batched)._forecast(nets, windows, 6)
+        np.testing.assert_allclose(window, expected, atol=1e-6)
+        stateful = lstm_model.LSTMPredictor(batched=batched, forecast_mode="stateful")._forecast(nets, windows, 6)
+        # Both modes see the same first window; later steps carry state instead.
+        np.testing.assert_allclose(stateful[:, 0], expected[:, 0], atol=1e-6)
+        assert stateful.shape == (3, 6)
+
+    np.testing.assert_allclose(
+        lstm_model.LSTMPredictor(batched=True, forecast_mode="stateful")._forecast(nets, windows, 6),
+        lstm_model.LSTMPredictor(batched=False, forecast_mode="stateful")._forecast(nets, windows, 6),
+        atol=1e-6,
+    )
+    with pytest.raises(ValueError):
+        lstm_model.LSTMPredictor(forecast_mode="beam")
+
+
+def test_lstm_samples_are_views_of_the_series():
+    scaled = np.arange(12, dtype=np.float32).reshape(-1, 1)
+    X, y = lstm_model._samples(scaled)
+    assert np.shares_memory(X, scaled)
+    np.testing.assert_array_equal(X[0], np.arange(lstm_model.LOOKBACK))
+    np.testing.assert_array_equal(y, np.arange(lstm_model.LOOKBACK, 12))
+    assert len(X) == len(y) == 12 - lstm_model.LOOKBACK
+    assert lstm_model._samples(scaled[: lstm_model.LOOKBACK + 1]) is None
+
+
 def test_evaluator_metrics_and_comparisons_execute():
     data = _sample_sales_data(days=35)
 
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import io
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+import security
+from app import app
+from csv_ingest import read_sales_csv
+from datasets import DatasetStore
+from security import validate_sales_frame
+
+
+ASSETS = Path(__file__).resolve().parents[2] / "src" / "assets"
+
+
+@pytest.fixture
+def client():
+    app.config["TESTING"] = True
+    with app.test_client() as c:
+        yield c
+
+
+def _sample_sales_data(days: int = 35) -> list[dict]:
+    rows: list[dict] = []
+    start = date(2025, 1, 1)
+    for i in range(days):
+        d = (start + timedelta(days=i)).isoformat()
+        rows.append({"date": d, "product": "Cappuccino", "unitsSold": 80 + (i % 9)})
+        rows.append({"date": d, "product": "Croissant", "unitsSold": 48 + (i % 7)})
+    return rows
+
+
+def _headers(client, username: str = "analyst", password: str = "analyst123") -> dict[str, str]:
+    res = client.post("/api/auth/login", json={"username": username, "password": password})
+    assert res.status_code == 200
+    return {"Authorization": f"Bearer {res.get_json()['token']}"}
+
+
+def _upload(client, headers, rows) -> str:
+    res = client.post("/api/datasets", headers=headers, json={"sales_data": rows})
+    assert res.status_code == 201, res.get_data(as_text=True)
+    return res.get_json()["dataset"]["dataset_id"]
+
+
+def test_upload_returns_summary_and_dedupes_by_content(client):
+    headers = _headers(client)
+    rows = _sample_sales_data()
+
+    res = client.post("/api/datasets", headers=headers, json={"sales_data": rows})
+    assert res.status_code == 201
+    summary = res.get_json()["dataset"]
+    assert summary["rows"] == len(rows)
+    assert summary["products"] == ["Cappuccino", "Croissant"]
+    assert summary["start_date"] == "2025-01-01"
+
+    assert _upload(client, headers, rows) == summary["dataset_id"]
+    fetched = client.get(f"/api/datasets/{summary['dataset_id']}", headers=headers)
+    assert fetched.status_code == 200
+    assert fetched.get_json()["dataset"]["fingerprint"] == summary["fingerprint"]
+
+
+def test_upload_rejects_invalid_rows_and_viewer(client):
+    rows = _sample_sales_data()
+    rows[2]["unitsSold"] = -5
+    res = client.post("/api/datasets", headers=_headers(client), json={"sales_data": rows})
+    assert res.status_code == 400
+    assert res.get_json()["error"] == "Row 2 has negative unitsSold"
+
+    viewer = client.post("/api/datasets", headers=_headers(client, "viewer", "viewer123"), json={"sales_data": rows})
+    assert viewer.status_code == 403
+
+
+def test_endpoints_accept_dataset_id_in_place_of_sales_data(client):
+    headers = _headers(client)
+    rows = _sample_sales_data()
+    dataset_id = _upload(client, headers, rows)
+
+    inline = client.post("/api/predict", headers=headers, json={"sales_data": rows, "training_weeks": 4})
+    by_id = client.post("/api/predict", headers=headers, json={"dataset_id": dataset_id, "training_weeks": 4})
+    assert by_id.status_code == 200
+    assert by_id.get_json() == inline.get_json()
+
+    evaluate = client.post(
+        "/api/evaluate",
+        headers=headers,
+        json={"dataset_id": dataset_id, "training_weeks": 4, "algorithm": "linear_regression"},
+    )
+    assert evaluate.status_code == 200
+    assert {"mae", "rmse", "mape"} <= set(evaluate.get_json())
+
+
+def test_unknown_dataset_id_returns_404(client):
+    headers = _headers(client)
+    for path in ("/api/predict", "/api/evaluate", "/api/evaluate/compare", "/api/evaluate/windows"):
+        res = client.post(path, headers=headers, json={"dataset_id": "missing"})
+        assert res.status_code == 404
+        assert "unknown dataset_id" in res.get_json()["error"].lower()
+
+
+def test_datasets_are_only_visible_to_their_owner_and_managers(client, monkeypatch):
+    monkeypatch.setitem(security.USERS, "analyst2", {"password": "analyst456", "role": "analyst"})
+    rows = _sample_sales_data()
+    owner = _headers(client)
+    other = _headers(client, "analyst2", "analyst456")
+    dataset_id = _upload(client, owner, rows)
+
+    assert client.get(f"/api/datasets/{dataset_id}", headers=other).status_code == 404
+    for path in ("/api/predict", "/api/evaluate", "/api/jobs"):
+        res = client.post(path, headers=other, json={"dataset_id": dataset_id, "training_weeks": 4, "kind": "predict"})
+        assert res.status_code == 404
+    assert client.get(f"/api/datasets/{dataset_id}", headers=_headers(client, "manager", "manager123")).status_code == 200
+    appended = [{**row, "date": "2025-03-01"} for row in rows[:2]]
+    assert client.post(f"/api/datasets/{dataset_id}/append", headers=other, json={"sales_data": appended}).status_code == 404
+    assert client.post(f"/api/datasets/{dataset_id}/append", headers=other, json={"sales_data": []}).status_code == 404
+
+    # Uploading the same rows gives the other user a dataset of their own.
+    own_id = _upload(client, other, rows)
+    assert own_id != dataset_id
+    assert client.get(f"/api/datasets/{own_id}", headers=other).status_code == 200
+    assert _upload(client, owner, rows) == dataset_id
+
+
+def test_dataset_store_evicts_least_recently_used():
+    store = DatasetStore(max_datasets=2)
+    frames = []
+    for days in (10, 11, 12):
+        ok, _, frame = validate_sales_frame(_sample_sales_data(days))
+        assert ok
+        frames.append(frame)
+
+    first = store.put(frames[0], owner="analyst")
+    second = store.put(frames[1], owner="analyst")
+    assert store.get(first.dataset_id) is first
+    store.put(frames[2], owner="analyst")
+
+    assert len(store) == 2
+    assert store.get(second.dataset_id) is None
+    assert store.get(first.dataset_id) is first
+
+
+def test_csv_upload_melts_wide_file_into_same_dataset_as_rows(client):
+    headers = _headers(client)
+    text = (ASSETS / "pink_coffee.csv").read_text(encoding="utf-8")
+    res = client.post(
+        "/api/datasets/csv",
+        headers=headers,
+        data={"file": (io.BytesIO(text.encode("utf-8")), "pink_coffee.csv")},
+        content_type="multipart/form-data",
+    )
+    assert res.status_code == 201, res.get_data(as_text=True)
+    payload = res.get_json()
+    assert payload["layout"] == "wide"
+    assert payload["dataset"]["products"] == ["Cappuccino", "Americano"]
+    assert payload["dataset"]["start_date"] == "2025-03-01"
+
+    rows = []
+    for line in text.splitlines()[1:]:
+        day, cappuccino, americano = line.split(",")
+        iso = "-".join(reversed(day.split("/")))
+        rows.append({"date": iso, "product": "Cappuccino", "unitsSold": float(cappuccino)})
+        rows.append({"date": iso, "product": "Americano", "unitsSold": float(americano)})
+    rows.sort(key=lambda r: r["product"] != "Cappuccino")
+    assert _upload(client, headers, rows) == payload["dataset"]["dataset_id"]
+
+
+def test_csv_upload_single_series_needs_product_name(client):
+    headers = _headers(client)
+    body = (ASSETS / "pink_croissant.csv").read_bytes()
+
+    missing = client.post("/api/datasets/csv", headers=headers, data=body, content_type="text/csv")
+    assert missing.status_code == 400
+    named = client.post("/api/datasets/csv?product=Croissant", headers=headers, data=body, content_type="text/csv")
+    assert named.status_code == 201
+    assert named.get_json()["layout"] == "single"
+    assert named.get_json()["dataset"]["products"] == ["Croissant"]
+
+
+def test_read_sales_csv_long_format_in_small_chunks():
+    text = "Date,Product,Units Sold\n01/03/2025,Tea,3\n2025-03-02,Cake,4\n\n03/03/2025,,9\n04/03/2025,Tea,5\n"
+    ok, msg, frame, layout = read_sales_csv(io.StringIO(text), chunk_rows=2)
+
+    assert ok, msg
+    assert layout == "long"
+    assert frame["product"].tolist() == ["Tea", "Cake", "Tea"]
+    assert frame["date"].dt.strftime("%Y-%m-%d").tolist() == ["2025-03-01", "2025-03-02", "2025-03-04"]
+
+
+def test_read_sales_csv_reports_line_numbers():
+    cases = {
+        "Date,Tea\n01/03/2025,3\n\n02/03/2025,x\n": "Line 4 has non-numeric Tea: x",
+        "Date,Tea\n01/03/2025,3\n31/02/2025,4\n": "Line 3 has invalid date: 31/02/2025",
+        "Date,Number Sold,\n,Tea,Cake\n01/03/2025,1,-2\n": "Line 3 has negative Cake: -2",
+        "Day,Tea\n01/03/2025,3\n": 'CSV is missing a "Date" column.',
+    }
+    for text, message in cases.items():
+        ok, msg, frame, _ = read_sales_csv(io.StringIO(text), chunk_rows=1)
+        assert (ok, msg, frame) == (False, message, None)
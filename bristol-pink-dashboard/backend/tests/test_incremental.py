@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from app import app
+from models import arima_model, lstm_model
+from models.cache import MODEL_CACHE
+from models.incremental import INCREMENTAL_STATES, IncrementalStates, WindowState, window_shift
+from models.linear_regression import LinearRegressionPredictor
+from models.predictor import SalesPredictor
+
+
+def _sample_sales_data(days: int = 35, start: date = date(2025, 1, 1)) -> list[dict]:
+    rows: list[dict] = []
+    for i in range(days):
+        d = (start + timedelta(days=i)).isoformat()
+        rows.append({"date": d, "product": "Cappuccino", "unitsSold": 80 + (i % 9) + 0.3 * i})
+        rows.append({"date": d, "product": "Croissant", "unitsSold": 48 + (i % 7)})
+    return rows
+
+
+@pytest.fixture(autouse=True)
+def _clear_state():
+    MODEL_CACHE.clear()
+    INCREMENTAL_STATES.clear()
+    yield
+    MODEL_CACHE.clear()
+    INCREMENTAL_STATES.clear()
+
+
+@pytest.fixture
+def client():
+    app.config["TESTING"] = True
+    with app.test_client() as c:
+        yield c
+
+
+def _days(*offsets: int) -> np.ndarray:
+    return np.array(["2025-01-01"], dtype="datetime64[D]") + np.array(offsets)
+
+
+def test_window_shift_detects_dropped_and_appended_rows():
+    state = WindowState(_days(0, 1, 2, 3), np.array([1.0, 2, 3, 4]), payload=None)
+
+    assert window_shift(state, _days(0, 1, 2, 3), np.array([1.0, 2, 3, 4])) == (0, 0)
+    assert window_shift(state, _days(1, 2, 3, 4, 5), np.array([2.0, 3, 4, 5, 6])) == (1, 2)
+    # A changed value in the overlap, or a window starting before the state, needs a refit.
+    assert window_shift(state, _days(1, 2, 3, 4), np.array([2.0, 3, 9, 5])) is None
+    assert window_shift(state, _days(-1, 0, 1), np.array([0.0, 1, 2])) is None
+    assert window_shift(state, _days(5, 6), np.array([1.0, 1])) is None
+
+
+def test_large_shift_falls_back_to_full_fit():
+    states = IncrementalStates(max_shift=0.25)
+    predictor = LinearRegressionPredictor()
+    states.remember(predictor, 4, "Latte", WindowState(_days(*range(8)), np.arange(8.0), payload=None))
+
+    assert states.lookup(predictor, 4, "Latte", _days(*range(2, 10)), np.arange(2.0, 10)).added == 2
+    assert states.lookup(predictor, 4, "Latte", _days(*range(3, 11)), np.arange(3.0, 11)) is None
+
+
+def test_linear_regression_update_matches_full_refit():
+    rows = _sample_sales_data(days=40)
+    SalesPredictor("linear_regression").predict(rows[:-6], 4)
+
+    for days in (38, 39, 40):
+        predictor = SalesPredictor("linear_regression")
+        updated = predictor.predict(rows[: 2 * days], 4)
+        assert predictor.model_updates == {"incremental": 2}
+        refit = SalesPredictor("linear_regression", use_cache=False).predict(rows[: 2 * days], 4)
+        got = np.array([p["predicted_sales"] for p in updated])
+        want = np.array([p["predicted_sales"] for p in refit])
+        assert np.abs(got - want).max() <= 0.1 + 1e-9
+
+
+def test_arima_extends_previous_fit(monkeypatch):
+    if not arima_model.HAS_STATSMODELS:
+        pytest.skip("statsmodels not available")
+    rows = _sample_sales_data(days=36)
+    SalesPredictor("arima").predict(rows[:-2], 4, forecast_weeks=1)
+
+    extended = []
+    real_extend = arima_model.ARIMAPredictor._extend
+    monkeypatch.setattr(
+        arima_model.ARIMAPredictor, "_extend", staticmethod(lambda shift, ts: extended.append(real_extend(shift, ts)) or extended[-1])
+    )
+    predictor = SalesPredictor("arima")
+    predictions = predictor.predict(rows, 4, forecast_weeks=1)
+    assert predictor.model_updates == {"incremental": 2}
+    assert predictions[0]["date"] == "2025-02-06"
+    # The oldest days left the model's window as the two new ones arrived.
+    for fit in extended:
+        series = fit.model.data.orig_endog
+        assert (str(series.index[0].date()), str(series.index[-1].date())) == ("2025-01-08", "2025-02-05")
+
+
+def test_lstm_fine_tunes_previous_network(monkeypatch):
+    if not lstm_model.HAS_TORCH:
+        pytest.skip("torch not available")
+    rows = _sample_sales_data(days=30)
+    first = SalesPredictor("lstm")
+    first._predictor.epochs = 1
+    first.predict(rows[:-2], 4, forecast_weeks=1)
+
+    calls = []
+    real_train = lstm_model.LSTMPredictor._train
+    monkeypatch.setattr(
+        lstm_model.LSTMPredictor, "_train",
+        lambda self, values, previous=None: calls.append(previous is not None) or real_train(self, values, previous),
+    )
+    predictor = SalesPredictor("lstm")
+    predictor._predictor.epochs = 1
+    assert len(predictor.predict(rows, 4, forecast_weeks=1)) == 14
+    assert predictor.model_updates == {"incremental": 2}
+    assert calls == [True, True]
+
+
+def _headers(client) -> dict[str, str]:
+    res = client.post("/api/auth/login", json={"username": "analyst", "password": "analyst123"})
+    return {"Authorization": f"Bearer {res.get_json()['token']}"}
+
+
+def test_append_endpoint_creates_child_dataset_and_updates_models(client):
+    headers = _headers(client)
+    rows = _sample_sales_data(days=36)
+    res = client.post("/api/datasets", headers=headers, json={"sales_data": rows[:-2]})
+    parent = res.get_json()["dataset"]["dataset_id"]
+    first = client.post("/api/predict", headers=headers, json={"dataset_id": parent, "training_weeks": 4})
+    assert "fit;" in first.headers["Server-Timing"]
+
+    res = client.post(f"/api/datasets/{parent}/append", headers=headers, json={"sales_data": rows[-2:]})
+    assert res.status_code == 201
+    child = res.get_json()["dataset"]
+    assert child["parent_id"] == parent
+    assert child["rows"] == len(rows)
+    assert child["end_date"] == "2025-02-05"
+
+    second = client.post("/api/predict", headers=headers, json={"dataset_id": child["dataset_id"], "training_weeks": 4})
+    stages = second.headers["Server-Timing"]
+    assert "update;" in stages and "fit;" not in stages
+    assert second.get_json()["predictions"][0]["date"] == "2025-02-06"
+
+    overlap = client.post(f"/api/datasets/{child['dataset_id']}/append", headers=headers, json={"sales_data": rows[-2:]})
+    assert overlap.status_code == 400
+    assert "after 2025-02-05" in overlap.get_json()["error"]
+    assert client.post("/api/datasets/nope/append", headers=headers, json={"sales_data": rows[-2:]}).status_code == 404
+    assert client.post(f"/api/datasets/{parent}/append", headers=headers, json={"sales_data": []}).status_code == 400
+
+
+def test_unchanged_window_refits_unless_updates_are_exact():
+    states = IncrementalStates()
+    window = (_days(*range(8)), np.arange(8.0))
+    for predictor in (LinearRegressionPredictor(), lstm_model.LSTMPredictor()):
+        states.remember(predictor, 4, "Latte", WindowState(*window, payload=None))
+    assert states.lookup(LinearRegressionPredictor(), 4, "Latte", *window).added == 0
+    assert states.lookup(lstm_model.LSTMPredictor(), 4, "Latte", *window) is None
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+from app import app
+from models.cache import MODEL_CACHE, RESULT_CACHE
+from models.instrumentation import METRICS, MetricsRegistry, current_trace, finish_request, span, start_request
+
+
+@pytest.fixture
+def client():
+    app.config["TESTING"] = True
+    RESULT_CACHE.clear()
+    MODEL_CACHE.clear()
+    with app.test_client() as c:
+        yield c
+
+
+def _sample_sales_data(days: int = 35) -> list[dict]:
+    start = date(2025, 1, 1)
+    return [
+        {"date": (start + timedelta(days=i)).isoformat(), "product": product, "unitsSold": base + (i % 7)}
+        for i in range(days)
+        for product, base in (("Cappuccino", 80), ("Croissant", 48))
+    ]
+
+
+def _headers(client, username: str = "analyst", password: str = "analyst123") -> dict[str, str]:
+    res = client.post("/api/auth/login", json={"username": username, "password": password})
+    assert res.status_code == 200
+    return {"Authorization": f"Bearer {res.get_json()['token']}"}
+
+
+def _stages(header: str) -> dict[str, str]:
+    return {part.split(";")[0].strip(): part for part in header.split(",")}
+
+
+def test_predict_response_carries_server_timing(client):
+    res = client.post(
+        "/api/predict",
+        headers=_headers(client),
+        json={"sales_data": _sample_sales_data(), "algorithm": "random_forest", "training_weeks": 4},
+    )
+    assert res.status_code == 200
+    stages = _stages(res.headers["Server-Timing"])
+    for name in ("auth", "parse", "validate", "frame", "predict", "partition", "fit", "forecast", "serialize", "total"):
+        assert name in stages, name
+    # One fit per product, summed into a single entry (linear regression fits all products in one batch).
+    assert 'desc="x2"' in stages["fit"]
+
+
+def test_compare_records_per_algorithm_histograms(client):
+    METRICS.clear()
+    headers = _headers(client)
+    res = client.post("/api/evaluate/compare", headers=headers, json={"sales_data": _sample_sales_data(), "training_weeks": 4})
+    assert res.status_code == 200
+    assert "evaluate;" in res.headers["Server-Timing"]
+
+    model_stages = METRICS.snapshot("model_stage_duration_seconds")
+    assert model_stages[("linear_regression", "evaluate")][0] == 1
+    assert model_stages[("random_forest", "fit")][0] == 2
+    endpoint_stages = METRICS.snapshot("stage_duration_seconds")
+    assert endpoint_stages[("/api/evaluate/compare", "validate")][0] == 1
+
+
+def test_metrics_endpoint_is_manager_only_prometheus_text(client):
+    client.get("/api/health")
+    assert client.get("/api/metrics", headers=_headers(client)).status_code == 403
+
+    res = client.get("/api/metrics", headers=_headers(client, "manager", "manager123"))
+    assert res.status_code == 200
+    assert res.mimetype == "text/plain"
+    body = res.get_data(as_text=True)
+    assert "# TYPE pink_request_duration_seconds histogram" in body
+    assert 'pink_request_duration_seconds_bucket{endpoint="/api/health",method="GET",status="200",le="+Inf"}' in body
+
+
+def test_spans_inherit_algorithm_and_stay_per_context():
+    registry_before = METRICS.snapshot("model_stage_duration_seconds").get(("unit-test", "inner"), (0, 0.0))[0]
+    seen = {}
+
+    def serve(endpoint: str):
+        token = start_request(endpoint)
+        with span("outer", algorithm="unit-test"):
+            with span("inner"):
+                pass
+        seen[endpoint] = dict(current_trace().counts)
+        finish_request(token, "GET", 200)
+
+    threads = [threading.Thread(target=serve, args=(f"/t{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert all(counts == {"inner": 1, "outer": 1} for counts in seen.values())
+    assert METRICS.snapshot("model_stage_duration_seconds")[("unit-test", "inner")][0] == registry_before + 4
+    assert current_trace() is None
+
+
+def test_histogram_rendering_is_cumulative_and_escaped():
+    registry = MetricsRegistry(namespace="t")
+    registry.register("latency_seconds", "Test.", ("endpoint",))
+    for seconds in (0.0005, 0.003, 0.003, 120.0):
+        registry.observe("latency_seconds", seconds, 'a"b')
+    text = registry.render()
+    assert 't_latency_seconds_bucket{endpoint="a\\"b",le="0.001"} 1' in text
+    assert 't_latency_seconds_bucket{endpoint="a\\"b",le="0.005"} 3' in text
+    assert 't_latency_seconds_bucket{endpoint="a\\"b",le="+Inf"} 4' in text
+    assert 't_latency_seconds_count{endpoint="a\\"b"} 4' in text
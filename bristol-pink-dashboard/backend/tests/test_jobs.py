@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import date, timedelta
+
+import pytest
+
+from app import app
+from jobs import JOBS, InMemoryJobStore, Job, JobCancelled, JobLimitError, JobManager, SQLiteJobStore
+
+
+@pytest.fixture
+def client():
+    app.config["TESTING"] = True
+    with app.test_client() as c:
+        yield c
+
+
+def _sample_sales_data(days: int = 35) -> list[dict]:
+    rows: list[dict] = []
+    start = date(2025, 1, 1)
+    for i in range(days):
+        d = (start + timedelta(days=i)).isoformat()
+        rows.append({"date": d, "product": "Cappuccino", "unitsSold": 80 + (i % 9)})
+        rows.append({"date": d, "product": "Croissant", "unitsSold": 48 + (i % 7)})
+    return rows
+
+
+def _headers(client, username: str = "analyst", password: str = "analyst123") -> dict[str, str]:
+    res = client.post("/api/auth/login", json={"username": username, "password": password})
+    assert res.status_code == 200
+    return {"Authorization": f"Bearer {res.get_json()['token']}"}
+
+
+def _wait(get_job, job_id: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = get_job(job_id)
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_predict_job_returns_same_result_as_sync_endpoint(client):
+    headers = _headers(client)
+    payload = {"sales_data": _sample_sales_data(), "training_weeks": 4, "algorithm": "linear_regression"}
+
+    submitted = client.post("/api/jobs", headers=headers, json={"kind": "predict", **payload})
+    assert submitted.status_code == 202
+    job_id = submitted.get_json()["job"]["job_id"]
+
+    job = _wait(lambda jid: client.get(f"/api/jobs/{jid}", headers=headers).get_json()["job"], job_id)
+    assert job["status"] == "succeeded"
+    assert job["progress"] == 1.0
+
+    sync = client.post("/api/predict", headers=headers, json=payload)
+    assert job["result"] == sync.get_json()
+
+    listed = client.get("/api/jobs", headers=headers).get_json()["jobs"]
+    assert job_id in [j["job_id"] for j in listed]
+
+
+def test_job_submission_validates_input(client):
+    headers = _headers(client)
+    bad_kind = client.post("/api/jobs", headers=headers, json={"kind": "train", "sales_data": _sample_sales_data()})
+    assert bad_kind.status_code == 400
+
+    bad_rows = client.post("/api/jobs", headers=headers, json={"kind": "compare", "sales_data": []})
+    assert bad_rows.status_code == 400
+
+    viewer = client.post(
+        "/api/jobs",
+        headers=_headers(client, "viewer", "viewer123"),
+        json={"kind": "compare", "sales_data": _sample_sales_data()},
+    )
+    assert viewer.status_code == 403
+
+
+def test_jobs_are_private_to_owner_except_for_managers(client):
+    manager = _headers(client, "manager", "manager123")
+    analyst = _headers(client)
+    res = client.post("/api/jobs", headers=manager, json={"kind": "evaluate", "sales_data": _sample_sales_data()})
+    job_id = res.get_json()["job"]["job_id"]
+
+    assert client.get(f"/api/jobs/{job_id}", headers=analyst).status_code == 404
+    assert client.delete(f"/api/jobs/{job_id}", headers=analyst).status_code == 404
+    assert client.get(f"/api/jobs/{job_id}", headers=manager).status_code == 200
+    _wait(lambda jid: JOBS.get(jid).to_dict(), job_id)
+
+
+def test_per_user_job_limit_returns_429(client, monkeypatch):
+    monkeypatch.setattr(JOBS, "max_active_per_user", 0)
+    res = client.post("/api/jobs", headers=_headers(client), json={"kind": "predict", "sales_data": _sample_sales_data()})
+    assert res.status_code == 429
+
+
+def test_cancel_queued_and_running_jobs():
+    manager = JobManager(InMemoryJobStore(), max_workers=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def blocking(ctx):
+        ctx.progress(0.5)
+        started.set()
+        while not release.wait(0.01):
+            ctx.progress(0.5)
+        return {"done": True}
+
+    running = manager.submit("analyst", "compare", {}, blocking)
+    queued = manager.submit("analyst", "compare", {}, lambda ctx: {"never": True})
+    assert started.wait(5)
+
+    assert manager.cancel(queued.job_id).status == "cancelled"
+    manager.cancel(running.job_id)
+    final = _wait(lambda jid: manager.get(jid).to_dict(), running.job_id)
+    assert final["status"] == "cancelled"
+    assert final["progress"] == 0.5
+    manager.shutdown()
+
+
+def test_job_limit_failure_and_expiry():
+    manager = JobManager(InMemoryJobStore(), max_workers=1, max_active_per_user=1, result_ttl_seconds=0)
+    gate = threading.Event()
+    first = manager.submit("analyst", "predict", {}, lambda ctx: gate.wait(5) and {"ok": True})
+    with pytest.raises(JobLimitError):
+        manager.submit("analyst", "predict", {}, lambda ctx: {})
+    gate.set()
+    assert _wait(lambda jid: manager.store.get(jid).to_dict(), first.job_id)["status"] == "succeeded"
+
+    def boom(ctx):
+        raise ValueError("bad input")
+
+    failed = manager.submit("analyst", "predict", {}, boom)
+    job = _wait(lambda jid: manager.store.get(jid).to_dict(), failed.job_id)
+    assert job["status"] == "failed" and job["error"] == "bad input"
+
+    # With a zero TTL, finished jobs are purged on the next access.
+    time.sleep(0.01)
+    assert manager.get(first.job_id) is None
+    manager.shutdown()
+
+
+def test_sqlite_store_survives_restart(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    store = SQLiteJobStore(path)
+    manager = JobManager(store, max_workers=1)
+    done = manager.submit("analyst", "evaluate", {"algorithm": "arima"}, lambda ctx: {"mae": 1.5})
+    _wait(lambda jid: store.get(jid).to_dict(), done.job_id)
+    manager.shutdown()
+    store.save(Job(job_id="orphan", owner="analyst", kind="compare", params={}, status="running", worker="gone:999999999"))
+    store.close()
+
+    reopened = SQLiteJobStore(path)
+    restored = reopened.get(done.job_id)
+    assert restored.status == "succeeded"
+    assert restored.result == {"mae": 1.5}
+    assert restored.params == {"algorithm": "arima"}
+    orphan = reopened.get("orphan")
+    assert orphan.status == "failed"
+    assert "restart" in orphan.error
+    assert reopened.count_active("analyst") == 0
+
+    # A cancel request written by another process is seen through the shared file.
+    reopened.save(Job(job_id="live", owner="analyst", kind="compare", params={}, status="running"))
+    SQLiteJobStore(path).update("live", cancel_requested=True)
+    assert reopened.get("live").cancel_requested is True
+    reopened.close()
+
+
+def test_compare_job_reports_progress_and_cancels_between_cells(monkeypatch):
+    from models import evaluator
+
+    calls = []
+
+    def fake_frame(self, df, training_weeks):
+        calls.append(self.algorithm)
+        return {"mae": 1.0, "rmse": 1.0, "mape": 1.0, "training_time": 0.0}
+
+    monkeypatch.setattr(evaluator.ModelEvaluator, "_evaluate_frame", fake_frame)
+    seen = []
+
+    def progress(fraction):
+        seen.append(fraction)
+        if len(seen) == 2:
+            raise JobCancelled()
+
+    with pytest.raises(JobCancelled):
+        evaluator.ModelEvaluator.compare_training_windows(_sample_sales_data(days=30), [3], progress=progress)
+    assert len(calls) == 2
+    assert seen[0] == pytest.approx(1 / len(evaluator.ALL_ALGORITHMS))
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from datetime import date, timedelta
+
+import pytest
+
+import app as app_module
+from app import app
+from models import arima_model, lstm_model, predictor as predictor_module, registry as registry_module
+from models.cache import MODEL_CACHE
+from models.incremental import INCREMENTAL_STATES
+from models.predictor import SalesPredictor
+from models.registry import ModelRegistry
+
+
+def _sample_sales_data(days: int = 35) -> list[dict]:
+    start = date(2025, 1, 1)
+    return [
+        {"date": (start + timedelta(days=i)).isoformat(), "product": product, "unitsSold": base + (i % 7) + (i * 3) % 5}
+        for i in range(days)
+        for product, base in (("Cappuccino", 80), ("Croissant", 48))
+    ]
+
+
+def _forget_in_process_models():
+    MODEL_CACHE.clear()
+    INCREMENTAL_STATES.clear()
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    reg = ModelRegistry(str(tmp_path / "models"))
+    monkeypatch.setattr(predictor_module, "MODEL_REGISTRY_ENABLED", True)
+    monkeypatch.setattr(predictor_module, "MODEL_REGISTRY", reg)
+    _forget_in_process_models()
+    yield reg
+    _forget_in_process_models()
+
+
+@pytest.fixture
+def client():
+    app.config["TESTING"] = True
+    with app.test_client() as c:
+        yield c
+
+
+def _headers(client, username: str = "manager", password: str = "manager123") -> dict[str, str]:
+    res = client.post("/api/auth/login", json={"username": username, "password": password})
+    return {"Authorization": f"Bearer {res.get_json()['token']}"}
+
+
+@pytest.mark.parametrize("algorithm", ["linear_regression", "random_forest", "arima", "lstm"])
+def test_restarted_process_loads_models_from_registry(registry, algorithm):
+    if algorithm == "arima" and not arima_model.HAS_STATSMODELS:
+        pytest.skip("statsmodels not available")
+    if algorithm == "lstm" and not lstm_model.HAS_TORCH:
+        pytest.skip("torch not available")
+    data = _sample_sales_data()
+    first = SalesPredictor(algorithm)
+    fitted = first.predict(data, 4)
+    assert first.model_updates == {"full": 2}
+    assert len(registry) == 2
+
+    _forget_in_process_models()
+    second = SalesPredictor(algorithm)
+    assert second.predict(data, 4) == fitted
+    assert second.model_updates == {"registry": 2}
+    assert registry.hits == 2
+
+    # Now back in the in-process cache.
+    third = SalesPredictor(algorithm)
+    third.predict(data, 4)
+    assert third.model_updates == {"cached": 2}
+
+
+def test_metadata_records_key_checksum_and_versions(registry):
+    SalesPredictor("linear_regression").predict(_sample_sales_data(), 5)
+    artifacts = registry.list()
+    assert {a["product"] for a in artifacts} == {"Cappuccino", "Croissant"}
+    meta = artifacts[0]
+    assert meta["predictor"] == "LinearRegressionPredictor"
+    assert meta["training_weeks"] == 5
+    assert meta["version"] == registry_module.ARTIFACT_VERSION
+    assert set(meta["libraries"]) == {"numpy", "scikit-learn"}
+    path = os.path.join(registry.directory, meta["artifact_id"] + meta["suffix"])
+    assert os.path.getsize(path) == meta["bytes"]
+    assert registry_module._sha256(path) == meta["sha256"]
+
+
+def test_corrupt_or_outdated_artifacts_are_misses_and_removed(registry, monkeypatch):
+    data = _sample_sales_data()
+    SalesPredictor("linear_regression").predict(data, 4)
+    meta = registry.list()[0]
+    with open(os.path.join(registry.directory, meta["artifact_id"] + meta["suffix"]), "ab") as fh:
+        fh.write(b"garbage")
+
+    _forget_in_process_models()
+    predictor = SalesPredictor("linear_regression")
+    predictor.predict(data, 4)
+    assert predictor.model_updates == {"registry": 1, "full": 1}
+    assert registry.errors == 1
+    assert len(registry) == 2  # the refitted model was saved again
+
+    monkeypatch.setattr(registry_module, "ARTIFACT_VERSION", registry_module.ARTIFACT_VERSION + 1)
+    _forget_in_process_models()
+    predictor = SalesPredictor("linear_regression")
+    predictor.predict(data, 4)
+    assert predictor.model_updates == {"full": 2}
+
+
+def test_gc_drops_old_then_least_recently_used_and_orphans(tmp_path):
+    reg = ModelRegistry(str(tmp_path), max_entries=2, max_age_seconds=3600)
+    model = SalesPredictor("linear_regression")._predictor
+    keys = [("fp", "LinearRegressionPredictor", (), 4, f"p{i}") for i in range(4)]
+    for i, key in enumerate(keys):
+        assert reg.save(model, key, ({"coef": i}, 1.0))
+        ident = registry_module.artifact_id(key)
+        os.utime(os.path.join(str(tmp_path), ident + ".json"), (time.time() - 100 + i, time.time() - 100 + i))
+    # p0 is the oldest but was just used.
+    assert reg.load(model, keys[0]) == ({"coef": 0}, 1.0)
+    stale = os.path.join(str(tmp_path), registry_module.artifact_id(keys[3]) + ".json")
+    os.utime(stale, (time.time() - 7200, time.time() - 7200))
+    orphan = tmp_path / "0123.joblib.99.tmp"
+    orphan.write_bytes(b"x")
+    os.utime(orphan, (time.time() - 7200, time.time() - 7200))
+
+    assert reg.gc() == 2
+    assert sorted(meta["product"] for meta in reg.list()) == ["p0", "p2"]
+    assert not orphan.exists()
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        registry_module.artifact_id(keys[i]) + suffix for i in (0, 2) for suffix in (".json", ".joblib")
+    )
+
+
+def test_threads_saving_the_same_key_use_separate_temp_files(tmp_path):
+    reg = ModelRegistry(str(tmp_path))
+    model = SalesPredictor("linear_regression")._predictor
+    key = ("fp", "LinearRegressionPredictor", (), 4, "Latte")
+    value = ({"coef": list(range(50_000))}, 1.0)
+    threads = [threading.Thread(target=reg.save, args=(model, key, value)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert reg.saves == 8 and reg.errors == 0
+    assert reg.load(model, key) == value
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+
+def test_registry_endpoints_are_manager_only(client, registry, monkeypatch):
+    monkeypatch.setattr(app_module, "MODEL_REGISTRY", registry)
+    SalesPredictor("linear_regression").predict(_sample_sales_data(), 4)
+
+    assert client.get("/api/models/registry", headers=_headers(client, "analyst", "analyst123")).status_code == 403
+    body = client.get("/api/models/registry", headers=_headers(client)).get_json()
+    assert body["stats"]["entries"] == 2
+    assert json.dumps(body["artifacts"])
+
+    res = client.post("/api/models/registry/gc", headers=_headers(client))
+    assert res.get_json()["removed"] == 0
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import io
+import pstats
+from datetime import date, timedelta
+
+import pytest
+
+from app import app
+from models.cache import MODEL_CACHE
+from profiling import PROFILER, ProfileStore
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    app.config["TESTING"] = True
+    monkeypatch.setattr(PROFILER, "store", ProfileStore(str(tmp_path / "profiles")))
+    monkeypatch.setattr(PROFILER, "interval_ms", 1.0)
+    MODEL_CACHE.clear()
+    with app.test_client() as c:
+        yield c
+    PROFILER.arm(0)
+
+
+def _sample_sales_data(days: int = 35) -> list[dict]:
+    start = date(2025, 1, 1)
+    return [
+        {"date": (start + timedelta(days=i)).isoformat(), "product": product, "unitsSold": base + (i % 7)}
+        for i in range(days)
+        for product, base in (("Cappuccino", 80), ("Croissant", 48))
+    ]
+
+
+def _headers(client, username: str = "manager", password: str = "manager123") -> dict[str, str]:
+    res = client.post("/api/auth/login", json={"username": username, "password": password})
+    assert res.status_code == 200
+    return {"Authorization": f"Bearer {res.get_json()['token']}"}
+
+
+def _predict(client, headers):
+    return client.post(
+        "/api/predict",
+        headers=headers,
+        json={"sales_data": _sample_sales_data(), "algorithm": "random_forest", "training_weeks": 4},
+    )
+
+
+def test_manager_header_profiles_request_and_serves_collapsed_stacks(client):
+    headers = _headers(client)
+    res = _predict(client, {**headers, "X-Profile": "1"})
+    assert res.status_code == 200
+    profile_id = res.headers["X-Profile-Id"]
+
+    meta = client.get(f"/api/profiles/{profile_id}", headers=headers).get_json()["profile"]
+    assert meta["endpoint"] == "/api/predict"
+    assert meta["trigger"] == "header"
+    assert meta["status"] == 200
+    assert meta["samples"] > 0
+
+    download = client.get(f"/api/profiles/{profile_id}/collapsed", headers=headers)
+    assert download.status_code == 200
+    assert "attachment" in download.headers["Content-Disposition"]
+    lines = download.get_data(as_text=True).splitlines()
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert "app.py:predict" in stack
+    assert client.get(f"/api/profiles/{profile_id}/pstats", headers=headers).status_code == 404
+
+
+def test_header_is_ignored_for_other_roles(client):
+    res = _predict(client, {**_headers(client, "analyst", "analyst123"), "X-Profile": "1"})
+    assert res.status_code == 200
+    assert "X-Profile-Id" not in res.headers
+    assert PROFILER.store.list() == []
+
+
+def test_armed_profiler_captures_next_matching_requests(client):
+    manager = _headers(client)
+    analyst = _headers(client, "analyst", "analyst123")
+    assert client.post("/api/profiles/arm", headers=analyst, json={"count": 2}).status_code == 403
+    assert client.post("/api/profiles/arm", headers=manager, json={"count": 1, "mode": "flame"}).status_code == 400
+
+    res = client.post("/api/profiles/arm", headers=manager, json={"count": 2, "mode": "cprofile", "endpoint": "/api/predict"})
+    assert res.get_json()["armed"] == {"remaining": 2, "mode": "cprofile", "endpoint": "/api/predict"}
+
+    assert "X-Profile-Id" not in client.get("/api/algorithms", headers=analyst).headers
+    ids = [_predict(client, analyst).headers.get("X-Profile-Id") for _ in range(3)]
+    assert ids[0] and ids[1] and ids[2] is None
+    assert client.get("/api/profiles/arm", headers=manager).get_json()["armed"]["remaining"] == 0
+
+    listed = client.get("/api/profiles", headers=manager).get_json()["profiles"]
+    assert [p["profile_id"] for p in listed] == [ids[1], ids[0]]
+    assert listed[0]["user"] == "analyst" and listed[0]["trigger"] == "armed"
+
+    data = client.get(f"/api/profiles/{ids[0]}/pstats", headers=manager).get_data()
+    path = PROFILER.store.data_path(ids[0], "pstats")
+    assert data == open(path, "rb").read()
+    out = io.StringIO()
+    pstats.Stats(path, stream=out).print_stats(5)
+    assert "function calls" in out.getvalue()
+
+
+def test_store_keeps_newest_profiles(tmp_path):
+    store = ProfileStore(str(tmp_path), max_keep=2)
+    ids = []
+    for _ in range(3):
+        profile_id = ProfileStore.new_id()
+        store.save({"profile_id": profile_id}, collapsed="a;b 1\n")
+        ids.append(profile_id)
+
+    assert [m["profile_id"] for m in store.list()] == [ids[2], ids[1]]
+    assert store.data_path(ids[0], "collapsed") is None
+    assert store.get("../etc") is None
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from sessions import InMemorySessionStore, Session, SessionRegistry, SQLiteSessionStore
+
+
+def _session(hours: float = 1, username: str = "analyst") -> Session:
+    return Session(username=username, role="analyst", expires_at=datetime.now(timezone.utc) + timedelta(hours=hours))
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield InMemorySessionStore()
+    else:
+        s = SQLiteSessionStore(str(tmp_path / "sessions.db"))
+        yield s
+        s.close()
+
+
+def test_store_round_trip_and_bulk_expiry(store):
+    store.save("live", _session())
+    store.save("old-1", _session(hours=-1))
+    store.save("old-2", _session(hours=-2))
+
+    assert store.get("live").username == "analyst"
+    assert store.get("live").expires_at.tzinfo is not None
+    assert store.purge_expired(datetime.now(timezone.utc)) == 2
+    assert len(store) == 1
+    store.delete("live")
+    assert store.get("live") is None
+
+
+def test_sqlite_sessions_are_shared_between_workers(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    worker_a = SessionRegistry(SQLiteSessionStore(path), cache_ttl_seconds=0, sweep_interval_seconds=0)
+    worker_b = SessionRegistry(SQLiteSessionStore(path), cache_ttl_seconds=0, sweep_interval_seconds=0)
+
+    worker_a.save("token", _session())
+    assert worker_b.get("token").username == "analyst"
+
+    worker_b.delete("token")
+    assert worker_a.get("token") is None
+
+
+def test_registry_reads_through_cache():
+    calls = []
+    store = InMemorySessionStore()
+    real_get = store.get
+    store.get = lambda token: calls.append(token) or real_get(token)
+    registry = SessionRegistry(store, sweep_interval_seconds=0)
+    store.save("token", _session())
+
+    assert registry.get("token") is not None
+    assert registry.get("token") is not None
+    assert calls == ["token"]
+    assert registry.get("missing") is None
+
+
+def test_expired_session_is_rejected_and_removed():
+    registry = SessionRegistry(InMemorySessionStore(), sweep_interval_seconds=0)
+    registry.save("token", _session(hours=-1))
+
+    assert registry.get("token") is None
+    assert len(registry) == 0
+
+
+def test_sweeper_evicts_expired_sessions_in_background():
+    registry = SessionRegistry(InMemorySessionStore(), sweep_interval_seconds=0.05)
+    registry.save("old", _session(hours=-1))
+    registry.save("live", _session())
+    try:
+        registry._sweeper.join(timeout=0.3)
+        assert len(registry) == 1
+        assert registry.get("live") is not None
+    finally:
+        registry.shutdown()
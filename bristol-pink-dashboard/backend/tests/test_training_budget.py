@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from app import _run_job, app
+from jobs import JobCancelled
+from models import evaluator, lstm_model
+from models.budget import CancellationToken, TrainingBudget
+from models.cache import MODEL_CACHE, RESULT_CACHE
+from models.incremental import INCREMENTAL_STATES
+from models.predictor import SalesPredictor
+
+pytestmark = pytest.mark.skipif(not lstm_model.HAS_TORCH, reason="torch not available")
+
+
+def _sample_sales_data(days: int = 42) -> list[dict]:
+    start = date(2025, 1, 1)
+    return [
+        {"date": (start + timedelta(days=i)).isoformat(), "product": product, "unitsSold": base + (i % 7) * 3}
+        for i in range(days)
+        for product, base in (("Cappuccino", 80), ("Croissant", 48))
+    ]
+
+
+@pytest.fixture(autouse=True)
+def _clear_state():
+    for store in (MODEL_CACHE, RESULT_CACHE, INCREMENTAL_STATES):
+        store.clear()
+    yield
+    for store in (MODEL_CACHE, RESULT_CACHE, INCREMENTAL_STATES):
+        store.clear()
+
+
+@pytest.fixture
+def client():
+    app.config["TESTING"] = True
+    with app.test_client() as c:
+        yield c
+
+
+def _headers(client) -> dict[str, str]:
+    res = client.post("/api/auth/login", json={"username": "analyst", "password": "analyst123"})
+    return {"Authorization": f"Bearer {res.get_json()['token']}"}
+
+
+@pytest.mark.parametrize("batched", [False, True])
+def test_patience_stops_each_network_and_reports_epochs(batched):
+    predictor = lstm_model.LSTMPredictor(epochs=300, units=8, batched=batched, patience=2)
+    out = predictor.predict(_sample_sales_data(), 4, forecast_weeks=1)
+    assert len(out) == 14
+    assert set(predictor.training_runs) == {"Cappuccino", "Croissant"}
+    for run in predictor.training_runs.values():
+        assert run["stop_reason"] == "patience"
+        assert 3 <= run["epochs"] < 300
+
+    unlimited = lstm_model.LSTMPredictor(epochs=3, units=8, batched=batched, patience=0)
+    unlimited.predict(_sample_sales_data(), 4, forecast_weeks=1)
+    assert {run["stop_reason"] for run in unlimited.training_runs.values()} == {"completed"}
+    assert {run["epochs"] for run in unlimited.training_runs.values()} == {3}
+
+
+def test_early_stopping_restores_best_parameters():
+    import torch
+
+    params = [torch.zeros(2, 3, requires_grad=True)]
+    stopping = lstm_model._EarlyStopping(params, patience=1)
+    assert not stopping.update(torch.tensor([1.0, 1.0]))
+    with torch.no_grad():
+        params[0].fill_(5.0)
+    # Network 0 got worse and stops; network 1 improved and keeps the new values.
+    assert not stopping.update(torch.tensor([2.0, 0.5]))
+    assert stopping.active.tolist() == [False, True]
+    stopping.restore()
+    assert params[0][0].tolist() == [0.0, 0.0, 0.0]
+    assert params[0][1].tolist() == [5.0, 5.0, 5.0]
+    assert stopping.epochs.tolist() == [2, 2]
+
+
+@pytest.mark.parametrize("batched", [False, True])
+def test_budget_stops_training_cleanly_and_skips_the_cache(batched):
+    token = CancellationToken()
+    token.cancel()
+    predictor = SalesPredictor("lstm", budget=TrainingBudget(cancel=token))
+    predictor._predictor.batched = batched
+    assert len(predictor.predict(_sample_sales_data(), 4, forecast_weeks=1)) == 14
+    assert predictor.training_runs == {
+        "Cappuccino": {"epochs": 1, "stop_reason": "cancelled"},
+        "Croissant": {"epochs": 1, "stop_reason": "cancelled"},
+    }
+    assert len(MODEL_CACHE) == 0
+
+    expired = SalesPredictor("lstm", budget=TrainingBudget(deadline=time.time() - 1))
+    expired.predict(_sample_sales_data(), 4, forecast_weeks=1)
+    assert {run["stop_reason"] for run in expired.training_runs.values()} == {"deadline"}
+
+    per_run = lstm_model.LSTMPredictor(epochs=10_000, units=8, batched=batched, patience=0, time_budget_ms=50)
+    per_run.predict(_sample_sales_data(), 4, forecast_weeks=1)
+    assert {run["stop_reason"] for run in per_run.training_runs.values()} == {"time_budget"}
+
+
+def test_budget_limit_keeps_the_earlier_deadline():
+    budget = TrainingBudget.within(60_000)
+    assert budget.limit(10).reason == "time_budget"
+    assert budget.limit(120_000) is budget
+    assert budget.limit(0) is budget
+    assert TrainingBudget.within(None).stop_reason() is None
+
+
+def test_evaluator_reports_training_and_does_not_cache_interrupted_runs():
+    data = _sample_sales_data()
+    token = CancellationToken()
+    token.cancel()
+    cancelled = evaluator.ModelEvaluator("lstm", budget=TrainingBudget(cancel=token)).evaluate(data, 4)
+    assert cancelled["training"] == {"epochs": 2, "stop_reasons": {"cancelled": 2}}
+    assert len(RESULT_CACHE) == 0
+
+    folds = evaluator.ModelEvaluator("lstm", folds=2, budget=TrainingBudget(cancel=token)).evaluate(data, 4)
+    assert [f["training"]["stop_reasons"] for f in folds["folds"]] == [{"cancelled": 2}] * 2
+    assert len(RESULT_CACHE) == 0
+
+    assert "training" not in evaluator.ModelEvaluator("linear_regression").evaluate(data, 4)
+    assert len(RESULT_CACHE) == 1
+
+
+def test_predict_endpoint_reports_training_and_validates_budget(client):
+    headers = _headers(client)
+    payload = {"sales_data": _sample_sales_data(), "training_weeks": 4, "algorithm": "lstm", "time_budget_ms": 1}
+    body = client.post("/api/predict", headers=headers, json=payload).get_json()
+    assert set(body["training"]) == {"Cappuccino", "Croissant"}
+    assert body["training"]["Cappuccino"]["stop_reason"] == "deadline"
+
+    lr = client.post("/api/predict", headers=headers, json={**payload, "algorithm": "linear_regression"}).get_json()
+    assert "training" not in lr
+    for bad in (0, -5, "soon"):
+        assert client.post("/api/predict", headers=headers, json={**payload, "time_budget_ms": bad}).status_code == 400
+    assert client.post("/api/evaluate", headers=headers, json={**payload, "time_budget_ms": "x"}).status_code == 400
+
+
+def test_cancelled_predict_job_stops_training_and_ends_cancelled():
+    class CancelledContext:
+        cancelled = True
+
+    params = {"algorithm": "lstm", "training_weeks": 4, "folds": 1, "backtest_mode": "rolling", "time_budget_ms": None}
+    frame = pd.DataFrame(_sample_sales_data())
+    frame["date"] = pd.to_datetime(frame["date"])
+    started = time.perf_counter()
+    with pytest.raises(JobCancelled):
+        _run_job("predict", frame, params, CancelledContext())
+    assert time.perf_counter() - started < 10
+
+
+@pytest.mark.parametrize("batched", [False, True])
+def test_budget_cut_run_is_not_kept_for_incremental_updates(batched):
+    data = _sample_sales_data()
+    cut = SalesPredictor("lstm", budget=TrainingBudget(deadline=time.time() - 1))
+    cut._predictor.batched = batched
+    cut.predict(data, 4, forecast_weeks=1)
+    assert len(INCREMENTAL_STATES) == 0
+
+    full = SalesPredictor("lstm")
+    full._predictor.batched = batched
+    full.predict(data, 4, forecast_weeks=1)
+    assert full.model_updates == {"full": 2}
+    assert {run["stop_reason"] for run in full.training_runs.values()} != {"deadline"}
+    assert len(INCREMENTAL_STATES) == 2
+
+
+def test_time_budget_is_shared_by_every_network_of_a_forecast():
+    predictor = lstm_model.LSTMPredictor(epochs=10_000, units=8, batched=False, patience=0, time_budget_ms=300)
+    predictor.predict(_sample_sales_data(), 4, forecast_weeks=1)
+    runs = sorted(predictor.training_runs.values(), key=lambda run: run["epochs"])
+    assert {run["stop_reason"] for run in runs} == {"time_budget"}
+    # The first network used up the budget, so the second stops after one epoch.
+    assert runs[0]["epochs"] == 1 < runs[1]["epochs"]
+
+
+def test_failed_stacked_training_falls_back_to_one_network_per_product(monkeypatch):
+    def broken(self, series):
+        raise RuntimeError("bad series")
+
+    real_train = lstm_model.LSTMPredictor._train
+
+    def train(self, values, previous=None):
+        if values.max() > 70:  # Cappuccino
+            raise ValueError("bad series")
+        return real_train(self, values, previous)
+
+    monkeypatch.setattr(lstm_model.LSTMPredictor, "_train_stacked", broken)
+    monkeypatch.setattr(lstm_model.LSTMPredictor, "_train", train)
+    predictor = lstm_model.LSTMPredictor(epochs=2, units=8, batched=True)
+    out = predictor.predict(_sample_sales_data(), 4, forecast_weeks=1)
+    assert {row["product"] for row in out} == {"Croissant"}
+    assert predictor.model_updates == {"full": 1}
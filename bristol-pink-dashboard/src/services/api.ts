@@ -77,6 +77,87 @@ export async function logout(): Promise<void> {
   clearSession();
 }
 
+type SalesRow = { date: string; product: string; unitsSold: number };
+
+type SalesColumns = {
+  dates: string[];
+  products: { categories: string[]; codes: number[] };
+  units: number[];
+};
+
+// Columnar, dictionary-encoded form of the rows; much smaller on the wire than repeated objects.
+function toSalesColumns(salesData: SalesRow[]): SalesColumns {
+  const categories: string[] = [];
+  const codeFor = new Map<string, number>();
+  const columns: SalesColumns = { dates: [], products: { categories, codes: [] }, units: [] };
+  for (const row of salesData) {
+    let code = codeFor.get(row.product);
+    if (code === undefined) {
+      code = categories.length;
+      codeFor.set(row.product, code);
+      categories.push(row.product);
+    }
+    columns.dates.push(row.date);
+    columns.products.codes.push(code);
+    columns.units.push(row.unitsSold);
+  }
+  return columns;
+}
+
+// Server-side dataset ids, keyed by the records array they were uploaded from.
+// Promises are stored so concurrent calls share a single upload.
+const datasetIds = new WeakMap<SalesRow[], Promise<string>>();
+
+async function uploadDataset(salesData: SalesRow[]): Promise<string> {
+  const response = await fetch(`${API_BASE}/datasets`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      ...getAuthHeaders(),
+    },
+    body: JSON.stringify({ sales_data: toSalesColumns(salesData) }),
+  });
+  if (!response.ok) {
+    throw await parseError(response, 'Dataset upload failed');
+  }
+  const payload = await response.json();
+  return payload.dataset.dataset_id as string;
+}
+
+async function postSales(path: string, salesData: SalesRow[], body: Record<string, unknown>): Promise<Response> {
+  const post = (payload: Record<string, unknown>) =>
+    fetch(`${API_BASE}${path}`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        ...getAuthHeaders(),
+      },
+      body: JSON.stringify({ ...body, ...payload }),
+    });
+
+  let upload = datasetIds.get(salesData);
+  if (!upload) {
+    upload = uploadDataset(salesData);
+    datasetIds.set(salesData, upload);
+  }
+
+  let datasetId: string;
+  try {
+    datasetId = await upload;
+  } catch {
+    datasetIds.delete(salesData);
+    return post({ sales_data: toSalesColumns(salesData) });
+  }
+
+  const response = await post({ dataset_id: datasetId });
+  if (response.status === 404) {
+    // The server forgot the dataset (restart or eviction); fall back to the inline payload.
+    datasetIds.delete(salesData);
+    return post({ sales_data: toSalesColumns(salesData) });
+  }
+  return response;
+}
+
 async function parseError(response: Response, fallback: string): Promise<Error> {
   try {
     const payload = await response.json();
@@ -87,21 +168,13 @@ async function parseError(response: Response, fallback: string): Promise<Error>
 }
 
 export async function getPredictions(
-  salesData: { date: string; product: string; unitsSold: number }[],
+  salesData: SalesRow[],
   trainingWeeks: number,
   algorithm: AlgorithmType
 ): Promise<PredictionData[]> {
-  const response = await fetch(`${API_BASE}/predict`, {
-    method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-      ...getAuthHeaders(),
-    },
-    body: JSON.stringify({
-      sales_data: salesData,
-      training_weeks: trainingWeeks,
-      algorithm,
-    }),
+  const response = await postSales('/predict', salesData, {
+    training_weeks: trainingWeeks,
+    algorithm,
   });
 
   if (!response.ok) {
@@ -118,21 +191,13 @@ export async function getPredictions(
 }
 
 export async function getAccuracyMetrics(
-  salesData: { date: string; product: string; unitsSold: number }[],
+  salesData: SalesRow[],
   trainingWeeks: number,
   algorithm: AlgorithmType
 ): Promise<AccuracyMetrics> {
-  const response = await fetch(`${API_BASE}/evaluate`, {
-    method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-      ...getAuthHeaders(),
-    },
-    body: JSON.stringify({
-      sales_data: salesData,
-      training_weeks: trainingWeeks,
-      algorithm,
-    }),
+  const response = await postSales('/evaluate', salesData, {
+    training_weeks: trainingWeeks,
+    algorithm,
   });
 
   if (!response.ok) {
@@ -143,19 +208,11 @@ export async function getAccuracyMetrics(
 }
 
 export async function compareAllModels(
-  salesData: { date: string; product: string; unitsSold: number }[],
+  salesData: SalesRow[],
   trainingWeeks: number
 ): Promise<ModelComparisonResult[]> {
-  const response = await fetch(`${API_BASE}/evaluate/compare`, {
-    method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-      ...getAuthHeaders(),
-    },
-    body: JSON.stringify({
-      sales_data: salesData,
-      training_weeks: trainingWeeks,
-    }),
+  const response = await postSales('/evaluate/compare', salesData, {
+    training_weeks: trainingWeeks,
   });
 
   if (!response.ok) {
@@ -167,19 +224,11 @@ export async function compareAllModels(
 }
 
 export async function compareTrainingWindows(
-  salesData: { date: string; product: string; unitsSold: number }[],
+  salesData: SalesRow[],
   windows?: number[]
 ): Promise<TrainingWindowData> {
-  const response = await fetch(`${API_BASE}/evaluate/windows`, {
-    method: 'POST',
-    headers: {
-      'Content-Type': 'application/json',
-      ...getAuthHeaders(),
-    },
-    body: JSON.stringify({
-      sales_data: salesData,
-      windows: windows ?? [3, 4, 5, 6, 7, 8],
-    }),
+  const response = await postSales('/evaluate/windows', salesData, {
+    windows: windows ?? [3, 4, 5, 6, 7, 8],
   });
 
   if (!response.ok) {
@@ -39,6 +39,7 @@ export interface AccuracyMetrics {
   rmse: number;
   mape: number;
   training_time?: number;
+  cached?: boolean;
 }
 
 export interface ModelComparisonResult {
@@ -48,6 +49,7 @@ export interface ModelComparisonResult {
   rmse: number;
   mape: number;
   training_time: number;
+  cached?: boolean;
 }
 
 export interface WindowResult {
@@ -56,6 +58,7 @@ export interface WindowResult {
   rmse: number;
   mape: number;
   training_time: number;
+  cached?: boolean;
 }
 
 export interface TrainingWindowData {